@@ -0,0 +1,125 @@
+'''
+File: bench_inbound.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 19:20:41
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+Memory allocated per inbound MQTT message, from the receive callback to
+the rendered text (CPython, tracemalloc).
+
+before: the callback decodes topic and payload into a dict, the message
+    view strips the whole text and replaces line breaks in three passes
+after: the callback fills a pooled MqttMessage with the received bytes,
+    the view renders DISPLAY["message_bytes"] (512) of them with text()
+
+Both go through publish_sync() to one subscriber that formats the line
+the message view shows. Peak is the most memory held at once above the
+baseline; the payload itself, allocated by the receive, is not counted.
+The time column is CPython's: text() loops over the rendered bytes in
+Python while str.strip() and str.replace() run in C, so "after" is not
+faster here even where it allocates far less.
+
+Run from the repository root: python benchmarks/bench_inbound.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import firmware
+firmware.install()
+
+import time
+import tracemalloc
+from usr.Eventstore import EventStore
+from usr.extensions.mqtt_message import MessagePool
+
+SIZES = (1024, 16384)
+MESSAGE_BYTES = 512
+RUNS = 200
+TOPIC = b"devices/ec200u/display"
+
+
+def payload(size):
+    line = b"sensor reading 42.0 ok\r\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def before(size):
+    store = EventStore()
+    shown = []
+
+    def view(event, msg):
+        cleaned = msg['message'].strip().replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ')
+        shown.append("Msg: {}\nTime: {}".format(cleaned, int(msg['timestamp'])))
+    store.subscribe("mqtt.message", view)
+
+    def receive(topic, msg):
+        store.publish_sync("mqtt.message", {
+            'topic': topic.decode(),
+            'message': msg.decode(),
+            'timestamp': time.time(),
+        })
+        shown.pop()
+    return receive
+
+
+def after(size):
+    store = EventStore()
+    pool = MessagePool(8)
+    shown = []
+
+    def view(event, msg):
+        cleaned = msg.text(MESSAGE_BYTES)
+        if msg.length > MESSAGE_BYTES:
+            cleaned += "..."
+        shown.append("Msg: {}\nTime: {}".format(cleaned, int(msg.timestamp)))
+    store.subscribe("mqtt.message", view)
+
+    def receive(topic, msg):
+        record = pool.acquire(topic, msg)
+        try:
+            store.publish_sync("mqtt.message", record)
+        finally:
+            record.release()
+        shown.pop()
+    return receive
+
+
+def measure(receive, size):
+    """Peak bytes above the baseline and microseconds, per message."""
+    msg = payload(size)
+    receive(TOPIC, msg)  # Warm up caches and lazily created state
+    peak = 0
+    tracemalloc.start()
+    for _ in range(RUNS):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        receive(TOPIC, msg)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        receive(TOPIC, msg)
+    elapsed = (time.perf_counter() - start) * 1000000 / RUNS
+    return peak, elapsed
+
+
+def main():
+    print("%8s %8s %12s %10s" % ("payload", "path", "peak (B)", "time (us)"))
+    for size in SIZES:
+        for name, path in (("before", before), ("after", after)):
+            peak, elapsed = measure(path(size), size)
+            print("%8d %8s %12d %10.1f" % (size, name, peak, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+'''
+File: bench_inflight.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 19:02:14
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+QoS 1 throughput against the in-flight window (CPython).
+
+MyMqttClient publishes QoS 1 messages to the loopback stand-in broker,
+which holds every packet it sends back for the round trip time given on
+the command line (default 300 ms, the low end of a cellular link).
+Window 1 waits for each PUBACK before the next message, as publish()
+did before the window existed.
+
+Run from the repository root: python benchmarks/bench_inflight.py [rtt_ms]
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import firmware
+firmware.install()
+
+import time
+from broker import Broker
+from usr.extensions.my_mqtts import MyMqttClient
+
+WINDOWS = (1, 4, 8, 16)
+MESSAGES = 32
+PAYLOAD = b"x" * 128
+
+
+def run(rtt_ms, window):
+    """Messages per second with this window."""
+    broker = Broker()
+    try:
+        client = MyMqttClient("bench", "127.0.0.1", broker.port, inflight_window=window,
+                              outbound_queue=MESSAGES)
+        client.connect()
+        client.loop_forever()
+        broker.delay_ms = rtt_ms
+        start = time.perf_counter()
+        handles = [client.publish_nowait("bench/%d" % i, PAYLOAD, qos=1) for i in range(MESSAGES)]
+        for handle in handles:
+            if not handle.wait():
+                raise RuntimeError("Publish failed: %s" % handle.error)
+        elapsed = time.perf_counter() - start
+        client.disconnect()
+        return MESSAGES / elapsed
+    finally:
+        broker.close()
+
+
+def main():
+    rtt_ms = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print("%d QoS 1 messages, %d ms round trip" % (MESSAGES, rtt_ms))
+    print("%8s %12s %10s" % ("window", "msg/s", "speedup"))
+    base = None
+    for window in WINDOWS:
+        rate = run(rtt_ms, window)
+        base = base or rate
+        print("%8d %12.1f %9.1fx" % (window, rate, rate / base))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+'''
+File: bench_publish.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 16:10:25
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+publish_sync() cost as the number of subscribers grows (CPython).
+
+Two columns per subscriber count:
+    other: publishing an event with one subscriber while that many
+        subscribers sit on other events, which must not matter at all
+    per sub: cost per delivered callback of an event with that many
+        subscribers, i.e. the dispatch overhead does not grow with them
+
+Run from the repository root: python benchmarks/bench_publish.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import firmware
+firmware.install()
+
+import time
+from usr.Eventstore import EventStore
+
+COUNTS = (1, 4, 16, 64, 256)
+PUBLISHES = 20000
+
+
+class Owner(object):
+    active = True
+
+
+def callback(event, msg):
+    pass
+
+
+def timed(func, *args):
+    """Average microseconds per call of func(*args)."""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(PUBLISHES):
+            func(*args)
+        elapsed = (time.perf_counter() - start) * 1000000 / PUBLISHES
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    print("%8s %12s %12s" % ("subs", "other (us)", "per sub (us)"))
+    for count in COUNTS:
+        store = EventStore()
+        store.subscribe("time.update", callback, owner=Owner())
+        for i in range(count):
+            store.subscribe("mqtt.message.%d" % i, callback, owner=Owner())
+        other = timed(store.publish_sync, "time.update", 1)
+
+        store = EventStore()
+        for _ in range(count):
+            store.subscribe("mqtt.message", callback, owner=Owner())
+        per_sub = timed(store.publish_sync, "mqtt.message", 1) / count
+        print("%8d %12.2f %12.3f" % (count, other, per_sub))
+
+
+if __name__ == "__main__":
+    main()
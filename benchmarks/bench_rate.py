@@ -0,0 +1,73 @@
+'''
+File: bench_rate.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 17:15:02
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+CPU saved by rate limited subscriptions under a flood (CPython).
+
+A subscriber whose callback costs about 200 us, like a message view
+re-layout, receives a one second flood of publish_sync() calls, once
+plain and once behind each rate option. Shows how often the callback
+ran and the CPU time spent in the publisher.
+
+Run from the repository root: python benchmarks/bench_rate.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import firmware
+firmware.install()
+
+import time
+from usr.Eventstore import EventStore
+
+FLOOD_MS = 1000
+PUBLISH_EVERY_US = 500  # 2000 events per second
+CALLBACK_US = 200
+
+OPTIONS = (
+    ("plain", {}),
+    ("max_rate=10", {'max_rate': 10}),
+    ("throttle_ms=100", {'throttle_ms': 100}),
+    ("debounce_ms=50", {'debounce_ms': 50}),
+)
+
+
+def main():
+    print("%-16s %9s %7s %9s" % ("subscription", "published", "calls", "cpu (ms)"))
+    for name, options in OPTIONS:
+        calls = [0]
+
+        def relayout(event, msg):
+            calls[0] += 1
+            end = time.perf_counter() + CALLBACK_US / 1000000
+            while time.perf_counter() < end:
+                pass
+
+        store = EventStore()
+        store.subscribe("mqtt.message", relayout, **options)
+        published = 0
+        cpu = time.process_time()
+        end = time.perf_counter() + FLOOD_MS / 1000
+        while time.perf_counter() < end:
+            store.publish_sync("mqtt.message", published)
+            published += 1
+            firmware.sleep_us(PUBLISH_EVERY_US)
+        cpu = (time.process_time() - cpu) * 1000
+        # Let the trailing delivery run
+        time.sleep(0.2)
+        print("%-16s %9d %7d %9.1f" % (name, published, calls[0], cpu))
+
+
+if __name__ == "__main__":
+    main()
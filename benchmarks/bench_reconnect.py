@@ -0,0 +1,79 @@
+'''
+File: bench_reconnect.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 20:05:37
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+Reconnect-to-ready time with 20 subscribed topic filters (CPython).
+
+The loopback stand-in broker holds every packet it sends back for the
+round trip time given on the command line (default 300 ms).
+    per topic: CONNECT, then one SUBSCRIBE per filter, each waiting for
+        its SUBACK, as reconnect() did with umqtt's subscribe()
+    batched: MyMqttClient.reconnect(), CONNECT then a single SUBSCRIBE
+        carrying every filter
+
+Run from the repository root: python benchmarks/bench_reconnect.py [rtt_ms]
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import firmware
+firmware.install()
+
+import time
+from broker import Broker
+from umqtt import MQTTClient
+from usr.extensions.my_mqtts import MyMqttClient
+
+TOPICS = ["devices/ec200u/%d/cmd" % i for i in range(20)]
+
+
+def per_topic(broker):
+    client = MQTTClient("bench", "127.0.0.1", broker.port)
+    start = time.perf_counter()
+    client.connect()
+    for topic in TOPICS:
+        client.subscribe(topic, 1)
+    elapsed = time.perf_counter() - start
+    client.disconnect()
+    return elapsed
+
+
+def batched(broker):
+    client = MyMqttClient("bench", "127.0.0.1", broker.port)
+    client.connect()
+    client.subscribe(TOPICS, 1)
+    start = time.perf_counter()
+    if not client.reconnect():
+        raise RuntimeError("Reconnect failed")
+    elapsed = time.perf_counter() - start
+    client.disconnect()
+    return elapsed
+
+
+def main():
+    rtt_ms = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print("%d topic filters, %d ms round trip" % (len(TOPICS), rtt_ms))
+    print("%10s %12s %12s" % ("path", "ready (ms)", "round trips"))
+    for name, run in (("per topic", per_topic), ("batched", batched)):
+        broker = Broker()
+        broker.delay_ms = rtt_ms
+        try:
+            elapsed = run(broker) * 1000
+        finally:
+            broker.close()
+        print("%10s %12.0f %12.1f" % (name, elapsed, elapsed / rtt_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+'''
+File: bench_router.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 19:41:08
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+MQTT topic routing with up to 1k topic filters (CPython).
+
+For each filter count:
+    cached: TopicRouter.match() of a recently seen topic (LRU hit)
+    trie: the same match with the cache cleared, walking the trie
+    scan: testing every filter in turn, what a list of callbacks does
+
+Run from the repository root: python benchmarks/bench_router.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import firmware
+firmware.install()
+
+import time
+from usr.extensions.my_mqtts import TopicRouter
+
+COUNTS = (10, 100, 1000)
+ROUNDS = 5000
+TOPIC = b"devices/ec200u-7/cmd"
+
+
+def handler(topic, msg):
+    pass
+
+
+def filters(count):
+    """count filters of every shape; devices/+/cmd is the one TOPIC matches."""
+    result = ["devices/+/cmd"]
+    shapes = ("devices/dev{}/cmd", "devices/+/status/{}", "config/{}/#", "site/{}/+/temp", "dev{}/#")
+    for i in range(count - 1):
+        result.append(shapes[i % len(shapes)].format(i))
+    return result
+
+
+def scan_match(filters, topic):
+    """Reference matcher: split and compare every filter."""
+    levels = topic.split(b"/")
+    found = []
+    for topic_filter in filters:
+        parts = topic_filter.encode().split(b"/")
+        for i, part in enumerate(parts):
+            if part == b"#":
+                found.append(topic_filter)
+                break
+            if i >= len(levels) or (part != b"+" and part != levels[i]):
+                break
+        else:
+            if len(parts) == len(levels):
+                found.append(topic_filter)
+    return found
+
+
+def uncached(router, topic):
+    router._cache.clear()
+    return router.match(topic)
+
+
+def timed(func, *args):
+    """Average microseconds per call of func(*args)."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.perf_counter() - start) * 1000000 / ROUNDS
+
+
+def main():
+    print("%8s %12s %10s %10s" % ("filters", "cached (us)", "trie (us)", "scan (us)"))
+    for count in COUNTS:
+        names = filters(count)
+        router = TopicRouter()
+        for topic_filter in names:
+            router.add(topic_filter, handler)
+        assert router.match(TOPIC) == (handler,)
+        assert scan_match(names, TOPIC) == ["devices/+/cmd"]
+        cached = timed(router.match, TOPIC)
+        trie = timed(uncached, router, TOPIC)
+        scan = timed(scan_match, names, TOPIC)
+        print("%8d %12.2f %10.2f %10.2f" % (count, cached, trie, scan))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+'''
+File: bench_wildcards.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 16:24:03
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+Wildcard subscriptions with hundreds of patterns (CPython).
+
+For each pattern count:
+    publish: publish_sync() of an event matched by one pattern; the
+        match is cached, so this must not depend on the pattern count
+    trie: resolving the event against every pattern (cache miss)
+    scan: the same resolution testing each pattern in turn, for scale
+
+Run from the repository root: python benchmarks/bench_wildcards.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import firmware
+firmware.install()
+
+import time
+from usr.Eventstore import EventStore, TopicTrie
+
+COUNTS = (0, 100, 300, 1000)
+ROUNDS = 5000
+
+
+def callback(event, msg):
+    pass
+
+
+def patterns(count):
+    """count patterns of every shape, none of them matching mqtt.message."""
+    result = []
+    shapes = ("dev{}.*", "dev{}.#", "*.dev{}", "dev{}.*.state", "site.*.dev{}.#")
+    for i in range(count):
+        result.append(shapes[i % len(shapes)].format(i))
+    return result
+
+
+def scan_match(patterns, name):
+    """Reference matcher: split and compare every pattern."""
+    levels = name.split(".")
+    found = []
+    for pattern in patterns:
+        parts = pattern.split(".")
+        for i, part in enumerate(parts):
+            if part == "#":
+                found.append(pattern)
+                break
+            if i >= len(levels) or (part != "*" and part != levels[i]):
+                break
+        else:
+            if len(parts) == len(levels):
+                found.append(pattern)
+    return found
+
+
+def timed(func, *args):
+    """Average microseconds per call of func(*args)."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.perf_counter() - start) * 1000000 / ROUNDS
+
+
+def main():
+    print("%9s %13s %10s %10s" % ("patterns", "publish (us)", "trie (us)", "scan (us)"))
+    for count in COUNTS:
+        store = EventStore()
+        names = patterns(count)
+        for pattern in names:
+            store.subscribe(pattern, callback)
+        store.subscribe("mqtt.*", callback)
+        publish = timed(store.publish_sync, "mqtt.message", 1)
+
+        trie = TopicTrie()
+        for pattern in names + ["mqtt.*"]:
+            trie.insert(pattern)
+        assert trie.match("mqtt.message") == ["mqtt.*"]
+        resolve = timed(trie.match, "mqtt.message")
+        scan = timed(scan_match, names + ["mqtt.*"], "mqtt.message")
+        print("%9d %13.2f %10.2f %10.2f" % (count, publish, resolve, scan))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+'''
+File: broker.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 17:52:40
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+Stand-in MQTT 3.1.1 broker on loopback for the MyMqttClient tests.
+
+Serves one client connection at a time and keeps what the client sent.
+Every packet is parsed strictly; anything malformed, e.g. two packets
+interleaved on the wire, is recorded in errors and ends the connection.
+With delay_ms set, every packet to the client is held back that long,
+in order, like the round trip of a cellular link.
+"""
+
+import socket
+import struct
+import threading
+import time
+
+
+class Broker(object):
+    def __init__(self):
+        self.publishes = []     # (topic, payload, qos, dup, pid) received, in order
+        self.subscribes = []    # (pid, [(filter, qos)]) received
+        self.pubacks = []       # Packet ids the client acknowledged
+        self.connects = []      # clean_session flag of every CONNECT
+        self.errors = []
+        self.session_present = False
+        self.ack_publishes = True   # Answer QoS 1 PUBLISH with PUBACK
+        self.answer_subscribes = True
+        self.refused = set()    # Topic filters granted 0x80
+        self.before_suback = None  # Called with the connection before a SUBACK is sent
+        self.delay_ms = 0       # Added to every packet sent to the client
+        self._outbox = []       # (due, connection, packet) waiting for delay_ms
+        self._outbox_ready = threading.Condition()
+        self._pid = 0
+        self._conn = None
+        self._write_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(4)
+        self.port = self._server.getsockname()[1]
+        self._running = True
+        for target in (self._accept, self._deliver):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+
+    def close(self):
+        self._running = False
+        with self._outbox_ready:
+            self._outbox_ready.notify()
+        self.drop()
+        self._server.close()
+
+    def drop(self):
+        """Close the client connection, as a broken link would."""
+        conn = self._conn
+        self._conn = None
+        if conn is not None:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def wait_for(self, condition, timeout=5):
+        """
+        Wait until condition() holds, re-checked on every received packet
+        and every 10 ms for conditions on the client side.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not condition():
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._changed.wait(min(left, 0.01))
+        return True
+
+    def send(self, packet):
+        if self.delay_ms:
+            with self._outbox_ready:
+                due = time.monotonic() + self.delay_ms / 1000
+                self._outbox.append((due, self._conn, bytes(packet)))
+                self._outbox_ready.notify()
+            return
+        with self._write_lock:
+            self._conn.sendall(bytes(packet))
+
+    def _deliver(self):
+        """Send the delayed packets once they are due, in order."""
+        while self._running:
+            with self._outbox_ready:
+                while self._running and not self._outbox:
+                    self._outbox_ready.wait()
+                if not self._running:
+                    return
+                due, conn, packet = self._outbox[0]
+                left = due - time.monotonic()
+                if left > 0:
+                    self._outbox_ready.wait(left)
+                    continue
+                self._outbox.pop(0)
+            try:
+                with self._write_lock:
+                    conn.sendall(packet)
+            except OSError:
+                pass
+
+    def publish(self, topic, payload, qos=0):
+        """Send a PUBLISH to the client."""
+        topic = topic.encode()
+        body = struct.pack("!H", len(topic)) + topic
+        if qos:
+            self._pid = self._pid % 65535 + 1
+            body += struct.pack("!H", self._pid)
+        body += payload
+        self.send(bytes([0x30 | qos << 1]) + _length(len(body)) + body)
+
+    def _accept(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self.drop()
+            self._conn = conn
+            thread = threading.Thread(target=self._serve, args=(conn,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, conn):
+        try:
+            while True:
+                header = _read(conn, 1)
+                size = 0
+                shift = 0
+                while True:
+                    byte = _read(conn, 1)[0]
+                    size |= (byte & 0x7F) << shift
+                    if not byte & 0x80:
+                        break
+                    shift += 7
+                    if shift > 21:
+                        raise ValueError("Bad remaining length")
+                self._handle(conn, header[0], _read(conn, size))
+                with self._changed:
+                    self._changed.notify_all()
+        except (OSError, EOFError):
+            pass
+        except Exception as e:
+            self.errors.append(repr(e))
+            with self._changed:
+                self._changed.notify_all()
+            conn.close()
+
+    def _handle(self, conn, kind, body):
+        if kind == 0x10:
+            if body[:7] != b"\x00\x04MQTT\x04":
+                raise ValueError("Bad CONNECT: %r" % body[:10])
+            clean = bool(body[7] & 0x02)
+            self.connects.append(clean)
+            present = 1 if self.session_present and not clean else 0
+            self.send(bytes([0x20, 0x02, present, 0x00]))
+        elif kind & 0xF0 == 0x30:
+            qos = (kind >> 1) & 0x03
+            if qos > 1:
+                raise ValueError("Unexpected QoS %d" % qos)
+            topic_len = struct.unpack("!H", body[:2])[0]
+            topic = body[2:2 + topic_len].decode()
+            offset = 2 + topic_len
+            pid = 0
+            if qos:
+                pid = struct.unpack("!H", body[offset:offset + 2])[0]
+                offset += 2
+            self.publishes.append((topic, body[offset:], qos, bool(kind & 0x08), pid))
+            if qos and self.ack_publishes:
+                self.send(bytes([0x40, 0x02]) + struct.pack("!H", pid))
+        elif kind == 0x40:
+            if len(body) != 2:
+                raise ValueError("Bad PUBACK length %d" % len(body))
+            self.pubacks.append(struct.unpack("!H", body)[0])
+        elif kind == 0x82:
+            pid = struct.unpack("!H", body[:2])[0]
+            offset = 2
+            topics = []
+            while offset < len(body):
+                size = struct.unpack("!H", body[offset:offset + 2])[0]
+                topics.append((body[offset + 2:offset + 2 + size].decode(), body[offset + 2 + size]))
+                offset += 3 + size
+            if not topics:
+                raise ValueError("SUBSCRIBE without topics")
+            self.subscribes.append((pid, topics))
+            if self.answer_subscribes:
+                if self.before_suback is not None:
+                    self.before_suback(self)
+                codes = bytes(0x80 if topic in self.refused else qos for topic, qos in topics)
+                self.send(bytes([0x90]) + _length(2 + len(codes)) + struct.pack("!H", pid) + codes)
+        elif kind == 0xC0:
+            self.send(b"\xd0\x00")
+        elif kind == 0xE0:
+            raise EOFError()
+        else:
+            raise ValueError("Unexpected packet type 0x%02x" % kind)
+
+
+def _length(size):
+    out = bytearray()
+    while True:
+        byte = size & 0x7F
+        size >>= 7
+        if size:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read(conn, size):
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise EOFError()
+        data += chunk
+    return data
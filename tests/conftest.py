@@ -0,0 +1,18 @@
+'''
+File: conftest.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 16:51:30
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import os
+import sys
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS))
+sys.path.insert(0, TESTS)
+
+import firmware
+firmware.install()
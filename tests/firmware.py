@@ -0,0 +1,348 @@
+'''
+File: firmware.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 16:02:11
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+"""
+CPython stand-ins for the QuecPython firmware modules.
+
+install() registers them in sys.modules so the event bus and the MQTT
+extensions can be imported, tested and benchmarked on a PC. Only what
+the code under test uses is provided. MQTTClient is a port of
+umqtt.simple on a real TCP socket, to be pointed at the loopback broker
+of broker.py.
+"""
+
+import _thread
+import binascii
+import json
+import logging
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import types
+
+_TICKS_MAX = 0x3FFFFFFF
+_TICKS_HALF = (_TICKS_MAX + 1) // 2
+_start = time.monotonic()
+
+
+def ticks_ms():
+    return int((time.monotonic() - _start) * 1000) & _TICKS_MAX
+
+
+def ticks_us():
+    return int((time.monotonic() - _start) * 1000000) & _TICKS_MAX
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(end, start):
+    diff = (end - start) & _TICKS_MAX
+    return diff - _TICKS_MAX - 1 if diff >= _TICKS_HALF else diff
+
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    time.sleep(us / 1000000)
+
+
+class FakeClock(object):
+    """Manually advanced ticks_ms() for time dependent tests."""
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now = ticks_add(self.now, ms)
+
+
+class osTimer(object):
+    """One-shot and periodic timers, callback(args) on a timer thread."""
+    def __init__(self):
+        self._timer = None
+
+    def start(self, period, mode, callback):
+        self.stop()
+
+        def fire():
+            callback(None)
+            if mode:
+                self.start(period, mode, callback)
+        self._timer = threading.Timer(period / 1000, fire)
+        self._timer.daemon = True
+        self._timer.start()
+        return 0
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return 0
+
+
+class Network(object):
+    """State behind the net and dataCall stand-ins; tests flip it."""
+    registered = True
+    data_call = True
+    callback = None
+
+
+def _net_state():
+    return ([], [1 if Network.registered else 0])
+
+
+def _data_call_info(profile, ip_type):
+    return (profile, ip_type, [1 if Network.data_call else 0, 0, "127.0.0.1"])
+
+
+def _set_data_call_callback(callback):
+    Network.callback = callback
+    return 0
+
+
+class MQTTException(Exception):
+    pass
+
+
+class _Socket(object):
+    """
+    TCP socket with the MicroPython stream methods umqtt uses.
+
+    Writes go out in small pieces with a thread switch in between, like
+    over the modem, so writers that are not serialized interleave.
+    """
+    CHUNK = 16
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, data):
+        data = bytes(data)
+        for i in range(0, len(data), self.CHUNK):
+            self.sock.sendall(data[i:i + self.CHUNK])
+            time.sleep(0)
+        return len(data)
+
+    def read(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise OSError(-1, "Connection closed")
+            data += chunk
+        return data
+
+    def settimeout(self, value):
+        self.sock.settimeout(value)
+
+    def setblocking(self, flag):
+        self.sock.setblocking(flag)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class MQTTClient(object):
+    """umqtt.simple MQTTClient, with the QuecPython additions MyMqttClient uses."""
+    def __init__(self, client_id, server, port=0, user=None, password=None, keepalive=0,
+                 ssl=False, ssl_params={}, reconn=True):
+        self.client_id = client_id
+        self.server = server
+        self.port = port
+        self.user = user
+        self.pswd = password
+        self.keepalive = keepalive
+        self.sock = None
+        self.cb = None
+        self.error_cb = None
+        self.pid = 0
+        self.state = 2
+
+    def set_callback(self, callback):
+        self.cb = callback
+
+    def error_register_cb(self, callback):
+        self.error_cb = callback
+
+    def get_mqttsta(self):
+        return self.state
+
+    def _send_str(self, value):
+        if isinstance(value, str):
+            value = value.encode()
+        self.sock.write(struct.pack("!H", len(value)))
+        self.sock.write(value)
+
+    def _recv_len(self):
+        size = 0
+        shift = 0
+        while True:
+            byte = self.sock.read(1)[0]
+            size |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return size
+            shift += 7
+
+    def connect(self, clean_session=True):
+        self.sock = _Socket(socket.create_connection((self.server, self.port)))
+        premsg = bytearray(b"\x10\0\0\0\0\0")
+        msg = bytearray(b"\x04MQTT\x04\x02\0\0")
+        size = 10 + 2 + len(self.client_id)
+        msg[6] = clean_session << 1
+        if self.user is not None:
+            size += 2 + len(self.user) + 2 + len(self.pswd)
+            msg[6] |= 0xC0
+        if self.keepalive:
+            msg[7] |= self.keepalive >> 8
+            msg[8] |= self.keepalive & 0x00FF
+        i = 1
+        while size > 0x7F:
+            premsg[i] = (size & 0x7F) | 0x80
+            size >>= 7
+            i += 1
+        premsg[i] = size
+        self.sock.write(premsg[:i + 2])
+        self.sock.write(msg)
+        self._send_str(self.client_id)
+        if self.user is not None:
+            self._send_str(self.user)
+            self._send_str(self.pswd)
+        resp = self.sock.read(4)
+        if resp[0] != 0x20 or resp[1] != 0x02:
+            raise MQTTException("Bad CONNACK")
+        if resp[3] != 0:
+            raise MQTTException(resp[3])
+        self.state = 0
+        return resp[2] & 1
+
+    def disconnect(self):
+        self.sock.write(b"\xe0\0")
+        self.close()
+
+    def close(self):
+        self.state = 2
+        if self.sock is not None:
+            self.sock.close()
+
+    def ping(self):
+        self.sock.write(b"\xc0\0")
+
+    def subscribe(self, topic, qos=0):
+        if isinstance(topic, str):
+            topic = topic.encode()
+        pkt = bytearray(b"\x82\0\0\0")
+        self.pid += 1
+        struct.pack_into("!BH", pkt, 1, 2 + 2 + len(topic) + 1, self.pid)
+        self.sock.write(pkt)
+        self._send_str(topic)
+        self.sock.write(bytes([qos]))
+        while True:
+            op = self.wait_msg()
+            if op == 0x90:
+                resp = self.sock.read(4)
+                if resp[3] == 0x80:
+                    raise MQTTException(resp[3])
+                return
+
+    def wait_msg(self):
+        """Handle one packet: PUBLISH is dispatched, other types are returned unread."""
+        try:
+            res = self.sock.read(1)
+        except OSError:
+            self.state = -1
+            raise
+        if res == b"\xd0":
+            # PINGRESP
+            self.sock.read(1)
+            return None
+        op = res[0]
+        if op & 0xF0 != 0x30:
+            return op
+        size = self._recv_len()
+        topic_len = struct.unpack("!H", self.sock.read(2))[0]
+        topic = self.sock.read(topic_len)
+        size -= topic_len + 2
+        if op & 6:
+            pid = struct.unpack("!H", self.sock.read(2))[0]
+            size -= 2
+        msg = self.sock.read(size)
+        self.cb(topic, msg)
+        if op & 6 == 2:
+            pkt = bytearray(b"\x40\x02\0\0")
+            struct.pack_into("!H", pkt, 2, pid)
+            self.sock.write(pkt)
+
+
+def _uname():
+    return ("sysname=EC200U", "nodename=EC200U", "release=stand-in", "version=stand-in",
+            "machine=stand-in")
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+_stack_size = _thread.stack_size
+
+
+def _thread_stack_size(size=None):
+    """Firmware stacks are smaller than CPython accepts, keep the default then."""
+    if size is None:
+        return _stack_size()
+    try:
+        return _stack_size(size)
+    except ValueError:
+        return _stack_size()
+
+
+def install():
+    """Register the stand-ins. Calling it again has no effect."""
+    if 'log' in sys.modules:
+        return
+
+    for name, func in (('ticks_ms', ticks_ms), ('ticks_us', ticks_us), ('ticks_add', ticks_add),
+                       ('ticks_diff', ticks_diff), ('sleep_ms', sleep_ms), ('sleep_us', sleep_us)):
+        setattr(time, name, func)
+    _module('utime', ticks_ms=ticks_ms, ticks_us=ticks_us, ticks_add=ticks_add,
+            ticks_diff=ticks_diff, sleep_ms=sleep_ms, sleep_us=sleep_us,
+            sleep=time.sleep, time=time.time, localtime=time.localtime)
+    _thread.stack_size = _thread_stack_size
+
+    _module('uos', listdir=os.listdir, mkdir=os.mkdir, remove=os.remove, rename=os.rename,
+            stat=os.stat, uname=_uname)
+    sys.modules['ustruct'] = struct
+    sys.modules['ujson'] = json
+    sys.modules['ubinascii'] = binascii
+    _module('urandom', randint=random.randint, getrandbits=random.getrandbits)
+    sys.modules['osTimer'] = osTimer
+    _module('net', getState=_net_state)
+    _module('dataCall', getInfo=_data_call_info, setCallback=_set_data_call_callback)
+    _module('umqtt', MQTTClient=MQTTClient, MQTTException=MQTTException)
+
+    logging.basicConfig(level=logging.WARNING)
+    _module('log', DEBUG=logging.DEBUG, INFO=logging.INFO, WARNING=logging.WARNING,
+            ERROR=logging.ERROR, CRITICAL=logging.CRITICAL,
+            basicConfig=lambda **kwargs: None, getLogger=logging.getLogger)
@@ -0,0 +1,143 @@
+'''
+File: test_eventstore.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 17:24:30
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import _thread
+import time
+
+from usr.Eventstore import EventStore, PRIORITY_DATA, PRIORITY_INPUT, QUEUE_BLOCK, QUEUE_FULL, prefix
+
+
+def collect(store, event, **options):
+    received = []
+    store.subscribe(event, lambda event, payload: received.append(payload), **options)
+    return received
+
+
+def test_where_none_matches_on_publish_and_replay():
+    store = EventStore()
+    store.set_sticky("device.state")
+    live = collect(store, "device.state", where={'error': None})
+    store.publish_sync("device.state", {'error': None, 'id': 1})
+    store.publish_sync("device.state", {'id': 2})
+    store.publish_sync("device.state", {'error': "timeout", 'id': 3})
+    assert [payload['id'] for payload in live] == [1]
+
+    store.publish_sync("device.state", {'error': None, 'id': 4})
+    replayed = collect(store, "device.state", where={'error': None})
+    assert [payload['id'] for payload in replayed] == [4]
+
+
+def test_where_missing_field_never_matches():
+    store = EventStore()
+    store.set_sticky("device.state")
+    received = collect(store, "device.state", where={'error': None, 'topic': prefix("a/")})
+    store.publish_sync("device.state", {'topic': "a/b"})
+    assert received == []
+    assert collect(store, "device.state", where={'error': None}) == []
+
+
+def blocked_store(timeout_ms):
+    """Store whose only worker is stuck in a callback, with a full QUEUE_BLOCK queue."""
+    store = EventStore()
+    store.configure_async(workers=1)
+    store.set_queue("slow", maxlen=1, policy=QUEUE_BLOCK, timeout_ms=timeout_ms)
+    entered = _thread.allocate_lock()
+    entered.acquire()
+    gate = _thread.allocate_lock()
+    gate.acquire()
+
+    def callback(event, value):
+        if value == 0:
+            entered.release()
+            gate.acquire()
+    store.subscribe("slow", callback)
+    assert store.publish_async("slow", 0) == 1
+    entered.acquire()
+    assert store.publish_async("slow", 1) == 1
+    return store, gate
+
+
+def test_request_times_out_from_the_only_worker():
+    store = EventStore()
+    store.configure_async(workers=1)
+    # Receives the request but never replies
+    store.subscribe("silent", lambda event, request: None)
+    done = []
+
+    def caller(event, value):
+        done.append(store.request("silent", timeout_ms=200).wait())
+    store.subscribe("ask", caller)
+    store.publish_async("ask", None)
+    deadline = time.ticks_add(time.ticks_ms(), 3000)
+    while not done and time.ticks_diff(deadline, time.ticks_ms()) > 0:
+        time.sleep_ms(10)
+    assert done == [False]
+
+
+def test_queue_block_wakes_when_a_slot_frees():
+    store, gate = blocked_store(5000)
+
+    def unblock():
+        time.sleep_ms(50)
+        gate.release()
+    _thread.start_new_thread(unblock, ())
+    start = time.ticks_ms()
+    assert store.publish_async("slow", 2) == 1
+    assert time.ticks_diff(time.ticks_ms(), start) < 1000
+
+
+def test_queue_block_times_out():
+    store, gate = blocked_store(100)
+    start = time.ticks_ms()
+    assert store.publish_async("slow", 2) == QUEUE_FULL
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+    gate.release()
+    assert 100 <= elapsed < 1000
+    assert store.queue_stats()["slow"]['dropped_newest'] == 1
+
+
+class Pooled(object):
+    refs = 0
+
+    def retain(self):
+        self.refs += 1
+
+    def release(self):
+        self.refs -= 1
+
+
+def test_ui_posts_carry_event_priority():
+    store = EventStore()
+    posted = []
+    store.set_ui_dispatcher(lambda key, func, args, priority: posted.append((func, args, priority)) or True)
+    store.set_priority("button.event", PRIORITY_INPUT)
+    store.subscribe("button.event", lambda event, value: None, ui=True)
+    store.subscribe("mqtt.message", lambda event, value: None, ui=True)
+
+    store.publish_sync("button.event", "SCROLL_UP")
+    payload = Pooled()
+    store.publish_async("mqtt.message", payload)
+    store.call_on_ui(len, "abc", priority=PRIORITY_INPUT)
+    assert [priority for func, args, priority in posted] == [PRIORITY_INPUT, PRIORITY_DATA, PRIORITY_INPUT]
+
+    # A dispatcher evicting the queued message hands it back for release
+    assert payload.refs == 1
+    func, args, priority = posted[1]
+    store.drop_ui_call(func, args)
+    assert payload.refs == 0
+
+
+def test_unsubscribe_all_by_handle():
+    store = EventStore()
+    handle = store.register("mqtt.message")
+    received = collect(store, handle)
+    collect(store, "mqtt.message")
+    assert store.unsubscribe_all(handle) == 2
+    store.publish_sync(handle, 1)
+    assert received == []
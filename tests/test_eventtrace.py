@@ -0,0 +1,98 @@
+'''
+File: test_eventtrace.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 16:54:12
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import os
+import subprocess
+import sys
+
+from usr.Eventtrace import TraceRecorder, _digest
+from usr.extensions.mqtt_message import MessagePool
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+
+class Reading(object):
+    def __init__(self, topic, value):
+        self.topic = topic
+        self.value = value
+        self._cache = object()
+
+
+class Slotted(object):
+    __slots__ = ('topic', 'payload')
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+
+
+PAYLOADS = [
+    ("hello",),
+    ({'topic': "a/b", 'qos': 1, 'tags': ["x", "y"]},),
+    (b"\x00\xff", 3.5, None, True),
+    (Reading("a/b", 7),),
+    (Slotted(b"a/b", bytearray(b"on")),),
+]
+
+DIGEST_SCRIPT = """
+import sys
+sys.path[:0] = [%r, %r]
+import firmware
+firmware.install()
+import test_eventtrace
+from usr.Eventtrace import _digest
+print(",".join(str(_digest(args)) for args in test_eventtrace.PAYLOADS))
+"""
+
+
+def test_digest_is_stable_across_processes():
+    script = DIGEST_SCRIPT % (os.path.dirname(TESTS), TESTS)
+    outputs = set()
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        outputs.add(subprocess.check_output([sys.executable, "-c", script], env=env).strip())
+    assert len(outputs) == 1
+    assert outputs.pop().decode() == ",".join(str(_digest(args)) for args in PAYLOADS)
+
+
+def test_digest_follows_payload_content():
+    assert _digest(({'a': 1, 'b': 2},)) == _digest(({'b': 2, 'a': 1},))
+    assert _digest((Reading("a/b", 7),)) == _digest((Reading("a/b", 7),))
+    assert _digest((Reading("a/b", 7),)) != _digest((Reading("a/b", 8),))
+    assert _digest(("1",)) != _digest((1,))
+    assert _digest((b"on",)) != _digest(("on",))
+
+
+def test_recorded_digest():
+    recorder = TraceRecorder(capacity=4)
+    recorder.record("mqtt.message", ({'topic': "a/b"},), False)
+    assert recorder.records()[0][4] == _digest(({'topic': "a/b"},))
+
+
+def test_captured_pooled_messages_survive_reuse():
+    pool = MessagePool(3)
+    recorder = TraceRecorder(capacity=2, capture_payloads=True)
+    for i in range(3):
+        message = pool.acquire(b"in/%d" % i, b"payload %d" % i)
+        recorder.record("mqtt.message", (message,), False)
+        # The publisher is done with the record
+        message.release()
+    captured = [args[0] for _, _, _, _, _, args in recorder.records()]
+    assert [message.payload for message in captured] == [b"payload 1", b"payload 2"]
+    assert pool.stats()['in_use'] == 2
+    recorder.clear()
+    assert pool.stats()['in_use'] == 0
+
+
+def test_digest_of_large_payload_covers_every_byte():
+    payload = bytearray(16384)
+    first = _digest((payload,))
+    payload[-1] = 1
+    assert _digest((payload,)) != first
+    assert _digest((memoryview(payload),)) == _digest((bytes(payload),))
@@ -0,0 +1,324 @@
+'''
+File: test_my_mqtts.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 18:05:16
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import struct
+import threading
+import time
+
+import pytest
+
+from broker import Broker
+from usr.extensions.mqtt_journal import MqttJournal
+from usr.extensions.mqtt_session import MqttSession
+from usr.extensions.my_mqtts import MyMqttClient, PublishHandle
+
+
+@pytest.fixture
+def broker():
+    server = Broker()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_client(broker):
+    clients = []
+
+    def make(**options):
+        client = MyMqttClient("test-client", "127.0.0.1", broker.port, **options)
+        clients.append(client)
+        return client
+    yield make
+    for client in clients:
+        try:
+            client.disconnect()
+        except Exception:
+            pass
+
+
+def connected(client):
+    client.connect()
+    client.loop_forever()
+    return client
+
+
+def test_publish_nowait_batches_queued_messages(broker, make_client):
+    client = connected(make_client(batch_bytes=4096))
+    # Hold the socket so the messages pile up behind the first write
+    lock = client._MyMqttClient__write_lock
+    with lock:
+        handles = [client.publish_nowait("bench/%d" % i, "message %d" % i) for i in range(20)]
+        depth = client.outbound_stats()['depth']
+    assert all(handle.wait() for handle in handles)
+    assert broker.wait_for(lambda: len(broker.publishes) == 20)
+    assert [topic for topic, _, _, _, _ in broker.publishes] == ["bench/%d" % i for i in range(20)]
+    stats = client.outbound_stats()
+    assert depth >= 19
+    assert stats['batches'] <= 2
+    assert stats['sent'] == 20
+
+
+def test_listener_pubacks_do_not_interleave_with_publishes(broker, make_client):
+    received = []
+    client = connected(make_client(inflight_window=16, outbound_queue=64))
+    client.set_callback(lambda topic, msg: received.append(msg))
+    payload = b"x" * 200
+    for i in range(50):
+        broker.publish("down/%d" % i, payload, qos=1)
+    handles = [client.publish_nowait("up/%d" % i, payload, qos=1) for i in range(50)]
+
+    assert broker.wait_for(lambda: len(broker.pubacks) == 50 or broker.errors)
+    assert broker.errors == []
+    assert all(handle.wait() for handle in handles)
+    assert sorted(broker.pubacks) == list(range(1, 51))
+    assert len(received) == 50
+    assert len([p for p in broker.publishes if p[2] == 1 and not p[3]]) == 50
+
+
+def test_publish_waits_for_puback(broker, make_client):
+    client = connected(make_client())
+    assert client.publish("up/1", "on", qos=1)
+    assert broker.publishes[-1][:3] == ("up/1", b"on", 1)
+    assert client.outbound_stats()['inflight'] == 0
+    handle = client.publish_nowait("up/2", "off")
+    assert handle.wait()
+    assert handle.status == PublishHandle.SENT
+
+
+def test_damaged_journal_tail_does_not_hold_back_publishes(broker, make_client, tmp_path):
+    journal = MqttJournal(str(tmp_path / "journal"))
+    journal.append("old/1", "sent")
+    journal.append("old/2", "torn")
+    # Power loss in the middle of the last record
+    name = journal._file(journal._segments[-1][0])
+    with open(name, "r+b") as f:
+        f.seek(-2, 2)
+        f.write(b"??")
+    # One record per drain step, the damaged one is read on its own
+    client = connected(make_client(journal=journal, batch_bytes=4))
+    assert broker.wait_for(lambda: len(broker.publishes) == 1)
+    assert broker.wait_for(lambda: not journal.pending())
+
+    handle = client.publish_nowait("new/1", "live")
+    assert handle.wait()
+    assert handle.status == PublishHandle.SENT
+    assert broker.wait_for(lambda: len(broker.publishes) == 2)
+    assert [p[0] for p in broker.publishes] == ["old/1", "new/1"]
+
+
+def test_message_journaled_while_online_is_drained(broker, make_client, tmp_path):
+    journal = MqttJournal(str(tmp_path / "journal"))
+    client = connected(make_client(journal=journal))
+    # Left behind by a drain that just finished
+    journal.append("late/1", "first")
+    handle = client.publish_nowait("late/2", "second")
+    assert handle.status == PublishHandle.JOURNALED
+    assert broker.wait_for(lambda: len(broker.publishes) == 2)
+    assert [p[0] for p in broker.publishes] == ["late/1", "late/2"]
+    assert broker.wait_for(lambda: not journal.pending())
+
+
+def ack_before_suback(broker):
+    """Let the PUBACKs held back so far arrive right before the next SUBACK."""
+    def send(server):
+        for _, _, qos, _, pid in server.publishes:
+            if qos:
+                server.send(b"\x40\x02" + struct.pack("!H", pid))
+    broker.ack_publishes = False
+    broker.before_suback = send
+
+
+@pytest.mark.parametrize("listening", [False, True])
+def test_subscribe_handles_pubacks_before_suback(broker, make_client, listening):
+    ack_before_suback(broker)
+    client = make_client()
+    client.connect()
+    if listening:
+        client.loop_forever()
+    handles = [client.publish_nowait("up/%d" % i, "on", qos=1) for i in range(3)]
+    assert broker.wait_for(lambda: len(broker.publishes) == 3)
+
+    client.subscribe(["down/a", "down/b"], qos=1)
+    assert all(handle.wait() for handle in handles)
+    assert [handle.status for handle in handles] == [PublishHandle.SENT] * 3
+    assert broker.subscribes[-1][1] == [("down/a", 1), ("down/b", 1)]
+    assert client.topics == {"down/a": 1, "down/b": 1}
+
+    # The stream is still in step: a message for the new filter arrives
+    received = []
+    client.route("down/a", lambda topic, msg: received.append(msg))
+    if not listening:
+        client.loop_forever()
+    broker.publish("down/a", b"hello")
+    assert broker.wait_for(lambda: received == [b"hello"])
+    assert broker.errors == []
+
+
+def test_refused_subscription_raises(broker, make_client):
+    client = connected(make_client())
+    broker.refused.add("secret/#")
+    with pytest.raises(ValueError):
+        client.subscribe(["public/#", "secret/#"])
+    assert client.topics == {"public/#": 0}
+
+
+def test_sender_sleeps_while_waiting_for_pubacks(broker, make_client):
+    broker.ack_publishes = False
+    client = connected(make_client())
+    wakeups = []
+    save_session = client._MyMqttClient__save_session
+    # Called once per sender loop iteration
+    client._MyMqttClient__save_session = lambda force=False: (wakeups.append(1), save_session(force))
+    handle = client.publish_nowait("up/1", "on", qos=1)
+    assert broker.wait_for(lambda: len(broker.publishes) == 1)
+    del wakeups[:]
+    time.sleep(0.3)
+    assert len(wakeups) <= 1
+    assert not handle.done()
+
+
+def test_unacknowledged_message_is_resent_at_its_deadline(broker, make_client):
+    broker.ack_publishes = False
+    client = connected(make_client(ack_timeout_ms=100))
+    handle = client.publish_nowait("up/1", "on", qos=1)
+    assert broker.wait_for(lambda: len(broker.publishes) == 2)
+    assert [p[3] for p in broker.publishes] == [False, True]
+    broker.send(b"\x40\x02" + struct.pack("!H", broker.publishes[0][4]))
+    assert handle.wait()
+    assert broker.wait_for(lambda: client.outbound_stats()['retransmits'] >= 1)
+
+
+@pytest.mark.parametrize("listening", [False, True])
+def test_subscribe_gives_up_without_suback(broker, make_client, listening):
+    broker.answer_subscribes = False
+    client = make_client(ack_timeout_ms=200)
+    client.connect()
+    if listening:
+        client.loop_forever()
+    started = time.monotonic()
+    with pytest.raises(ValueError):
+        client.subscribe("down/a")
+    assert time.monotonic() - started < 2
+    assert client.topics == {}
+
+
+def test_missing_suback_fails_the_reconnect_attempt(broker, make_client):
+    client = make_client(ack_timeout_ms=200, reconnect_base_ms=10)
+    client.connect()
+    client.subscribe("down/a")
+    broker.answer_subscribes = False
+    result = []
+    thread = threading.Thread(target=lambda: result.append(client.reconnect()))
+    thread.daemon = True
+    thread.start()
+    assert broker.wait_for(lambda: client.reconnect_stats()['failures'] >= 1)
+    broker.answer_subscribes = True
+    thread.join(5)
+    assert result == [True]
+    assert client.reconnect_stats()['reconnects'] == 1
+
+
+def test_route_right_after_loop_forever(broker, make_client):
+    received = []
+    client = make_client(ack_timeout_ms=1000)
+    client.connect()
+    client.loop_forever()
+    client.route("in/#", lambda topic, msg: received.append(msg))
+    broker.publish("in/1", b"first")
+    assert broker.wait_for(lambda: received == [b"first"])
+
+
+def test_qos1_publish_from_a_route_handler(broker, make_client):
+    results = []
+    received = []
+    client = connected(make_client(ack_timeout_ms=1000))
+
+    def reply(topic, msg):
+        results.append(client.publish("out/1", b"reply", qos=1))
+    client.route("in/request", reply)
+    client.route("in/other", lambda topic, msg: received.append(msg))
+    broker.publish("in/request", b"ping")
+    assert broker.wait_for(lambda: results == [True])
+    # The listener is still reading
+    broker.publish("in/other", b"next")
+    assert broker.wait_for(lambda: received == [b"next"])
+    assert broker.publishes[-1][:3] == ("out/1", b"reply", 1)
+
+
+def test_qos1_publish_before_loop_forever(broker, make_client):
+    client = make_client(ack_timeout_ms=1000)
+    client.connect()
+    assert client.publish("up/1", "on", qos=1)
+    assert client.outbound_stats()['inflight'] == 0
+
+
+def test_message_fails_after_max_retransmits(broker, make_client):
+    broker.ack_publishes = False
+    client = connected(make_client(ack_timeout_ms=50, max_retransmits=2))
+    handle = client.publish_nowait("up/1", "on", qos=1)
+    assert not handle.wait()
+    assert handle.status == PublishHandle.FAILED
+    assert [p[3] for p in broker.publishes] == [False, True, True]
+    assert client.outbound_stats()['inflight'] == 0
+
+
+def test_failing_route_handler_does_not_stop_the_listener(broker, make_client):
+    received = []
+    client = connected(make_client(ack_timeout_ms=1000))
+
+    def broken(topic, msg):
+        raise RuntimeError("handler bug")
+    client.route("in/#", broken)
+    client.route("in/+", lambda topic, msg: received.append(msg))
+    broker.publish("in/1", b"first")
+    broker.publish("in/2", b"second")
+    assert broker.wait_for(lambda: received == [b"first", b"second"])
+
+
+def test_data_call_back_during_the_readiness_check(broker, make_client, monkeypatch):
+    import net
+    client = make_client(reconnect_max_ms=5000)
+    client.connect()
+    checks = []
+    get_state = net.getState
+
+    def get_state_racing():
+        checks.append(1)
+        if len(checks) == 1:
+            # The data call comes back right after the state was read
+            client.nw_cb((1, 1))
+            return ([], [0])
+        return get_state()
+    monkeypatch.setattr(net, "getState", get_state_racing)
+    started = time.monotonic()
+    assert client.reconnect()
+    assert time.monotonic() - started < 2
+
+
+def test_disconnect_resolves_messages_kept_for_the_session(broker, make_client, tmp_path):
+    broker.ack_publishes = False
+    session = MqttSession(str(tmp_path / "session"))
+    client = connected(make_client(clean_session=False, session=session))
+    handle = client.publish_nowait("up/1", "on", qos=1)
+    assert broker.wait_for(lambda: len(broker.publishes) == 1)
+    client.disconnect()
+    assert handle.wait()
+    assert handle.status == PublishHandle.JOURNALED
+    record = session.load("test-client")
+    assert [m[1] for m in record['inflight']] == ["up/1"]
+
+
+def test_session_saves_are_rate_limited(broker, make_client, tmp_path):
+    session = MqttSession(str(tmp_path / "session"))
+    client = connected(make_client(clean_session=False, session=session, session_save_ms=1000))
+    saves = session.saves
+    for i in range(5):
+        assert client.publish("up/%d" % i, "on", qos=1)
+        time.sleep(0.05)
+    assert session.saves - saves <= 1
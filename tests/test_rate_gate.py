@@ -0,0 +1,114 @@
+'''
+File: test_rate_gate.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 17:08:45
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+from firmware import FakeClock
+from usr.Eventstore import EventStore, RateGate
+
+
+class Timers(object):
+    """run_later() stand-in: keeps the trailing deliveries until run()."""
+    def __init__(self, clock):
+        self.clock = clock
+        self.pending = []
+
+    def __call__(self, delay_ms, func, args=()):
+        self.pending.append((self.clock.now + delay_ms, func, args))
+
+    def run(self):
+        due = [timer for timer in self.pending if timer[0] <= self.clock.now]
+        self.pending = [timer for timer in self.pending if timer[0] > self.clock.now]
+        for _, func, args in due:
+            func(*args)
+
+
+def make_gate(**options):
+    clock = FakeClock(1000)
+    timers = Timers(clock)
+    received = []
+
+    def target(event, value):
+        received.append(value)
+
+    def deliver(target, event, args):
+        target(event, *args)
+
+    gate = RateGate(target, timers, deliver, clock=clock, **options)
+    return gate, clock, timers, received
+
+
+def test_max_rate_drops_excess_events():
+    gate, clock, timers, received = make_gate(max_rate=2)
+    for i in range(5):
+        gate("sensor", i)
+    assert received == [0, 1]
+    clock.advance(500)
+    gate("sensor", 5)
+    gate("sensor", 6)
+    assert received == [0, 1, 5]
+    assert gate.suppressed == 4
+    assert not timers.pending
+
+
+def test_throttle_delivers_first_and_newest():
+    gate, clock, timers, received = make_gate(throttle_ms=100)
+    gate("sensor", 0)
+    for i in range(1, 10):
+        clock.advance(5)
+        gate("sensor", i)
+    assert received == [0]
+    assert len(timers.pending) == 1
+
+    clock.advance(54)
+    timers.run()
+    assert received == [0]
+    clock.advance(1)
+    timers.run()
+    assert received == [0, 9]
+    assert gate.passed == 2
+    assert gate.suppressed == 8
+
+
+def test_debounce_waits_for_quiet():
+    gate, clock, timers, received = make_gate(debounce_ms=50)
+    for i in range(3):
+        gate("sensor", i)
+        clock.advance(30)
+    # The first timer fires early and re-arms for the newest event
+    timers.run()
+    assert received == []
+    clock.advance(20)
+    timers.run()
+    assert received == [2]
+    assert gate.suppressed == 2
+
+
+def test_gated_ui_subscription_async_publish():
+    store = EventStore()
+    clock = FakeClock(1000)
+    timers = store._run_later = Timers(clock)
+    posted = []
+
+    def dispatcher(key, func, args, priority):
+        posted.append(args[2])
+        return True
+    store.set_ui_dispatcher(dispatcher)
+
+    subscription_id = store.subscribe("mqtt.message", lambda event, value: None,
+                                      ui=True, throttle_ms=1000)
+    store._subs_by_id[subscription_id]['gate']._clock = clock
+    for i in range(10):
+        store.publish_async("mqtt.message", i)
+        clock.advance(10)
+    assert posted == [(0,)]
+
+    clock.advance(1000)
+    timers.run()
+    assert posted == [(0,), (9,)]
+    stats = store._subs_by_id[subscription_id]['gate']
+    assert (stats.passed, stats.suppressed) == (2, 8)
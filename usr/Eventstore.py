@@ -16,68 +16,1184 @@ import log
 log.basicConfig(level=log.INFO)
 event_log = log.getLogger("EVENT")
 
+# Async dispatcher defaults
+ASYNC_WORKERS = 2
+ASYNC_STACK_SIZE = 8 * 1024
+ASYNC_QUEUE_SIZE = 32
+
+# Async queue overflow policies and publish_async return code
+QUEUE_BLOCK = 0
+QUEUE_DROP_OLDEST = 1
+QUEUE_DROP_NEWEST = 2
+QUEUE_COALESCE = 3
+QUEUE_FULL = -1
+
+# Async delivery priorities, most urgent first. Each class gets a latency
+# budget and queued work is drained earliest deadline first, so input stays
+# responsive while data traffic is heavy without starving housekeeping.
+PRIORITY_INPUT = 0
+PRIORITY_STATE = 1
+PRIORITY_DATA = 2
+PRIORITY_HOUSEKEEPING = 3
+PRIORITY_NAMES = ("input", "state", "data", "housekeeping")
+PRIORITY_BUDGET_MS = (10, 50, 200, 1000)
+
+# Trailing deliveries wake at least this often to pick up earlier timers
+TIMER_SLICE_MS = 10
+
+# Instrumentation
+STATS_EVENT = "eventstore.stats"
+STATS_BUCKETS = 16  # Latency histogram buckets: [0-1us, 2-3us, 4-7us, ... >= 16ms]
+
+# Subscriber circuit breaker
+BREAKER_EVENT = "eventstore.breaker"
+QUARANTINE_QUEUE = "eventstore.quarantine"
+BREAKER_CLOSED = 0       # Called normally
+BREAKER_QUARANTINED = 1  # Too slow, called from the quarantine queue
+BREAKER_OPEN = 2         # Failing, skipped until the backoff ends
+BREAKER_STATES = ("closed", "quarantined", "open")
+BREAKER_RECOVERY_CALLS = 16  # Healthy calls in a row that forget past trips
+
+
+def retain_args(args):
+    """
+    Take a reference on pooled payloads before a deferred delivery.
+
+    Payload objects with retain()/release() methods (e.g. pooled MQTT
+    message records) go back to their pool once every holder released
+    them. The bus retains them while an async, UI or trailing delivery is
+    queued and releases them after it ran or was dropped.
+    """
+    for arg in args:
+        retain = getattr(arg, 'retain', None)
+        if retain is not None:
+            retain()
+
+
+def release_args(args):
+    """Drop the references taken by retain_args()."""
+    for arg in args:
+        release = getattr(arg, 'release', None)
+        if release is not None:
+            release()
+
+
+class TopicTrie(object):
+    """
+    Segment trie of wildcard patterns over dotted event names.
+
+    '*' matches exactly one segment. '#' matches any number of trailing
+    segments, including none, and must be the last segment.
+    """
+    SEPARATOR = '.'
+    SINGLE = '*'
+    MULTI = '#'
+
+    def __init__(self):
+        # Node layout: [children, pattern]; pattern is set on terminal nodes
+        self._root = [{}, None]
+        self.count = 0
+
+    @classmethod
+    def is_pattern(cls, name):
+        """Check whether an event name contains wildcard segments."""
+        return cls.SINGLE in name or cls.MULTI in name
+
+    @classmethod
+    def validate(cls, pattern):
+        """Raise ValueError if a pattern uses '#' anywhere but the last segment."""
+        levels = pattern.split(cls.SEPARATOR)
+        for i, level in enumerate(levels):
+            if cls.MULTI in level and (level != cls.MULTI or i != len(levels) - 1):
+                raise ValueError("'#' must be the last segment: {}".format(pattern))
+            if cls.SINGLE in level and level != cls.SINGLE:
+                raise ValueError("'*' must fill a whole segment: {}".format(pattern))
+
+    def insert(self, pattern):
+        node = self._root
+        for level in pattern.split(self.SEPARATOR):
+            child = node[0].get(level)
+            if child is None:
+                child = [{}, None]
+                node[0][level] = child
+            node = child
+        if node[1] is None:
+            self.count += 1
+        node[1] = pattern
+
+    def remove(self, pattern):
+        path = []
+        node = self._root
+        for level in pattern.split(self.SEPARATOR):
+            child = node[0].get(level)
+            if child is None:
+                return False
+            path.append((node, level))
+            node = child
+        if node[1] is None:
+            return False
+        node[1] = None
+        self.count -= 1
+
+        # Prune nodes that no longer lead to any pattern
+        while path and not node[0] and node[1] is None:
+            parent, level = path.pop()
+            del parent[0][level]
+            node = parent
+        return True
+
+    def match(self, name):
+        """Return every stored pattern matching the concrete event name."""
+        found = []
+        levels = name.split(self.SEPARATOR)
+        depth = len(levels)
+        stack = [(self._root, 0)]
+        while stack:
+            node, i = stack.pop()
+            children = node[0]
+            multi = children.get(self.MULTI)
+            if multi is not None and multi[1] is not None:
+                found.append(multi[1])
+            if i == depth:
+                if node[1] is not None:
+                    found.append(node[1])
+                continue
+            child = children.get(levels[i])
+            if child is not None:
+                stack.append((child, i + 1))
+            child = children.get(self.SINGLE)
+            if child is not None:
+                stack.append((child, i + 1))
+        return found
+
+
+class RWLock(object):
+    """
+    Reader/writer lock built on _thread.allocate_lock.
+
+    Any number of readers can hold the lock together. A waiting writer
+    blocks new readers so subscription changes are never starved.
+    Contention is counted whenever an acquire has to block.
+    """
+    def __init__(self):
+        self._readers = 0
+        self._mutex = _thread.allocate_lock()      # Guards the reader count
+        self._write = _thread.allocate_lock()      # Held by a writer or by the reader group
+        self._turnstile = _thread.allocate_lock()  # Lets a waiting writer stop new readers
+        self.waits = 0
+        self.total_wait_us = 0
+        self.max_wait_us = 0
+
+    def _take(self, lock):
+        if lock.acquire(0):
+            return
+        start = time.ticks_us()
+        lock.acquire()
+        waited = time.ticks_diff(time.ticks_us(), start)
+        self.waits += 1
+        self.total_wait_us += waited
+        if waited > self.max_wait_us:
+            self.max_wait_us = waited
+
+    def acquire_read(self):
+        self._take(self._turnstile)
+        self._turnstile.release()
+        with self._mutex:
+            self._readers += 1
+            if self._readers == 1:
+                self._take(self._write)
+
+    def release_read(self):
+        with self._mutex:
+            self._readers -= 1
+            if self._readers == 0:
+                self._write.release()
+
+    def acquire_write(self):
+        self._take(self._turnstile)
+        self._take(self._write)
+
+    def release_write(self):
+        self._write.release()
+        self._turnstile.release()
+
+    def stats(self):
+        """Contention counters: blocked acquires and their wait times."""
+        return {
+            'waits': self.waits,
+            'total_wait_us': self.total_wait_us,
+            'max_wait_us': self.max_wait_us,
+            'readers': self._readers,
+        }
+
+    def reset_stats(self):
+        self.waits = 0
+        self.total_wait_us = 0
+        self.max_wait_us = 0
+
+
+class AsyncQueue(object):
+    """
+    Bounded queue of async jobs for one event (or the default queue).
+
+    Overflow policies:
+        QUEUE_BLOCK: wait up to timeout_ms for room, then drop the new job
+        QUEUE_DROP_OLDEST: evict the oldest queued job
+        QUEUE_DROP_NEWEST: reject the new job
+        QUEUE_COALESCE: replace the queued job with the same key (the
+            subscriber) by the new one; otherwise behaves like DROP_NEWEST
+    """
+    def __init__(self, name, maxlen=ASYNC_QUEUE_SIZE, policy=QUEUE_DROP_NEWEST, timeout_ms=0,
+                 priority=PRIORITY_DATA):
+        self.name = name
+        self.maxlen = maxlen
+        self.policy = policy
+        self.timeout_ms = timeout_ms
+        self.priority = priority
+        self.items = []  # [deadline_us, key, func, args, queued_us, priority]
+        self.keyed = {}  # key -> queued item, COALESCE only
+        self.waiters = []  # Locks of publishers blocked on the full queue, BLOCK only
+        self.queued = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def stats(self):
+        return {
+            'depth': len(self.items),
+            'max_depth': self.max_depth,
+            'maxlen': self.maxlen,
+            'policy': self.policy,
+            'priority': PRIORITY_NAMES[self.priority],
+            'queued': self.queued,
+            'dropped_oldest': self.dropped_oldest,
+            'dropped_newest': self.dropped_newest,
+            'coalesced': self.coalesced,
+        }
+
+
+class DispatchPool(object):
+    """
+    Fixed set of worker threads draining bounded job queues.
+
+    Workers are started once and reused for every asynchronous delivery,
+    so publishing never creates a thread. Jobs go to the queue of their
+    event (or the default queue). Each queue is FIFO; across queues the
+    job with the earliest deadline (queue time plus the budget of the
+    queue's priority) runs first.
+    """
+    def __init__(self, workers=ASYNC_WORKERS, stack_size=ASYNC_STACK_SIZE, queue_size=ASYNC_QUEUE_SIZE):
+        self.workers = workers
+        self.stack_size = stack_size
+        self.default_queue = AsyncQueue(None, queue_size)
+        self._queues = [self.default_queue]
+        self._depth = 0
+        # Per priority queue wait: [count, total_us, max_us, missed deadlines]
+        self._latency = [[0, 0, 0, 0] for _ in PRIORITY_NAMES]
+        self._running = False
+        self._mutex = _thread.allocate_lock()
+        # Held while the queues are empty, released to wake a worker
+        self._ready = _thread.allocate_lock()
+        self._ready.acquire()
+        # Called as on_drop(func, args) for queued jobs that are discarded
+        self.on_drop = None
+        # Called as run_later(delay_ms, func, args, True) to end QUEUE_BLOCK
+        # waits on the timer thread; without it they wait for room however long
+        self.run_later = None
+
+    @property
+    def dropped(self):
+        return sum(q.dropped_oldest + q.dropped_newest for q in self._queues)
+
+    def add_queue(self, name, maxlen=ASYNC_QUEUE_SIZE, policy=QUEUE_DROP_NEWEST, timeout_ms=0,
+                  priority=PRIORITY_DATA):
+        """Create a dedicated bounded queue."""
+        queue = AsyncQueue(name, maxlen, policy, timeout_ms, priority)
+        with self._mutex:
+            self._queues.append(queue)
+        return queue
+
+    def start(self):
+        """Start the worker threads. Calling it again has no effect."""
+        with self._mutex:
+            if self._running:
+                return
+            self._running = True
+
+        task_stacksize = _thread.stack_size()
+        try:
+            if self.stack_size:
+                _thread.stack_size(self.stack_size)
+        except ValueError:
+            # CPython rejects stacks below 32 KiB, keep the platform default
+            pass
+        try:
+            for _ in range(self.workers):
+                _thread.start_new_thread(self._worker, ())
+        finally:
+            _thread.stack_size(task_stacksize)
+
+    def stop(self):
+        """Ask every worker to exit once the jobs queued so far are done."""
+        with self._mutex:
+            if not self._running:
+                return
+            self._running = False
+            if self._ready.locked():
+                self._ready.release()
+            # Blocked publishers give up
+            for queue in self._queues:
+                while queue.waiters:
+                    queue.waiters.pop(0).release()
+
+    def submit(self, func, args, queue=None, key=None):
+        """
+        Queue a job for the workers, applying the queue's overflow policy.
+
+        Args:
+            func: Callable run by a worker as func(*args)
+            args: Tuple of arguments
+            queue: Target AsyncQueue, the default queue if None
+            key: Coalescing key for QUEUE_COALESCE queues
+
+        Returns:
+            bool: True if queued (or merged), False if the job was dropped
+        """
+        if queue is None:
+            queue = self.default_queue
+        deadline = None
+
+        while True:
+            waiter = None
+            with self._mutex:
+                if not self._running:
+                    queue.dropped_newest += 1
+                    return False
+
+                if key is not None and queue.policy == QUEUE_COALESCE:
+                    item = queue.keyed.get(key)
+                    if item is not None:
+                        if self.on_drop:
+                            self.on_drop(item[2], item[3])
+                        item[2] = func
+                        item[3] = args
+                        queue.coalesced += 1
+                        return True
+
+                if len(queue.items) >= queue.maxlen:
+                    if queue.policy == QUEUE_DROP_OLDEST:
+                        old = queue.items.pop(0)
+                        if old[1] is not None:
+                            queue.keyed.pop(old[1], None)
+                        if self.on_drop:
+                            self.on_drop(old[2], old[3])
+                        queue.dropped_oldest += 1
+                        self._depth -= 1
+                    elif queue.policy != QUEUE_BLOCK:
+                        queue.dropped_newest += 1
+                        return False
+                    else:
+                        now = time.ticks_ms()
+                        if deadline is None:
+                            deadline = time.ticks_add(now, queue.timeout_ms)
+                        wait = time.ticks_diff(deadline, now)
+                        if wait <= 0:
+                            queue.dropped_newest += 1
+                            return False
+                        # Handed a slot by _next_job, or released at the timeout
+                        waiter = _thread.allocate_lock()
+                        waiter.acquire()
+                        queue.waiters.append(waiter)
+
+                if len(queue.items) < queue.maxlen:
+                    now = time.ticks_us()
+                    budget = PRIORITY_BUDGET_MS[queue.priority] * 1000
+                    item = [time.ticks_add(now, budget), key, func, args, now, queue.priority]
+                    queue.items.append(item)
+                    if key is not None and queue.policy == QUEUE_COALESCE:
+                        queue.keyed[key] = item
+                    queue.queued += 1
+                    if len(queue.items) > queue.max_depth:
+                        queue.max_depth = len(queue.items)
+                    self._depth += 1
+                    if self._ready.locked():
+                        self._ready.release()
+                    return True
+
+            # QUEUE_BLOCK: sleep until a worker makes room, then try again
+            if self.run_later is not None:
+                self.run_later(wait, self._expire, (queue, waiter), True)
+            waiter.acquire()
+
+    def _expire(self, queue, waiter):
+        """Timer side of a QUEUE_BLOCK wait: wake the publisher if it still waits."""
+        with self._mutex:
+            if waiter in queue.waiters:
+                queue.waiters.remove(waiter)
+                waiter.release()
+
+    def queue_depth(self):
+        """Number of jobs waiting for a worker, across all queues."""
+        return self._depth
+
+    def queue_stats(self):
+        """Counters of every queue, keyed by event name (None for the default queue)."""
+        with self._mutex:
+            return dict((queue.name, queue.stats()) for queue in self._queues)
+
+    def priority_stats(self):
+        """Queue wait per priority: count, avg_us, max_us and missed deadlines."""
+        result = {}
+        with self._mutex:
+            for priority, name in enumerate(PRIORITY_NAMES):
+                count, total_us, max_us, missed = self._latency[priority]
+                result[name] = {
+                    'count': count,
+                    'avg_us': total_us // count if count else 0,
+                    'max_us': max_us,
+                    'missed': missed,
+                }
+        return result
+
+    def reset_priority_stats(self):
+        with self._mutex:
+            self._latency = [[0, 0, 0, 0] for _ in PRIORITY_NAMES]
+
+    def _pick(self):
+        """Choose the queue to serve next. Must be called with the mutex held."""
+        best = None
+        for queue in self._queues:
+            if not queue.items:
+                continue
+            if best is None:
+                best = queue
+                continue
+            # Earliest deadline first, the more urgent class on a tie
+            due = time.ticks_diff(queue.items[0][0], best.items[0][0])
+            if due < 0 or (due == 0 and queue.priority < best.priority):
+                best = queue
+        return best
+
+    def _next_job(self):
+        while True:
+            self._ready.acquire()
+            with self._mutex:
+                if not self._depth:
+                    if not self._running:
+                        # Wake the next worker so it can exit too
+                        self._ready.release()
+                        return None
+                    continue
+                queue = self._pick()
+                item = queue.items.pop(0)
+                if item[1] is not None:
+                    queue.keyed.pop(item[1], None)
+                self._depth -= 1
+                if queue.waiters:
+                    # The freed slot goes to the longest blocked publisher
+                    queue.waiters.pop(0).release()
+
+                now = time.ticks_us()
+                latency = self._latency[item[5]]
+                wait_us = time.ticks_diff(now, item[4])
+                latency[0] += 1
+                latency[1] += wait_us
+                if wait_us > latency[2]:
+                    latency[2] = wait_us
+                if time.ticks_diff(now, item[0]) > 0:
+                    latency[3] += 1
+
+                # Keep the queues signalled for the next worker
+                if (self._depth or not self._running) and self._ready.locked():
+                    self._ready.release()
+                return item
+
+    def _worker(self):
+        while True:
+            item = self._next_job()
+            if item is None:
+                break
+            try:
+                item[2](*item[3])
+            except Exception as e:
+                print("Async worker error: {}".format(e))
+
+
+class TimerQueue(object):
+    """
+    Single thread running delayed jobs in deadline order.
+
+    The thread only wakes while timers are pending; due jobs are handed
+    to submit(func, args) so slow callbacks never delay other timers.
+    """
+    def __init__(self, submit, stack_size=ASYNC_STACK_SIZE):
+        self.stack_size = stack_size
+        self._submit = submit
+        self._timers = []  # [deadline, func, args, inline], sorted by deadline
+        self._running = False
+        self._mutex = _thread.allocate_lock()
+        # Held while no timer is pending
+        self._ready = _thread.allocate_lock()
+        self._ready.acquire()
+
+    def schedule(self, delay_ms, func, args=(), inline=False):
+        """
+        Run func(*args) once delay_ms have passed.
+
+        With inline it runs on the timer thread itself, for short jobs that
+        must not wait for a free worker.
+        """
+        deadline = time.ticks_add(time.ticks_ms(), delay_ms)
+        with self._mutex:
+            i = len(self._timers)
+            while i and time.ticks_diff(self._timers[i - 1][0], deadline) > 0:
+                i -= 1
+            self._timers.insert(i, [deadline, func, args, inline])
+            if self._ready.locked():
+                self._ready.release()
+            start = not self._running
+            self._running = True
+
+        if start:
+            task_stacksize = _thread.stack_size()
+            try:
+                if self.stack_size:
+                    _thread.stack_size(self.stack_size)
+            except ValueError:
+                pass
+            try:
+                _thread.start_new_thread(self._run, ())
+            finally:
+                _thread.stack_size(task_stacksize)
+
+    def pending(self):
+        """Number of timers not yet due."""
+        return len(self._timers)
+
+    def _run(self):
+        while True:
+            self._ready.acquire()
+            while True:
+                job = None
+                with self._mutex:
+                    if not self._timers:
+                        break
+                    wait = time.ticks_diff(self._timers[0][0], time.ticks_ms())
+                    if wait <= 0:
+                        job = self._timers.pop(0)
+                if job is None:
+                    time.sleep_ms(min(wait, TIMER_SLICE_MS))
+                elif job[3]:
+                    try:
+                        job[1](*job[2])
+                    except Exception as e:
+                        print("Timer job error: {}".format(e))
+                else:
+                    self._submit(job[1], job[2])
+
+
+class RateGate(object):
+    """
+    Rate limiting in front of a subscription's callback.
+
+    max_rate: token bucket of max_rate deliveries per second, excess
+        events are dropped.
+    throttle_ms: at most one delivery per window; the first event goes
+        through right away and the newest one suppressed inside the window
+        is delivered when it closes.
+    debounce_ms: only the newest event is delivered, once no event has
+        arrived for debounce_ms.
+
+    Trailing deliveries are scheduled with run_later(delay_ms, func, args)
+    and executed with deliver(target, event, args).
+    """
+    def __init__(self, target, run_later, deliver, max_rate=None, debounce_ms=None,
+                 throttle_ms=None, clock=time.ticks_ms):
+        self.target = target
+        self.max_rate = max_rate
+        self.debounce_ms = debounce_ms
+        self.throttle_ms = throttle_ms
+        self.passed = 0
+        self.suppressed = 0
+        self._run_later = run_later
+        self._deliver = deliver
+        self._clock = clock
+        self._capacity = max(1, int(max_rate)) if max_rate else 0
+        self._tokens = self._capacity
+        self._refilled = clock()
+        self._last = None       # Ticks of the last delivery
+        self._pending = None    # (event, args) waiting for trailing delivery
+        self._due = 0
+        self._armed = False
+        self._lock = _thread.allocate_lock()
+
+    def _take_token(self, now):
+        elapsed = time.ticks_diff(now, self._refilled)
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self.max_rate / 1000)
+            self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _hold(self, event, args, due, now):
+        """Keep the newest event for a trailing delivery at due."""
+        if self._pending is not None:
+            self.suppressed += 1
+            release_args(self._pending[1])
+        retain_args(args)
+        self._pending = (event, args)
+        self._due = due
+        if not self._armed:
+            self._armed = True
+            self._run_later(max(0, time.ticks_diff(due, now)), self._fire, ())
+
+    def __call__(self, event, *args):
+        now = self._clock()
+        with self._lock:
+            if self._capacity and not self._take_token(now):
+                self.suppressed += 1
+                return None
+
+            if self.debounce_ms:
+                self._hold(event, args, time.ticks_add(now, self.debounce_ms), now)
+                return None
+
+            if self.throttle_ms and self._last is not None:
+                due = time.ticks_add(self._last, self.throttle_ms)
+                if time.ticks_diff(due, now) > 0:
+                    self._hold(event, args, due, now)
+                    return None
+
+            if self._pending is not None:
+                # The trailing timer is late, this newer event supersedes it
+                release_args(self._pending[1])
+                self._pending = None
+                self.suppressed += 1
+            self._last = now
+            self.passed += 1
+        return self._call_target(event, args)
+
+    def _call_target(self, event, args):
+        # Same argument mapping as EventStore._call
+        if len(args) == 1:
+            return self.target(event, args[0])
+        return self.target(event, *args)
+
+    def _fire(self):
+        with self._lock:
+            if self._pending is None:
+                self._armed = False
+                return
+            now = self._clock()
+            wait = time.ticks_diff(self._due, now)
+            if wait > 0:
+                # Debounce window was pushed back by a newer event
+                self._run_later(wait, self._fire, ())
+                return
+            event, args = self._pending
+            self._pending = None
+            self._armed = False
+            self._last = now
+            self.passed += 1
+        try:
+            self._deliver(self.target, event, args)
+        finally:
+            release_args(args)
+
+
+class Breaker(object):
+    """
+    Health of one subscription's callback.
+
+    max_errors failures in a row open the breaker: the callback is skipped
+    until the backoff ends. slow_calls calls in a row over latency_ms
+    move it to the quarantine lane (or open the breaker for UI callbacks,
+    which cannot leave the UI thread). The backoff doubles with every
+    trip up to max_backoff_ms; once it ends the callback is tried again
+    and a single bad call trips it once more.
+    """
+    def __init__(self, max_errors, latency_ms, slow_calls, backoff_ms, max_backoff_ms,
+                 slow_state=BREAKER_QUARANTINED, clock=time.ticks_ms):
+        self.max_errors = max_errors
+        self.latency_us = latency_ms * 1000
+        self.slow_calls = slow_calls
+        self.backoff_ms = backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.slow_state = slow_state
+        self.state = BREAKER_CLOSED
+        self.trips = 0
+        self.skipped = 0
+        self.backoff = 0
+        self._errors = 0
+        self._slow = 0
+        self._healthy = 0
+        self._until = 0
+        self._clock = clock
+
+    def lane(self):
+        """Current state, closing the breaker (half-open) once the backoff is over."""
+        if self.state != BREAKER_CLOSED and time.ticks_diff(self._clock(), self._until) >= 0:
+            self.state = BREAKER_CLOSED
+            # Half-open: the next bad call trips again
+            self._errors = self.max_errors - 1
+            self._slow = self.slow_calls - 1
+        return self.state
+
+    def record(self, elapsed_us, failed):
+        """
+        Account one call.
+
+        Returns:
+            The new state if this call tripped the breaker, else None
+        """
+        slow = elapsed_us > self.latency_us
+        self._errors = self._errors + 1 if failed else 0
+        self._slow = self._slow + 1 if slow else 0
+        if failed or slow:
+            self._healthy = 0
+        else:
+            self._healthy += 1
+            if self._healthy >= BREAKER_RECOVERY_CALLS:
+                self.trips = 0
+
+        if self._errors >= self.max_errors:
+            return self._trip(BREAKER_OPEN)
+        if self._slow >= self.slow_calls and self.state == BREAKER_CLOSED:
+            return self._trip(self.slow_state)
+        return None
+
+    def _trip(self, state):
+        self.trips += 1
+        self.backoff = min(self.max_backoff_ms, self.backoff_ms << min(self.trips - 1, 16))
+        self.state = state
+        self._until = time.ticks_add(self._clock(), self.backoff)
+        self._errors = 0
+        self._slow = 0
+        self._healthy = 0
+        return state
+
+    def stats(self):
+        return {
+            'state': BREAKER_STATES[self.state],
+            'trips': self.trips,
+            'skipped': self.skipped,
+            'backoff_ms': self.backoff,
+        }
+
+
+class Prefix(object):
+    """Filter value matching any string field that starts with value."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def prefix(value):
+    """Build a where= condition matching fields that start with value."""
+    return Prefix(value)
+
+
+# Field absent from a payload; a where= condition on it never matches,
+# not even one expecting None
+_MISSING = object()
+
+
+def _field(payload, name):
+    """Read a filter field from a dict payload or an attribute of an object payload."""
+    if isinstance(payload, dict):
+        return payload.get(name, _MISSING)
+    return getattr(payload, name, _MISSING)
+
+
+def _matches_where(where, args):
+    """Evaluate a where= dict against publish args (used outside the hot path)."""
+    payload = args[0] if args else None
+    for name, expected in where.items():
+        value = _field(payload, name)
+        if isinstance(expected, Prefix):
+            if not isinstance(value, str) or not value.startswith(expected.value):
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class FilterIndex(object):
+    """
+    Dispatch plan of an event that has filtered subscribers.
+
+    Equality conditions are indexed as field -> value -> subscriptions and
+    prefix conditions as field -> prefix -> subscriptions, probed once per
+    distinct prefix length. Selecting the subscribers for a payload costs a
+    few dict lookups per indexed field, independent of how many filtered
+    subscriptions exist, and never calls Python predicates.
+    """
+    def __init__(self, subs):
+        self._size = len(subs)
+        self._equals = {}    # field -> {value: [sub_info]}
+        self._prefixes = {}  # field -> [lengths, {prefix: [sub_info]}]
+        self._required = {}  # subscription id -> number of conditions
+        unfiltered = []
+
+        for sub_info in subs:
+            where = sub_info['where']
+            if not where:
+                unfiltered.append(sub_info)
+                continue
+            self._required[sub_info['id']] = len(where)
+            for name, expected in where.items():
+                if isinstance(expected, Prefix):
+                    entry = self._prefixes.get(name)
+                    if entry is None:
+                        entry = self._prefixes[name] = [[], {}]
+                    length = len(expected.value)
+                    if length not in entry[0]:
+                        entry[0].append(length)
+                    entry[1].setdefault(expected.value, []).append(sub_info)
+                else:
+                    table = self._equals.setdefault(name, {})
+                    table.setdefault(expected, []).append(sub_info)
+
+        self._unfiltered = tuple(unfiltered)
+
+    def __len__(self):
+        return self._size
+
+    def select(self, args):
+        """Return the subscriptions whose conditions all match the payload."""
+        payload = args[0] if args else None
+        if payload is None:
+            return self._unfiltered
+
+        hits = {}
+        candidates = []
+        for name, table in self._equals.items():
+            value = _field(payload, name)
+            if value is _MISSING:
+                continue
+            try:
+                matched = table.get(value)
+            except TypeError:
+                # Unhashable field value can't equal an indexed one
+                continue
+            if matched:
+                for sub_info in matched:
+                    count = hits.get(sub_info['id'], 0)
+                    if not count:
+                        candidates.append(sub_info)
+                    hits[sub_info['id']] = count + 1
+
+        for name, entry in self._prefixes.items():
+            value = _field(payload, name)
+            if not isinstance(value, str):
+                continue
+            lengths, table = entry
+            for length in lengths:
+                if length > len(value):
+                    continue
+                matched = table.get(value[:length])
+                if matched:
+                    for sub_info in matched:
+                        count = hits.get(sub_info['id'], 0)
+                        if not count:
+                            candidates.append(sub_info)
+                        hits[sub_info['id']] = count + 1
+
+        if not candidates:
+            return self._unfiltered
+
+        required = self._required
+        selected = list(self._unfiltered)
+        for sub_info in candidates:
+            if hits[sub_info['id']] == required[sub_info['id']]:
+                selected.append(sub_info)
+        if len(selected) == len(self._unfiltered):
+            return self._unfiltered
+
+        # Keep subscription order
+        selected.sort(key=lambda sub_info: sub_info['id'])
+        return selected
+
+
+class Future(object):
+    """
+    Pending answer to EventStore.request().
+
+    The waiting thread sleeps on a lock that is released by the reply or,
+    at the latest, by the bus timer when the request times out, so no
+    thread is started and nothing polls.
+    """
+    PENDING = 0
+    REPLIED = 1
+    TIMED_OUT = 2
+    NO_RESPONDER = 3
+    FAILED = 4
+
+    def __init__(self, request_id, event):
+        self.id = request_id
+        self.event = event
+        self.status = Future.PENDING
+        self.value = None
+        self._callbacks = None
+        self._lock = _thread.allocate_lock()
+        # Held until the future is resolved
+        self._done = _thread.allocate_lock()
+        self._done.acquire()
+
+    def _resolve(self, status, value):
+        with self._lock:
+            if self.status != Future.PENDING:
+                return False
+            self.status = status
+            self.value = value
+            callbacks = self._callbacks
+            self._callbacks = None
+            self._done.release()
+        if callbacks:
+            for callback in callbacks:
+                try:
+                    callback(self)
+                except Exception as e:
+                    print("Future callback error: {}".format(e))
+        return True
+
+    def done(self):
+        return self.status != Future.PENDING
+
+    def wait(self):
+        """
+        Block until the future is resolved.
+
+        Returns:
+            bool: True if a responder replied, False on timeout, failure or
+            when nobody handles the event
+        """
+        if self.status == Future.PENDING:
+            self._done.acquire()
+            # Pass the wakeup on to other waiters
+            self._done.release()
+        return self.status == Future.REPLIED
+
+    def result(self, default=None):
+        """Wait and return the reply, or default if there was none."""
+        return self.value if self.wait() else default
+
+    def add_done_callback(self, callback):
+        """
+        Call callback(future) once resolved, right away if it already is.
+
+        It runs on the resolving thread, the bus timer thread on timeout,
+        so it must be short.
+        """
+        with self._lock:
+            if self.status == Future.PENDING:
+                if self._callbacks is None:
+                    self._callbacks = []
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+
+class Request(object):
+    """Payload delivered to responders of EventStore.request()."""
+    __slots__ = ('id', 'payload', '_store')
+
+    def __init__(self, request_id, payload, store):
+        self.id = request_id
+        self.payload = payload
+        self._store = store
+
+    def reply(self, value=None):
+        """
+        Answer the request. Only the first reply counts.
+
+        Returns:
+            bool: False if the request was already answered or timed out
+        """
+        return self._store.reply(self.id, value)
+
+    def done(self):
+        """True once the request was answered or timed out."""
+        return self.id not in self._store._requests
+
+
 class EventStore(object):
     def __init__(self):
-        self._subscribers = {}  # Dict[str, List[tuple]]
-        self._lock_flag = False  # Simple lock using flag
+        self._subscribers = {}  # Dict[str, Dict[int, dict]]
+        self._subs_by_id = {}  # Dict[int, dict]
+        self._subs_by_owner = {}  # Dict[id(owner), Set[int]]
+        # Immutable subscription tuples read by publishers without locking.
+        # Filled on the first publish of an event (exact and wildcard
+        # matches resolved once) and invalidated on subscription changes.
+        self._snapshots = {}  # Dict[str, tuple]
+        # Registered events: name -> handle, and handle-indexed names and
+        # snapshots so publishing by handle is a list lookup
+        self._event_ids = {}
+        self._event_names = []
+        self._by_handle = []
+        self._patterns = TopicTrie()
+        # Subscription changes take the write side, queries the read side.
+        # Publishing reads the snapshots and takes no lock at all.
+        self._lock = RWLock()
         self._subscription_counter = 0
+        # Sticky events: event -> coalesce flag, and the last published args
+        self._sticky = {}
+        self._last = {}
+        self._queue_config = {}  # event -> (maxlen, policy, timeout_ms, priority)
+        # Instrumentation and trace recorder, None while disabled
+        self._tracer = None
+        self._stats = None
+        self._stats_interval = 0
+        self._stats_last = 0
+        self._slowest = (None, 0, None)
+        self._ui_dispatcher = None
+        self._timers = None
+        self._pool = None
+        self._queues = {}  # event -> AsyncQueue of the running pool
+        self._pool_config = (ASYNC_WORKERS, ASYNC_STACK_SIZE, ASYNC_QUEUE_SIZE)
+        # Outstanding requests: correlation id -> Future
+        self._requests = {}
+        self._request_counter = 0
+        self._request_lock = _thread.allocate_lock()
+        self._breaker_config = None  # Breaker arguments while enabled
         self.log = None
 
     def _acquire_lock(self):
-        timeout = 100  # 100ms timeout
-        start_time = time.ticks_ms()
-        
-        while self._lock_flag:
-            if time.ticks_diff(time.ticks_ms(), start_time) > timeout:
-                raise Exception("Lock timeout")
-            time.sleep_ms(1)
-        
-        self._lock_flag = True
+        """Acquire the write side of the lock"""
+        self._lock.acquire_write()
 
     def _release_lock(self):
-        """Release the simple lock"""
-        self._lock_flag = False
+        """Release the write side of the lock"""
+        self._lock.release_write()
+
+    def _acquire_read(self):
+        """Acquire the shared read side of the lock"""
+        self._lock.acquire_read()
+
+    def _release_read(self):
+        """Release the shared read side of the lock"""
+        self._lock.release_read()
+
+    def register(self, event):
+        """
+        Register an event name and get its integer handle.
+
+        Services declare their events once, e.g.
+        MQTT_MESSAGE = Eventstore.register("mqtt.message"), and publish
+        with the handle. The handle is accepted wherever an event name is;
+        registering the same name again returns the same handle.
+
+        Args:
+            event: The exact event name (no wildcards)
+
+        Returns:
+            int: The event handle
+
+        Raises:
+            ValueError: If the name is a wildcard pattern
+        """
+        if TopicTrie.is_pattern(event):
+            raise ValueError("Cannot register a pattern: {}".format(event))
+        self._acquire_lock()
+        try:
+            handle = self._event_ids.get(event)
+            if handle is None:
+                handle = len(self._event_names)
+                self._event_names.append(event)
+                self._by_handle.append(None)
+                self._event_ids[event] = handle
+            return handle
+        finally:
+            self._release_lock()
+
+    def event_name(self, event):
+        """Get the name of an event handle (names are returned unchanged)."""
+        if type(event) is int:
+            return self._event_names[event]
+        return event
     
-    def subscribe(self, event, callback, owner=None):
+    def subscribe(self, event, callback, owner=None, ui=False,
+                  max_rate=None, debounce_ms=None, throttle_ms=None, where=None):
         """
         Subscribe to an event with a callback function.
+
+        The event name may be a wildcard pattern: '*' matches one dotted
+        segment and '#' matches all remaining segments, e.g. "mqtt.*" or "#".
+
+        If the event (or any event matching the pattern) is sticky and has
+        been published before, the callback is called right away with the
+        last payload.
         
         Args:
             event: The event name to subscribe to
             callback: The callback function to execute
             owner: Optional owner object for tracking (recommended)
+            ui: If True, the callback touches LVGL objects and is queued to
+                run on the UI thread (see set_ui_dispatcher)
+            max_rate: Deliver at most this many events per second, drop the rest
+            debounce_ms: Deliver only the newest event once the event has
+                been quiet for this long
+            throttle_ms: Deliver at most one event per window, the newest
+                suppressed event is delivered when the window closes
+            where: Optional dict of payload conditions that must all hold,
+                field -> value for equality or field -> prefix("a/") for
+                string prefixes, e.g. {'topic': prefix("devices/")}
             
         Returns:
             subscription_id: Unique identifier for this subscription
         """
+        event = self.event_name(event)
+        if TopicTrie.is_pattern(event):
+            TopicTrie.validate(event)
+        if where is not None and not isinstance(where, dict):
+            raise ValueError("where must be a dict of field conditions")
+
         self._acquire_lock()
         try:
-            # Initialize event list if needed
-            if event not in self._subscribers:
-                self._subscribers[event] = []
-            
-            # Generate unique subscription ID
+            # Subscription IDs are plain increasing ints, which also gives
+            # the delivery order of the subscribers
             self._subscription_counter += 1
-            subscription_id = "sub_{}_{}_{}".format(
-                event.replace(".", "_"), 
-                id(callback) if callback else 0,
-                self._subscription_counter
-            )
+            subscription_id = self._subscription_counter
             
             # Store subscription info
             subscription_info = {
                 'id': subscription_id,
+                'event': event,
                 'callback': callback,
                 'owner': owner,
-                'active': True
+                'active': True,
+                'ui': ui,
+                'gate': None,
+                'where': where
             }
+            subscription_info['call'] = self._build_call(
+                subscription_info, max_rate, debounce_ms, throttle_ms)
             
-            self._subscribers[event].append(subscription_info)
-            
-            return subscription_id
+            subs = self._subscribers.get(event)
+            if subs is None:
+                subs = self._subscribers[event] = {}
+            subs[subscription_id] = subscription_info
+            self._subs_by_id[subscription_id] = subscription_info
+
+            if owner is not None:
+                owned = self._subs_by_owner.get(id(owner))
+                if owned is None:
+                    owned = self._subs_by_owner[id(owner)] = set()
+                owned.add(subscription_id)
+
+            self._invalidate(event)
             
         finally:
             self._release_lock()
+
+        if self._last and callback:
+            self._replay_sticky(event, subscription_info)
+
+        return subscription_id
     
     def unsubscribe(self, event, subscription_id):
         """
@@ -90,18 +1206,15 @@ class EventStore(object):
         Returns:
             bool: True if successfully unsubscribed, False otherwise
         """
+        event = self.event_name(event)
         self._acquire_lock()
         try:
-            if event not in self._subscribers:
+            sub_info = self._subs_by_id.get(subscription_id)
+            if sub_info is None or sub_info['event'] != event:
                 return False
-            
-            # Find and remove the subscription
-            for i, sub_info in enumerate(self._subscribers[event]):
-                if sub_info['id'] == subscription_id:
-                    del self._subscribers[event][i]
-                    return True
-            
-            return False
+
+            self._remove_subscription(sub_info)
+            return True
             
         finally:
             self._release_lock()
@@ -118,25 +1231,48 @@ class EventStore(object):
         """
         self._acquire_lock()
         try:
-            removed_count = 0
-            
-            for event in list(self._subscribers.keys()):
-                original_length = len(self._subscribers[event])
-                self._subscribers[event] = [
-                    sub for sub in self._subscribers[event] 
-                    if sub['owner'] is not owner
-                ]
-                removed_count += original_length - len(self._subscribers[event])
-                
-                # Clean up empty event lists
-                if not self._subscribers[event]:
-                    del self._subscribers[event]
-            
-            return removed_count
+            owned = self._subs_by_owner.pop(id(owner), None)
+            if not owned:
+                return 0
+
+            for subscription_id in owned:
+                sub_info = self._subs_by_id.get(subscription_id)
+                if sub_info is not None:
+                    self._remove_subscription(sub_info, owned)
+
+            return len(owned)
             
         finally:
             self._release_lock()
 
+    def _remove_subscription(self, sub_info, owned=None):
+        """
+        Drop a subscription from every index. Must be called with the write lock held.
+
+        Args:
+            sub_info: The subscription to remove
+            owned: The owner's id set if the caller already detached it
+        """
+        subscription_id = sub_info['id']
+        event = sub_info['event']
+        del self._subs_by_id[subscription_id]
+
+        subs = self._subscribers.get(event)
+        if subs is not None:
+            subs.pop(subscription_id, None)
+            if not subs:
+                del self._subscribers[event]
+
+        owner = sub_info['owner']
+        if owner is not None and owned is None:
+            owned = self._subs_by_owner.get(id(owner))
+            if owned is not None:
+                owned.discard(subscription_id)
+                if not owned:
+                    del self._subs_by_owner[id(owner)]
+
+        self._invalidate(event)
+
     def unsubscribe_all(self, event):
         """
         Remove all subscribers for a specific event.
@@ -147,39 +1283,316 @@ class EventStore(object):
         Returns:
             int: Number of subscribers removed
         """
+        event = self.event_name(event)
         self._acquire_lock()
         try:
-            if event in self._subscribers:
-                count = len(self._subscribers[event])
-                del self._subscribers[event]
-                return count
-            return 0
+            subs = self._subscribers.get(event)
+            if not subs:
+                return 0
+
+            removed = list(subs.values())
+            for sub_info in removed:
+                self._remove_subscription(sub_info)
+            return len(removed)
             
         finally:
             self._release_lock()
 
+    def deactivate_owner(self, owner):
+        """
+        Mark all subscriptions of an owner inactive without removing them.
+
+        Args:
+            owner: The owner object
+
+        Returns:
+            int: Number of subscriptions deactivated
+        """
+        self._acquire_lock()
+        try:
+            count = 0
+            for subscription_id in self._subs_by_owner.get(id(owner), ()):
+                sub_info = self._subs_by_id[subscription_id]
+                if sub_info['active']:
+                    sub_info['active'] = False
+                    self._invalidate(sub_info['event'])
+                    count += 1
+            return count
+
+        finally:
+            self._release_lock()
+
     def _cleanup_dead_owners(self):
         """
         Clean up subscriptions where owner objects might be dead.
         """
         self._acquire_lock()
         try:
-            for event in list(self._subscribers.keys()):
-                active_subs = []
-                
-                for sub_info in self._subscribers[event]:
-                    # Keep subscriptions that are explicitly active or have no owner
-                    if sub_info['active'] and (sub_info['owner'] is None or self._is_owner_alive(sub_info['owner'])):
-                        active_subs.append(sub_info)
-                
-                if active_subs:
-                    self._subscribers[event] = active_subs
-                else:
-                    del self._subscribers[event]
+            for sub_info in list(self._subs_by_id.values()):
+                # Keep subscriptions that are explicitly active or have no owner
+                if not (sub_info['active'] and self._is_owner_alive(sub_info['owner'])):
+                    self._remove_subscription(sub_info)
                     
         finally:
             self._release_lock()
 
+    def _invalidate(self, event):
+        """
+        Drop cached dispatch tuples after the subscriptions of an event
+        changed. Must be called with the write lock held.
+        """
+        if TopicTrie.is_pattern(event):
+            if self._subscribers.get(event):
+                self._patterns.insert(event)
+            else:
+                self._patterns.remove(event)
+            # A pattern can match any cached event; swap in a fresh cache
+            self._snapshots = {}
+            self._by_handle = [None] * len(self._by_handle)
+        else:
+            if event in self._snapshots:
+                del self._snapshots[event]
+            handle = self._event_ids.get(event)
+            if handle is not None:
+                self._by_handle[handle] = None
+
+    def _resolve(self, event):
+        """
+        Build and cache the dispatch tuple of an event from its exact and
+        wildcard subscriptions.
+
+        Owner liveness is evaluated here, once per subscription change,
+        instead of on every publish.
+        """
+        self._acquire_read()
+        try:
+            subs = list(self._subscribers.get(event, {}).values())
+            if self._patterns.count:
+                for pattern in self._patterns.match(event):
+                    if pattern != event:
+                        subs.extend(self._subscribers.get(pattern, {}).values())
+            # Deliver in subscription order across exact and wildcard subscribers
+            subs.sort(key=lambda sub_info: sub_info['id'])
+
+            snapshot = tuple(
+                sub_info for sub_info in subs
+                if sub_info['active'] and sub_info['callback'] and self._is_owner_alive(sub_info['owner'])
+            )
+            for sub_info in snapshot:
+                if sub_info['where']:
+                    # Filtered subscribers are selected per payload
+                    snapshot = FilterIndex(snapshot)
+                    break
+            # Swapping the dict entry is atomic, publishers see either no
+            # entry or the complete tuple, never a partially built one.
+            self._snapshots[event] = snapshot
+            handle = self._event_ids.get(event)
+            if handle is not None:
+                self._by_handle[handle] = snapshot
+            return snapshot
+        finally:
+            self._release_read()
+
+    def set_sticky(self, event, coalesce=False):
+        """
+        Make an event sticky: the last published payload is kept and
+        delivered to new subscribers as soon as they subscribe.
+
+        Args:
+            event: The event name
+            coalesce: If True, async deliveries still queued for a subscriber
+                are collapsed so it only receives the newest payload
+        """
+        event = self.event_name(event)
+        self._sticky[event] = coalesce
+        if coalesce and self._queue_config.get(event, (0, None))[1] != QUEUE_COALESCE:
+            self.set_queue(event, ASYNC_QUEUE_SIZE, QUEUE_COALESCE)
+
+    def get_last(self, event):
+        """
+        Get the last payload published on a sticky event.
+
+        Returns:
+            The single payload argument, a tuple if several were published,
+            or None if nothing was published yet
+        """
+        args = self._last.get(self.event_name(event))
+        if args is None:
+            return None
+        return args[0] if len(args) == 1 else args
+
+    def _build_call(self, sub_info, max_rate=None, debounce_ms=None, throttle_ms=None):
+        """
+        Build the callable publishers invoke for a subscription.
+
+        Plain subscriptions call the callback directly; UI subscriptions
+        get a small wrapper that queues the callback for the UI thread,
+        and rate limited ones are wrapped in a RateGate.
+        """
+        target = sub_info['callback']
+        if sub_info['ui']:
+            def post_to_ui(event, *args):
+                return self._post_ui(sub_info, event, args)
+            target = post_to_ui
+
+        if max_rate or debounce_ms or throttle_ms:
+            target = sub_info['gate'] = RateGate(
+                target, self._run_later, self._deliver_trailing,
+                max_rate, debounce_ms, throttle_ms)
+        return target
+
+    def _run_later(self, delay_ms, func, args=(), inline=False):
+        """Schedule func(*args) on the bus timer thread (see TimerQueue.schedule)."""
+        timers = self._timers
+        if timers is None:
+            timers = self._timers = TimerQueue(self._submit_job)
+        timers.schedule(delay_ms, func, args, inline)
+
+    def _submit_job(self, func, args):
+        """Hand a due timer job to the worker pool, or run it inline if full."""
+        pool = self._pool or self._start_pool()
+        if not pool.submit(func, args):
+            func(*args)
+
+    def _deliver_trailing(self, target, event, args):
+        return self._safe_callback_execution(target, event, args, True)
+
+    def _post_ui(self, sub_info, event, args):
+        """Queue a UI subscription's callback on the UI dispatcher."""
+        dispatcher = self._ui_dispatcher
+        if dispatcher is None:
+            # No UI loop registered (yet), run in the caller's thread
+            return self._deliver_ui(sub_info, event, args)
+
+        config = self._queue_config.get(event)
+        priority = config[3] if config else PRIORITY_DATA
+        # Coalesced sticky events keep a single queued entry per subscriber.
+        # Their payload stays referenced by the sticky store, so only
+        # unkeyed posts hold a reference on pooled payloads.
+        if self._sticky.get(event):
+            return dispatcher((event, sub_info['id']), self._deliver_ui, (sub_info, event, args), priority)
+        retain_args(args)
+        if dispatcher(None, self._deliver_ui, (sub_info, event, args, True), priority):
+            return True
+        release_args(args)
+        return False
+
+    def _deliver_ui(self, sub_info, event, args, release=False):
+        """Run a UI callback, releasing the payload references the queue held."""
+        try:
+            if self._breaker_config is not None:
+                return self._guarded_execution(sub_info, sub_info['callback'], event, args)
+            return self._safe_callback_execution(sub_info['callback'], event, args, True)
+        finally:
+            if release:
+                release_args(args)
+
+    def set_ui_dispatcher(self, dispatcher):
+        """
+        Register the UI thread queue used by ui=True subscriptions.
+
+        Args:
+            dispatcher: Callable dispatcher(key, func, args, priority) that
+                runs func(*args) on the UI thread, more urgent PRIORITY_*
+                classes first. Entries posted with the same non-None key
+                before they run may be merged, keeping the newest args.
+                Entries it discards unrun go to drop_ui_call(). None to
+                call UI callbacks directly again.
+        """
+        self._ui_dispatcher = dispatcher
+
+    def call_on_ui(self, func, *args, priority=PRIORITY_DATA):
+        """Run func(*args) on the UI thread, or right away if no dispatcher is set."""
+        dispatcher = self._ui_dispatcher
+        if dispatcher is None:
+            return func(*args)
+        return dispatcher(None, func, args, priority)
+
+    def drop_ui_call(self, func, args):
+        """Release the payload a UI dispatcher entry held when it is discarded unrun."""
+        if func == self._deliver_ui and len(args) == 4 and args[3]:
+            release_args(args[2])
+
+    def request(self, event, payload=None, timeout_ms=1000):
+        """
+        Publish a request and get a future for the reply.
+
+        Responders receive a Request carrying the payload and a correlation
+        id, and answer with request.reply(value) from any thread, now or
+        later. Responders run on the async workers.
+
+        Args:
+            event: The event name or handle
+            payload: Request argument passed to responders
+            timeout_ms: Resolve the future as TIMED_OUT after this long
+
+        Returns:
+            Future: Resolved by the first reply, the timeout, or right away
+            as NO_RESPONDER if nobody could be reached
+        """
+        event = self.event_name(event)
+        with self._request_lock:
+            self._request_counter += 1
+            request_id = self._request_counter
+        future = Future(request_id, event)
+        self._requests[request_id] = future
+
+        if self.publish_async(event, Request(request_id, payload, self)) > 0:
+            # On the timer thread: a worker may be the one blocked in wait()
+            self._run_later(timeout_ms, self._complete, (request_id, Future.TIMED_OUT, None), True)
+        else:
+            self._complete(request_id, Future.NO_RESPONDER, None)
+        return future
+
+    def reply(self, request_id, value=None):
+        """
+        Answer a request by its correlation id.
+
+        Returns:
+            bool: False if the request was already answered or timed out
+        """
+        return self._complete(request_id, Future.REPLIED, value)
+
+    def _complete(self, request_id, status, value):
+        future = self._requests.pop(request_id, None)
+        if future is None:
+            return False
+        return future._resolve(status, value)
+
+    def respond(self, event, handler, owner=None):
+        """
+        Answer requests on an event with handler(payload).
+
+        The return value is sent as the reply; an exception resolves the
+        request as FAILED with the exception as its value.
+
+        Returns:
+            subscription_id: As returned by subscribe()
+        """
+        def responder(event, request):
+            if not isinstance(request, Request):
+                return None
+            try:
+                value = handler(request.payload)
+            except Exception as e:
+                self._complete(request.id, Future.FAILED, e)
+                raise
+            return request.reply(value)
+        return self.subscribe(event, responder, owner)
+
+    def _replay_sticky(self, event, sub_info):
+        """Deliver stored sticky payloads matching a new subscription."""
+        if TopicTrie.is_pattern(event):
+            trie = TopicTrie()
+            trie.insert(event)
+            names = [name for name in list(self._last.keys()) if trie.match(name)]
+        else:
+            names = [event] if event in self._last else []
+
+        for name in names:
+            args = self._last.get(name)
+            if args is not None and (not sub_info['where'] or _matches_where(sub_info['where'], args)):
+                self._safe_callback_execution(sub_info['call'], name, args, False)
 
     def _is_owner_alive(self, owner):
         """
@@ -201,31 +1614,6 @@ class EventStore(object):
         except:
             return False
     
-    def _get_active_callbacks(self, event):
-        """Get all active callbacks for an event."""
-        if event not in self._subscribers:
-            return []
-        
-        active_callbacks = []
-        dead_subscriptions = []
-        
-        for sub_info in self._subscribers[event]:
-            if sub_info['active'] and sub_info['callback']:
-                # Check if owner is still alive (if specified)
-                if sub_info['owner'] is None or self._is_owner_alive(sub_info['owner']):
-                    active_callbacks.append(sub_info['callback'])
-                else:
-                    dead_subscriptions.append(sub_info['id'])
-        
-        # Remove dead subscriptions
-        if dead_subscriptions:
-            self._subscribers[event] = [
-                sub for sub in self._subscribers[event] 
-                if sub['id'] not in dead_subscriptions
-            ]
-        
-        return active_callbacks
-    
     def publish_async(self, event, *args):
         """
         Publish an event asynchronously to all subscribers.
@@ -235,33 +1623,181 @@ class EventStore(object):
             *args: Arguments to pass to callbacks
             
         Returns:
-            int: Number of callbacks executed
+            int: Number of callbacks queued, or QUEUE_FULL if the event's
+            queue had to reject at least one of them
         """
-        self._acquire_lock()
-        try:
-            callbacks = self._get_active_callbacks(event)
-        finally:
-            self._release_lock()
-        
-        if not callbacks:
+        if type(event) is int:
+            subs = self._by_handle[event]
+            event = self._event_names[event]
+        else:
+            subs = self._snapshots.get(event)
+
+        if self._tracer is not None:
+            self._tracer.record(event, args, True)
+
+        if event in self._sticky:
+            self._last[event] = args
+
+        if self._stats is not None:
+            self._count_publish(event)
+
+        if subs is None:
+            subs = self._resolve(event)
+        if type(subs) is FilterIndex:
+            subs = subs.select(args)
+        if not subs:
             return 0
         
+        pool = self._pool or self._start_pool()
+        queue = self._queues.get(event)
+
         executed_count = 0
-        for callback in callbacks:
-            try:
-                _thread.start_new_thread(self._safe_callback_execution, 
-                                       (callback, event, args, True))
+        rejected = False
+        for sub_info in subs:
+            if sub_info['ui']:
+                # Already deferred to the UI thread, skip the worker hop.
+                # A rate limited one still goes through its gate first.
+                if sub_info['gate'] is None:
+                    self._post_ui(sub_info, event, args)
+                else:
+                    self._safe_callback_execution(sub_info['call'], event, args, True)
                 executed_count += 1
-            except Exception as e:
-                if self.log:
-                    self.log.error("Failed to start async thread for event '{}': {}".format(event, e))
+            else:
+                retain_args(args)
+                if pool.submit(self._deliver_async, (sub_info, event, args), queue, sub_info['id']):
+                    executed_count += 1
                 else:
-                    print("Failed to start async thread for event '{}': {}".format(event, e))
+                    release_args(args)
+                    rejected = True
+
+        if rejected:
+            if self.log:
+                self.log.error("Async queue full, dropped callback for event '{}'".format(event))
+            else:
+                print("Async queue full, dropped callback for event '{}'".format(event))
         
         if self.log:
             self.log.info("ASYNC executed event '{}' with {} callbacks".format(event, executed_count))
         
-        return executed_count
+        return QUEUE_FULL if rejected else executed_count
+
+    def _start_pool(self):
+        """Create and start the async dispatcher on first use."""
+        self._acquire_lock()
+        try:
+            if self._pool is None:
+                workers, stack_size, queue_size = self._pool_config
+                pool = DispatchPool(workers, stack_size, queue_size)
+                pool.on_drop = self._drop_job
+                pool.run_later = self._run_later
+                queues = {}
+                for event, config in self._queue_config.items():
+                    queues[event] = pool.add_queue(event, *config)
+                pool.start()
+                self._queues = queues
+                self._pool = pool
+            return self._pool
+        finally:
+            self._release_lock()
+
+    def configure_async(self, workers=ASYNC_WORKERS, stack_size=ASYNC_STACK_SIZE, queue_size=ASYNC_QUEUE_SIZE):
+        """
+        Configure the async dispatcher pool.
+
+        Takes effect immediately; a running pool is stopped after it has
+        drained the jobs it already holds.
+
+        Args:
+            workers: Number of worker threads
+            stack_size: Stack size of each worker in bytes (0 for platform default)
+            queue_size: Maximum number of pending async callbacks
+        """
+        self._acquire_lock()
+        try:
+            old_pool = self._pool
+            self._pool_config = (workers, stack_size, queue_size)
+            self._pool = None
+        finally:
+            self._release_lock()
+        if old_pool:
+            old_pool.stop()
+
+    def set_queue(self, event, maxlen=ASYNC_QUEUE_SIZE, policy=QUEUE_DROP_NEWEST, timeout_ms=0, priority=None):
+        """
+        Give an event its own bounded async queue.
+
+        Args:
+            event: The event name
+            maxlen: Maximum queued callbacks for this event
+            policy: QUEUE_BLOCK, QUEUE_DROP_OLDEST, QUEUE_DROP_NEWEST or QUEUE_COALESCE
+            timeout_ms: How long QUEUE_BLOCK waits for room before dropping
+            priority: PRIORITY_* class of the event, None keeps the current one
+        """
+        event = self.event_name(event)
+        self._acquire_lock()
+        try:
+            if priority is None:
+                priority = self._queue_config.get(event, (0, 0, 0, PRIORITY_DATA))[3]
+            self._configure_queue(event, (maxlen, policy, timeout_ms, priority))
+        finally:
+            self._release_lock()
+
+    def set_priority(self, event, priority):
+        """
+        Set the delivery priority of an event's async callbacks.
+
+        Args:
+            event: The event name
+            priority: PRIORITY_INPUT, PRIORITY_STATE, PRIORITY_DATA or
+                PRIORITY_HOUSEKEEPING
+        """
+        if not 0 <= priority < len(PRIORITY_NAMES):
+            raise ValueError("Invalid priority: {}".format(priority))
+        event = self.event_name(event)
+        self._acquire_lock()
+        try:
+            config = self._queue_config.get(event, (ASYNC_QUEUE_SIZE, QUEUE_DROP_NEWEST, 0, priority))
+            self._configure_queue(event, config[:3] + (priority,))
+        finally:
+            self._release_lock()
+
+    def _configure_queue(self, event, config):
+        """Store an event's queue settings and apply them to the running pool. Lock must be held."""
+        self._queue_config[event] = config
+        if self._pool is None:
+            return
+        queue = self._queues.get(event)
+        if queue is None:
+            queues = dict(self._queues)
+            queues[event] = self._pool.add_queue(event, *config)
+            self._queues = queues
+        else:
+            queue.maxlen, queue.policy, queue.timeout_ms, queue.priority = config
+
+    def queue_stats(self):
+        """
+        Get async queue counters.
+
+        Returns:
+            dict: Per queue (event name, None for the default queue) depth,
+            max_depth, maxlen, policy, queued, dropped_oldest,
+            dropped_newest and coalesced counts
+        """
+        return self._pool.queue_stats() if self._pool else {}
+
+    def priority_stats(self):
+        """
+        Get async queue wait latency per priority class.
+
+        Returns:
+            dict: priority name -> count, avg_us, max_us and missed (jobs
+            started after their deadline)
+        """
+        return self._pool.priority_stats() if self._pool else {}
+
+    def async_queue_depth(self):
+        """Number of async callbacks waiting for a worker."""
+        return self._pool.queue_depth() if self._pool else 0
     
     def publish_sync(self, event, *args):
         """
@@ -274,65 +1810,348 @@ class EventStore(object):
         Returns:
             list: List of results from all callbacks
         """
-        self._acquire_lock()
-        try:
-            callbacks = self._get_active_callbacks(event)
-        finally:
-            self._release_lock()
-        
-        results = []
-        for callback in callbacks:
-            result = self._safe_callback_execution(callback, event, args, False)
-            results.append(result)
+        # Lock-free: the snapshot tuple is never mutated in place
+        if type(event) is int:
+            subs = self._by_handle[event]
+            event = self._event_names[event]
+        else:
+            subs = self._snapshots.get(event)
+
+        if self._tracer is not None:
+            self._tracer.record(event, args, False)
+
+        if event in self._sticky:
+            self._last[event] = args
+
+        if subs is None:
+            subs = self._resolve(event)
+        if type(subs) is FilterIndex:
+            subs = subs.select(args)
+
+        if self._stats is None and self._breaker_config is None:
+            if not subs:
+                return []
+            results = [self._safe_callback_execution(sub_info['call'], event, args, False)
+                       for sub_info in subs]
+        else:
+            if self._stats is not None:
+                self._count_publish(event)
+            if not subs:
+                return []
+            results = [self._deliver(sub_info, event, args, False)
+                       for sub_info in subs]
         
         if self.log:
-            self.log.info("SYNC executed event '{}' with {} callbacks".format(event, len(callbacks)))
+            self.log.info("SYNC executed event '{}' with {} callbacks".format(event, len(subs)))
         
         return results
+
+    def _deliver_async(self, sub_info, event, args):
+        """Worker side of publish_async: deliver, then release the payload."""
+        try:
+            return self._deliver(sub_info, event, args, True)
+        finally:
+            release_args(args)
+
+    def _drop_job(self, func, args):
+        """Release the payload of an async delivery the pool discarded."""
+        if func == self._deliver_async:
+            release_args(args[2])
+
+    def _deliver(self, sub_info, event, args, is_async):
+        """Execute one subscription, measured if instrumentation is on."""
+        if self._breaker_config is not None and not sub_info['ui']:
+            # UI subscriptions are guarded where they run, on the UI thread
+            return self._guarded_execution(sub_info, sub_info['call'], event, args)
+        if self._stats is None:
+            return self._safe_callback_execution(sub_info['call'], event, args, is_async)
+        return self._measured_execution(sub_info, event, args, is_async)
+
+    def _call(self, callback, event, args):
+        # Support both old signature (event, msg) and new signature
+        if len(args) == 1:
+            # Old signature: callback(event, msg)
+            return callback(event, args[0])
+        elif len(args) == 0:
+            # Just event
+            return callback(event)
+        else:
+            # Multiple arguments: callback(event, arg1, arg2, ...)
+            return callback(event, *args)
+
+    def _log_callback_error(self, event, e):
+        error_msg = "Error executing callback for event '{}': {}".format(event, e)
+        if self.log:
+            self.log.error(error_msg)
+        else:
+            print(error_msg)
     
     def _safe_callback_execution(self, callback, event, args, is_async):
         """Safely execute a callback with error handling and logging."""
         try:
-            # Support both old signature (event, msg) and new signature
-            if len(args) == 1:
-                # Old signature: callback(event, msg)
-                result = callback(event, args[0])
-            elif len(args) == 0:
-                # Just event
-                result = callback(event)
-            else:
-                # Multiple arguments: callback(event, arg1, arg2, ...)
-                result = callback(event, *args)
-            
-            return result
-            
+            return self._call(callback, event, args)
         except Exception as e:
-            error_msg = "Error executing callback for event '{}': {}".format(event, e)
-            if self.log:
-                self.log.error(error_msg)
-            else:
-                print(error_msg)
+            self._log_callback_error(event, e)
+            return None
+
+    def _measured_execution(self, sub_info, event, args, is_async):
+        """Execute a callback and record its latency and outcome."""
+        result = None
+        failed = False
+        start = time.ticks_us()
+        try:
+            result = self._call(sub_info['call'], event, args)
+        except Exception as e:
+            failed = True
+            self._log_callback_error(event, e)
+        self._record_call(sub_info, event, time.ticks_diff(time.ticks_us(), start), failed)
+        return result
+
+    def _record_call(self, sub_info, event, elapsed, failed):
+        sub_stats = sub_info.get('stats')
+        if sub_stats is None:
+            # calls, errors, total_us, max_us, histogram
+            sub_stats = sub_info['stats'] = [0, 0, 0, 0, [0] * STATS_BUCKETS]
+
+        if failed:
+            sub_stats[1] += 1
+        sub_stats[0] += 1
+        sub_stats[2] += elapsed
+        if elapsed > sub_stats[3]:
+            sub_stats[3] = elapsed
+            if elapsed > self._slowest[1]:
+                self._slowest = (sub_info['id'], elapsed, event)
+
+        bucket = 0
+        while elapsed > 1 and bucket < STATS_BUCKETS - 1:
+            elapsed >>= 1
+            bucket += 1
+        sub_stats[4][bucket] += 1
+
+    def _guarded_execution(self, sub_info, callback, event, args, quarantined=False):
+        """Execute a callback behind its subscription's circuit breaker."""
+        config = self._breaker_config
+        breaker = sub_info.get('breaker')
+        if breaker is None:
+            if config is None:
+                return self._safe_callback_execution(callback, event, args, True)
+            slow_state = BREAKER_OPEN if sub_info['ui'] else BREAKER_QUARANTINED
+            breaker = sub_info['breaker'] = Breaker(*config, slow_state=slow_state)
+
+        lane = breaker.lane()
+        if lane == BREAKER_OPEN:
+            breaker.skipped += 1
             return None
+        if lane == BREAKER_QUARANTINED and not quarantined:
+            # Keep the slow callback off the publisher's and the main workers' path
+            pool = self._pool or self._start_pool()
+            retain_args(args)
+            if not pool.submit(self._deliver_quarantined, (sub_info, callback, event, args),
+                               self._queues.get(QUARANTINE_QUEUE)):
+                release_args(args)
+                breaker.skipped += 1
+            return None
+
+        result = None
+        failed = False
+        start = time.ticks_us()
+        try:
+            result = self._call(callback, event, args)
+        except Exception as e:
+            failed = True
+            self._log_callback_error(event, e)
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+
+        if self._stats is not None:
+            self._record_call(sub_info, event, elapsed, failed)
+        if breaker.record(elapsed, failed) is not None and event != BREAKER_EVENT:
+            self._report_trip(sub_info, breaker)
+        return result
+
+    def _deliver_quarantined(self, sub_info, callback, event, args):
+        try:
+            return self._guarded_execution(sub_info, callback, event, args, True)
+        finally:
+            release_args(args)
+
+    def _report_trip(self, sub_info, breaker):
+        info = {
+            'id': sub_info['id'],
+            'event': sub_info['event'],
+            'state': BREAKER_STATES[breaker.state],
+            'trips': breaker.trips,
+            'backoff_ms': breaker.backoff,
+        }
+        message = "Subscription {} on '{}' {} for {} ms".format(
+            info['id'], info['event'], info['state'], info['backoff_ms'])
+        if self.log:
+            self.log.warning(message)
+        else:
+            print(message)
+        self.publish_async(BREAKER_EVENT, info)
+
+    def configure_breaker(self, enabled=True, max_errors=3, latency_ms=50, slow_calls=3,
+                          backoff_ms=1000, max_backoff_ms=60000):
+        """
+        Turn per-subscription circuit breakers on or off.
+
+        When on, every callback is timed. A subscription that fails
+        max_errors times in a row is skipped for a backoff period; one
+        that takes longer than latency_ms slow_calls times in a row is
+        moved to the low priority quarantine queue for that period (UI
+        callbacks are skipped instead). The backoff doubles with every
+        trip up to max_backoff_ms. Each trip is published on
+        "eventstore.breaker" with the subscription id, event, state,
+        trips and backoff_ms.
+
+        Args:
+            enabled: Guard callbacks with breakers
+            max_errors: Failures in a row that open the breaker
+            latency_ms: Latency budget of one callback
+            slow_calls: Calls over budget in a row that quarantine it
+            backoff_ms: First backoff period
+            max_backoff_ms: Longest backoff period
+        """
+        if not enabled:
+            self._breaker_config = None
+            for sub_info in list(self._subs_by_id.values()):
+                sub_info.pop('breaker', None)
+            return
+        if QUARANTINE_QUEUE not in self._queue_config:
+            self.set_queue(QUARANTINE_QUEUE, ASYNC_QUEUE_SIZE, QUEUE_DROP_OLDEST, 0, PRIORITY_HOUSEKEEPING)
+        self._breaker_config = (max_errors, latency_ms, slow_calls, backoff_ms, max_backoff_ms)
+        for sub_info in list(self._subs_by_id.values()):
+            sub_info.pop('breaker', None)
+
+    def breaker_stats(self):
+        """
+        Get circuit breaker state per subscription.
+
+        Returns:
+            dict: subscription id -> event, state, trips, skipped and
+            backoff_ms, for subscriptions that have been called since
+            breakers were enabled
+        """
+        result = {}
+        for sub_info in list(self._subs_by_id.values()):
+            breaker = sub_info.get('breaker')
+            if breaker is not None:
+                entry = result[sub_info['id']] = breaker.stats()
+                entry['event'] = sub_info['event']
+        return result
+
+    def _count_publish(self, event):
+        stats = self._stats
+        stats[event] = stats.get(event, 0) + 1
+
+        if self._stats_interval and event != STATS_EVENT:
+            now = time.ticks_ms()
+            if time.ticks_diff(now, self._stats_last) >= self._stats_interval:
+                self._stats_last = now
+                self.publish_async(STATS_EVENT, self.stats())
+
+    def enable_stats(self, enabled=True, summary_interval_ms=0):
+        """
+        Turn dispatch instrumentation on or off.
+
+        When off, publishing only pays for one attribute check.
+
+        Args:
+            enabled: Record publish counts and callback latencies
+            summary_interval_ms: If non-zero, publish a stats() summary on
+                STATS_EVENT at most this often (checked on publish)
+        """
+        if enabled:
+            if self._stats is None:
+                self._slowest = (None, 0, None)
+                self._stats = {}
+            self._stats_interval = summary_interval_ms
+            self._stats_last = time.ticks_ms()
+        else:
+            self._stats = None
+            self._stats_interval = 0
+
+    def reset_stats(self):
+        """Clear all recorded counters and histograms."""
+        if self._stats is not None:
+            self._stats = {}
+        self._slowest = (None, 0, None)
+        for sub_info in list(self._subs_by_id.values()):
+            sub_info.pop('stats', None)
+        if self._pool:
+            self._pool.reset_priority_stats()
+
+    def stats(self):
+        """
+        Get dispatch instrumentation counters.
+
+        Returns:
+            dict: 'events' maps event names to publish counts, 'subscriptions'
+            maps subscription IDs to calls, errors, avg_us, max_us and the
+            log2 latency histogram, and 'slowest' is the slowest callback seen
+            as (subscription_id, us, event). None if instrumentation is off.
+        """
+        if self._stats is None:
+            return None
+
+        subscriptions = {}
+        for sub_info in list(self._subs_by_id.values()):
+            sub_stats = sub_info.get('stats')
+            if sub_stats is None:
+                continue
+            calls = sub_stats[0]
+            entry = subscriptions[sub_info['id']] = {
+                'event': sub_info['event'],
+                'calls': calls,
+                'errors': sub_stats[1],
+                'avg_us': sub_stats[2] // calls if calls else 0,
+                'max_us': sub_stats[3],
+                'hist': list(sub_stats[4]),
+            }
+            gate = sub_info['gate']
+            if gate is not None:
+                entry['passed'] = gate.passed
+                entry['suppressed'] = gate.suppressed
+
+        return {
+            'events': dict(self._stats),
+            'subscriptions': subscriptions,
+            'slowest': self._slowest,
+        }
     
     def get_subscriber_count(self, event):
         """Get the number of active subscribers for an event."""
-        self._acquire_lock()
-        try:
-            return len(self._get_active_callbacks(event))
-        finally:
-            self._release_lock()
+        event = self.event_name(event)
+        subs = self._snapshots.get(event)
+        if subs is None:
+            subs = self._resolve(event)
+        return len(subs)
     
     def get_all_events(self):
         """Get a list of all events that have subscribers."""
-        self._acquire_lock()
+        self._acquire_read()
         try:
             return [event for event, subs in self._subscribers.items() if subs]
         finally:
-            self._release_lock()
+            self._release_read()
     
     def set_log(self, log_adapter):
         """Set the log adapter for logging."""
         self.log = log_adapter
+
+    def set_tracer(self, tracer):
+        """
+        Attach a trace recorder that sees every publish, or None to detach.
+
+        Args:
+            tracer: Object with a record(event, args, is_async) method,
+                e.g. Eventtrace.TraceRecorder
+        """
+        self._tracer = tracer
+
+    def lock_stats(self):
+        """Get lock contention counters (blocked acquires and wait times in us)."""
+        return self._lock.stats()
     
     def cleanup(self):
         """Manual cleanup of dead subscriptions - call periodically"""
@@ -342,23 +2161,24 @@ class EventStore(object):
     
     def debug_info(self):
         """Print debug information about current subscriptions"""
-        self._acquire_lock()
+        self._acquire_read()
         try:
             print("=== EventStore Debug Info ===")
             for event, subs in self._subscribers.items():
                 print("Event '{}': {} subscribers".format(event, len(subs)))
-                for sub in subs:
+                for sub in subs.values():
                     owner_info = "owner={}".format(type(sub['owner']).__name__ if sub['owner'] else "None")
                     print("  - {} ({})".format(sub['id'], owner_info))
         finally:
-            self._release_lock()
+            self._release_read()
 
 
 # Global instance and convenience functions
 my_eventstore = EventStore()
 # my_eventstore.set_log(event_log)
 
-def subscribe(event, callback, owner=None):
+def subscribe(event, callback, owner=None, ui=False,
+              max_rate=None, debounce_ms=None, throttle_ms=None, where=None):
     """
     Subscribe to an event with a callback function.
     
@@ -366,11 +2186,17 @@ def subscribe(event, callback, owner=None):
         event: The event name to subscribe to
         callback: The callback function to execute
         owner: Optional owner object for tracking (recommended)
+        ui: Queue the callback to run on the UI thread
+        max_rate: Deliver at most this many events per second
+        debounce_ms: Deliver only after the event has been quiet this long
+        throttle_ms: Deliver at most once per window, newest event trailing
+        where: Dict of payload field conditions, values or prefix(...)
         
     Returns:
         subscription_id: Unique identifier for this subscription
     """
-    return my_eventstore.subscribe(event, callback, owner)
+    return my_eventstore.subscribe(event, callback, owner, ui,
+                                   max_rate, debounce_ms, throttle_ms, where)
 
 def unsubscribe(event, subscription_id):
     """Unsubscribe from an event using the subscription ID."""
@@ -380,6 +2206,14 @@ def unsubscribe_by_owner(owner):
     """Remove all subscriptions belonging to a specific owner."""
     return my_eventstore.unsubscribe_by_owner(owner)
 
+def register(event):
+    """Register an event name and get its integer handle."""
+    return my_eventstore.register(event)
+
+def event_name(event):
+    """Get the name of an event handle."""
+    return my_eventstore.event_name(event)
+
 def publish(event, *args):
     """Publish event synchronously (default behavior)."""
     return publish_sync(event, *args)
@@ -392,6 +2226,84 @@ def publish_sync(event, *args):
     """Publish event synchronously to all subscribers."""
     return my_eventstore.publish_sync(event, *args)
 
+def set_sticky(event, coalesce=False):
+    """Keep the last payload of an event and replay it to new subscribers."""
+    my_eventstore.set_sticky(event, coalesce)
+
+def get_last(event):
+    """Get the last payload published on a sticky event."""
+    return my_eventstore.get_last(event)
+
+def enable_stats(enabled=True, summary_interval_ms=0):
+    """Turn dispatch instrumentation on or off."""
+    my_eventstore.enable_stats(enabled, summary_interval_ms)
+
+def stats():
+    """Get dispatch instrumentation counters."""
+    return my_eventstore.stats()
+
+def reset_stats():
+    """Clear all recorded counters and histograms."""
+    my_eventstore.reset_stats()
+
+def configure_async(workers=ASYNC_WORKERS, stack_size=ASYNC_STACK_SIZE, queue_size=ASYNC_QUEUE_SIZE):
+    """Configure the worker pool used by publish_async."""
+    my_eventstore.configure_async(workers, stack_size, queue_size)
+
+def set_queue(event, maxlen=ASYNC_QUEUE_SIZE, policy=QUEUE_DROP_NEWEST, timeout_ms=0, priority=None):
+    """Give an event its own bounded async queue with an overflow policy."""
+    my_eventstore.set_queue(event, maxlen, policy, timeout_ms, priority)
+
+def set_priority(event, priority):
+    """Set the delivery priority of an event's async callbacks."""
+    my_eventstore.set_priority(event, priority)
+
+def priority_stats():
+    """Get async queue wait latency per priority class."""
+    return my_eventstore.priority_stats()
+
+def queue_stats():
+    """Get async queue counters."""
+    return my_eventstore.queue_stats()
+
+def async_queue_depth():
+    """Number of async callbacks waiting for a worker."""
+    return my_eventstore.async_queue_depth()
+
+def set_ui_dispatcher(dispatcher):
+    """Register the UI thread queue used by ui=True subscriptions."""
+    my_eventstore.set_ui_dispatcher(dispatcher)
+
+def call_on_ui(func, *args, priority=PRIORITY_DATA):
+    """Run func(*args) on the UI thread."""
+    return my_eventstore.call_on_ui(func, *args, priority=priority)
+
+def drop_ui_call(func, args):
+    """Release the payload of a UI dispatcher entry discarded unrun."""
+    my_eventstore.drop_ui_call(func, args)
+
+def request(event, payload=None, timeout_ms=1000):
+    """Publish a request and get a Future for the reply."""
+    return my_eventstore.request(event, payload, timeout_ms)
+
+def reply(request_id, value=None):
+    """Answer a request by its correlation id."""
+    return my_eventstore.reply(request_id, value)
+
+def respond(event, handler, owner=None):
+    """Answer requests on an event with handler(payload)."""
+    return my_eventstore.respond(event, handler, owner)
+
+def configure_breaker(enabled=True, max_errors=3, latency_ms=50, slow_calls=3,
+                      backoff_ms=1000, max_backoff_ms=60000):
+    """Turn per-subscription circuit breakers on or off."""
+    my_eventstore.configure_breaker(enabled, max_errors, latency_ms, slow_calls,
+                                    backoff_ms, max_backoff_ms)
+
+def breaker_stats():
+    """Get circuit breaker state per subscription."""
+    return my_eventstore.breaker_stats()
+
 def set_log(log_adapter):
     """Set the log adapter for logging."""
     my_eventstore.set_log(log_adapter)
@@ -400,6 +2312,18 @@ def get_subscriber_count(event):
     """Get the number of active subscribers for an event."""
     return my_eventstore.get_subscriber_count(event)
 
+def deactivate_owner(owner):
+    """Mark all subscriptions of an owner inactive."""
+    return my_eventstore.deactivate_owner(owner)
+
+def set_tracer(tracer):
+    """Attach a trace recorder to the global event store."""
+    my_eventstore.set_tracer(tracer)
+
+def lock_stats():
+    """Get lock contention counters of the global event store."""
+    return my_eventstore.lock_stats()
+
 def cleanup():
     """Manual cleanup of dead subscriptions - call periodically"""
     my_eventstore.cleanup()
@@ -0,0 +1,270 @@
+'''
+File: Eventtrace.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 10:12:40
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import _thread
+import struct
+import time
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+try:
+    from ubinascii import crc32
+except ImportError:
+    from binascii import crc32
+
+from usr.Eventstore import EventStore, retain_args, release_args
+
+# Record layout: ticks_ms, thread id, event index, flags, arg count, payload digest
+RECORD_FMT = "<IIHBBI"
+RECORD_SIZE = struct.calcsize(RECORD_FMT)
+
+FLAG_ASYNC = 0x01
+FLAG_PAYLOAD = 0x02
+
+TRACE_MAGIC = b"EVTR"
+TRACE_VERSION = 1
+
+
+def _crc(value, crc):
+    """Fold value into crc, each value preceded by a type tag and its length."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # Payload buffers go in as they are, no copy
+        return crc32(value, crc32(struct.pack("<BI", 0x62, len(value)), crc))
+    if isinstance(value, str):
+        value = value.encode()
+        return crc32(value, crc32(struct.pack("<BI", 0x73, len(value)), crc))
+    if value is None or isinstance(value, (bool, int, float)):
+        value = repr(value).encode()
+        return crc32(value, crc32(struct.pack("<BI", 0x6E, len(value)), crc))
+    if isinstance(value, (list, tuple)):
+        crc = crc32(struct.pack("<BI", 0x6C, len(value)), crc)
+        for item in value:
+            crc = _crc(item, crc)
+        return crc
+    if isinstance(value, dict):
+        crc = crc32(struct.pack("<BI", 0x64, len(value)), crc)
+        for key in sorted(value, key=str):
+            crc = _crc(value[key], _crc(key, crc))
+        return crc
+    # Objects by type and public fields
+    fields = getattr(value, "__dict__", None)
+    if fields is None:
+        fields = dict((name, getattr(value, name, None))
+                      for name in getattr(type(value), "__slots__", ()))
+    crc = _crc(type(value).__name__, crc32(struct.pack("<BI", 0x6F, 0), crc))
+    return _crc(dict((name, field) for name, field in fields.items()
+                     if not name.startswith("_")), crc)
+
+
+def _digest(args):
+    """
+    32 bit fingerprint of the publish arguments: CRC32 of their content,
+    the same in every process and on every port, unlike hash() (salted
+    for str) or repr() of objects (their address).
+    """
+    return _crc(args, 0) & 0xFFFFFFFF
+
+
+class TraceRecorder(object):
+    """
+    Fixed-size ring buffer of publish records.
+
+    Each publish costs one struct.pack_into into a preallocated buffer,
+    plus a CRC32 digest of the payload so traces can still be compared.
+    Payloads are only kept when capture_payloads is set; pooled ones
+    (e.g. received MQTT messages) are retained until their slot is
+    overwritten or clear() is called, so they are not reused meanwhile.
+    """
+    def __init__(self, capacity=512, capture_payloads=False):
+        self.capacity = capacity
+        self.capture_payloads = capture_payloads
+        self.enabled = True
+        self.total = 0  # Records written since start, including overwritten ones
+        self._buf = bytearray(capacity * RECORD_SIZE)
+        self._payloads = [None] * capacity if capture_payloads else None
+        self._names = []
+        self._name_index = {}
+        self._head = 0
+        self._lock = _thread.allocate_lock()
+
+    def record(self, event, args, is_async):
+        """Store one publish. Called by EventStore on every publish."""
+        if not self.enabled:
+            return
+
+        index = self._name_index.get(event)
+        flags = FLAG_ASYNC if is_async else 0
+        digest = _digest(args)
+        released = None
+        with self._lock:
+            if index is None:
+                index = len(self._names)
+                self._names.append(event)
+                self._name_index[event] = index
+
+            slot = self._head
+            if self._payloads is not None:
+                released = self._payloads[slot]
+                retain_args(args)
+                self._payloads[slot] = args
+                flags |= FLAG_PAYLOAD
+            struct.pack_into(RECORD_FMT, self._buf, slot * RECORD_SIZE,
+                             time.ticks_ms(), _thread.get_ident() & 0xFFFFFFFF,
+                             index, flags, len(args), digest)
+            self._head = (slot + 1) % self.capacity
+            self.total += 1
+        if released is not None:
+            release_args(released)
+
+    def clear(self):
+        released = ()
+        with self._lock:
+            self._head = 0
+            self.total = 0
+            if self._payloads is not None:
+                released = self._payloads
+                self._payloads = [None] * self.capacity
+        for args in released:
+            if args is not None:
+                release_args(args)
+
+    def records(self):
+        """
+        Get the buffered records, oldest first.
+
+        Returns:
+            list: (ticks_ms, thread_id, event, flags, digest, args) tuples;
+            args is None when payloads are not captured
+        """
+        with self._lock:
+            count = min(self.total, self.capacity)
+            start = (self._head - count) % self.capacity
+            result = []
+            for i in range(count):
+                slot = (start + i) % self.capacity
+                ticks, tid, index, flags, nargs, digest = struct.unpack_from(
+                    RECORD_FMT, self._buf, slot * RECORD_SIZE)
+                args = self._payloads[slot] if self._payloads is not None else None
+                result.append((ticks, tid, self._names[index], flags, digest, args))
+            return result
+
+    def dump(self, path):
+        """
+        Write the buffered records to a file.
+
+        Format: magic, version, event name table, record count, the packed
+        records, then for each record flagged with a payload its arguments
+        as length-prefixed JSON (repr strings for values JSON can't encode).
+
+        Returns:
+            int: Number of records written
+        """
+        records = self.records()
+        with open(path, "wb") as f:
+            f.write(TRACE_MAGIC)
+            f.write(struct.pack("<BH", TRACE_VERSION, len(self._names)))
+            for name in self._names:
+                encoded = name.encode()
+                f.write(struct.pack("<B", len(encoded)))
+                f.write(encoded)
+
+            f.write(struct.pack("<I", len(records)))
+            for ticks, tid, name, flags, digest, args in records:
+                nargs = len(args) if args is not None else 0
+                f.write(struct.pack(RECORD_FMT, ticks, tid, self._name_index[name],
+                                    flags, nargs, digest))
+
+            for ticks, tid, name, flags, digest, args in records:
+                if not flags & FLAG_PAYLOAD:
+                    continue
+                try:
+                    encoded = json.dumps(list(args)).encode()
+                except (TypeError, ValueError):
+                    encoded = json.dumps([repr(arg) for arg in args]).encode()
+                f.write(struct.pack("<I", len(encoded)))
+                f.write(encoded)
+        return len(records)
+
+
+def load(path):
+    """
+    Read a trace written by TraceRecorder.dump().
+
+    Returns:
+        list: (ticks_ms, thread_id, event, flags, digest, args) tuples
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if data[:4] != TRACE_MAGIC:
+        raise ValueError("Not an event trace: {}".format(path))
+    version, name_count = struct.unpack_from("<BH", data, 4)
+    if version != TRACE_VERSION:
+        raise ValueError("Unsupported trace version: {}".format(version))
+
+    offset = 7
+    names = []
+    for _ in range(name_count):
+        length = data[offset]
+        names.append(bytes(data[offset + 1:offset + 1 + length]).decode())
+        offset += 1 + length
+
+    count = struct.unpack_from("<I", data, offset)[0]
+    offset += 4
+    raw = []
+    for _ in range(count):
+        raw.append(struct.unpack_from(RECORD_FMT, data, offset))
+        offset += RECORD_SIZE
+
+    records = []
+    for ticks, tid, index, flags, nargs, digest in raw:
+        args = None
+        if flags & FLAG_PAYLOAD:
+            length = struct.unpack_from("<I", data, offset)[0]
+            offset += 4
+            args = tuple(json.loads(bytes(data[offset:offset + length]).decode()))
+            offset += length
+        records.append((ticks, tid, names[index], flags, digest, args))
+    return records
+
+
+def replay(trace, store=None, speed=1.0):
+    """
+    Re-drive a recorded session through an event store.
+
+    Args:
+        trace: Path of a dumped trace, or a list of records from load()/records()
+        store: EventStore to publish into; a fresh one is created if None
+        speed: Time scale of the original gaps, e.g. 1.0 for real time,
+            10.0 for ten times faster, 0 to publish back to back
+
+    Returns:
+        EventStore: The store the session was replayed into
+    """
+    if store is None:
+        store = EventStore()
+    records = load(trace) if isinstance(trace, str) else trace
+
+    previous = None
+    for ticks, tid, event, flags, digest, args in records:
+        if speed and previous is not None:
+            gap = time.ticks_diff(ticks, previous)
+            if gap > 0:
+                time.sleep_ms(int(gap / speed))
+        previous = ticks
+
+        args = args or ()
+        if flags & FLAG_ASYNC:
+            store.publish_async(event, *args)
+        else:
+            store.publish_sync(event, *args)
+    return store
@@ -23,7 +23,26 @@ class Config:
         "username": "username",
         "password": "password",
         "ssl_cert": "path/to/mqtt_ca.crt",
-        "subscribe_topic": "test/message"
+        "subscribe_topic": "test/message",
+        "message_pool": 8,          # Reusable records for received messages
+        "route_cache": 32,          # Recent topics cached by the topic router
+        "outbound_queue": 32,       # Messages waiting for the sender thread
+        "batch_bytes": 1024,        # Payload bytes coalesced into one socket write
+        "inflight_window": 8,       # QoS 1 messages sent before their PUBACK arrived
+        "ack_timeout_ms": 10000,    # Resend an unacknowledged QoS 1 message (DUP) after this
+        "max_retransmits": 3,       # Resends before an unacknowledged QoS 1 message fails
+        "reconnect_base_ms": 1000,  # First reconnect backoff, doubled per failure, randomized (full jitter)
+        "reconnect_max_ms": 60000,  # Backoff cap
+        "journal_dir": "/usr/mqtt_journal",  # Store-and-forward journal, None to disable
+        "journal_segment_bytes": 4096,
+        "journal_max_bytes": 65536,
+        "journal_evict": "oldest",  # "oldest" drops old segments, "newest" refuses new messages when full
+        # Persistent session: set clean_session to False and session_file to
+        # e.g. "/usr/mqtt_session" to keep subscriptions and unacknowledged
+        # QoS 1 messages across reconnects and reboots
+        "clean_session": True,
+        "session_file": None,       # Session record on flash, used when clean_session is False
+        "session_save_ms": 5000     # Minimum interval between session writes
     }
 
     # Button Configuration
@@ -40,7 +59,10 @@ class Config:
         "height": 320,
         "clk": 52000,
         "backlight_pin": Pin.GPIO28,
-        "rotation":lv.DISP_ROT._90
+        "rotation":lv.DISP_ROT._90,
+        "frame_ms": 20, # UI queue drain period, callbacks run on the LVGL thread
+        "ui_queue_size": 64, # Maximum pending UI callbacks
+        "message_bytes": 512 # Payload bytes rendered per MQTT message
     }
 
     # Asset paths
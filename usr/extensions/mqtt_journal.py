@@ -0,0 +1,268 @@
+'''
+File: mqtt_journal.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 11:05:12
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import uos
+import ustruct
+import _thread
+
+try:
+    from ubinascii import crc32
+except ImportError:
+    crc32 = None
+
+# Record: magic, flags (qos | retain << 2), topic length, payload length, CRC32
+RECORD_FMT = "<BBHHI"
+RECORD_HEADER = ustruct.calcsize(RECORD_FMT)
+RECORD_MAGIC = 0xA5
+
+SEGMENT_PREFIX = "seg_"
+SEGMENT_SUFFIX = ".jnl"
+CURSOR_FILE = "cursor"
+
+EVICT_OLDEST = "oldest"   # Delete the oldest segment to make room
+EVICT_NEWEST = "newest"   # Refuse new records while full
+
+_CRC_TABLE = None
+
+
+def _crc32(data, crc=0):
+    """CRC-32 (IEEE), ubinascii.crc32 when the firmware has it."""
+    if crc32 is not None:
+        return crc32(data, crc) & 0xFFFFFFFF
+    global _CRC_TABLE
+    if _CRC_TABLE is None:
+        table = []
+        for i in range(256):
+            c = i
+            for _ in range(8):
+                c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+            table.append(c)
+        _CRC_TABLE = table
+    table = _CRC_TABLE
+    crc ^= 0xFFFFFFFF
+    for byte in data:
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return value.encode()
+    return bytes(value)
+
+
+class MqttJournal():
+    """
+    Store-and-forward journal for outgoing MQTT messages.
+
+    Messages are appended to numbered segment files, each record with
+    its own CRC32. A persisted read cursor marks what was sent; fully
+    sent segments are deleted (compaction). Disk usage is bounded by
+    max_bytes: the oldest segment is evicted, or new records refused,
+    depending on evict. Everything is on the filesystem, so pending
+    messages survive a reboot; a record torn by power loss fails its CRC
+    and ends the segment.
+    """
+    def __init__(self, path="/usr/mqtt_journal", segment_bytes=4096, max_bytes=65536,
+                 evict=EVICT_OLDEST):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.evict = evict
+        self.logger = None
+        self.appended = 0
+        self.evicted_segments = 0
+        self.rejected = 0
+        self.corrupt = 0
+        self._lock = _thread.allocate_lock()
+        self._segments = []   # [number, size], oldest first
+        self._cursor = (0, 0)  # (segment number, offset) of the next unsent record
+        self._pending_read = None  # (segment number, offset) after the last read()
+        self._sealed = False  # Start a new segment before the next append
+        self._open()
+
+    def _file(self, number):
+        return "%s/%s%08d%s" % (self.path, SEGMENT_PREFIX, number, SEGMENT_SUFFIX)
+
+    def _open(self):
+        try:
+            names = uos.listdir(self.path)
+        except OSError:
+            uos.mkdir(self.path)
+            names = []
+
+        for name in names:
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                number = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                self._segments.append([number, uos.stat(self._file(number))[6]])
+        self._segments.sort()
+        # The last segment may end in a torn record, never append after it
+        self._sealed = True
+
+        try:
+            with open("%s/%s" % (self.path, CURSOR_FILE), "r") as f:
+                number, offset = f.read().split()
+                self._cursor = (int(number), int(offset))
+        except (OSError, ValueError):
+            self._cursor = (self._segments[0][0], 0) if self._segments else (0, 0)
+        self._compact()
+
+    def _save_cursor(self):
+        name = "%s/%s" % (self.path, CURSOR_FILE)
+        with open(name + ".tmp", "w") as f:
+            f.write("%d %d" % self._cursor)
+        uos.rename(name + ".tmp", name)
+
+    def _compact(self):
+        """Delete segments the cursor has moved past."""
+        number, offset = self._cursor
+        while self._segments and self._segments[0][0] < number:
+            uos.remove(self._file(self._segments.pop(0)[0]))
+        if self._segments and self._segments[0][0] > number:
+            self._cursor = (self._segments[0][0], 0)
+        elif len(self._segments) == 1 and offset >= self._segments[0][1]:
+            # Everything was sent, the next append starts a new segment
+            uos.remove(self._file(self._segments.pop(0)[0]))
+
+    def _size(self):
+        return sum(size for _, size in self._segments)
+
+    def append(self, topic, msg, qos=0, retain=False):
+        """
+        Append a message.
+
+        Returns:
+            bool: False if the journal is full and evict is EVICT_NEWEST
+        """
+        topic = _to_bytes(topic)
+        msg = _to_bytes(msg)
+        flags = (qos & 0x03) | (0x04 if retain else 0)
+        crc = _crc32(msg, _crc32(topic, _crc32(bytes((flags,)))))
+        record = ustruct.pack(RECORD_FMT, RECORD_MAGIC, flags, len(topic), len(msg), crc) + topic + msg
+
+        with self._lock:
+            while self._segments and self._size() + len(record) > self.max_bytes:
+                if self.evict != EVICT_OLDEST or len(self._segments) == 1:
+                    self.rejected += 1
+                    return False
+                number = self._segments.pop(0)[0]
+                uos.remove(self._file(number))
+                self.evicted_segments += 1
+                if self._cursor[0] <= number:
+                    self._cursor = (self._segments[0][0], 0)
+                    self._pending_read = None
+                    self._save_cursor()
+                if self.logger:
+                    self.logger.warning("Journal full, evicted segment %d" % number)
+
+            if (self._sealed or not self._segments or
+                    self._segments[-1][1] + len(record) > self.segment_bytes):
+                number = self._segments[-1][0] + 1 if self._segments else self._cursor[0] + 1
+                self._segments.append([number, 0])
+                self._sealed = False
+                if len(self._segments) == 1:
+                    self._cursor = (number, 0)
+                    self._save_cursor()
+            segment = self._segments[-1]
+            with open(self._file(segment[0]), "ab") as f:
+                f.write(record)
+            segment[1] += len(record)
+            self.appended += 1
+        return True
+
+    def pending(self):
+        """True if there are unsent records."""
+        if not self._segments:
+            return False
+        number, offset = self._cursor
+        return not (number == self._segments[-1][0] and offset >= self._segments[-1][1])
+
+    def read(self, max_bytes=1024):
+        """
+        Read unsent records from the cursor without consuming them.
+
+        Call commit() once they were sent; the next read() starts at the
+        cursor again otherwise.
+
+        Args:
+            max_bytes: Payload budget; at least one record is returned
+
+        Returns:
+            list: (topic, msg, qos, retain) tuples, empty if nothing is pending
+        """
+        records = []
+        with self._lock:
+            number, offset = self._cursor
+            total = 0
+            while total < max_bytes:
+                segment = None
+                for entry in self._segments:
+                    if entry[0] == number:
+                        segment = entry
+                        break
+                if segment is None:
+                    break
+                if offset >= segment[1]:
+                    if segment is self._segments[-1]:
+                        break
+                    number, offset = self._segments[self._segments.index(segment) + 1][0], 0
+                    continue
+
+                with open(self._file(number), "rb") as f:
+                    f.seek(offset)
+                    while offset < segment[1] and total < max_bytes:
+                        header = f.read(RECORD_HEADER)
+                        if len(header) < RECORD_HEADER:
+                            offset = segment[1]
+                            break
+                        magic, flags, topic_len, msg_len, crc = ustruct.unpack(RECORD_FMT, header)
+                        topic = f.read(topic_len)
+                        msg = f.read(msg_len)
+                        if (magic != RECORD_MAGIC or len(msg) != msg_len or
+                                _crc32(msg, _crc32(topic, _crc32(bytes((flags,))))) != crc):
+                            # Torn or damaged write, nothing after it can be trusted
+                            self.corrupt += 1
+                            if self.logger:
+                                self.logger.error("Journal record damaged in segment %d at %d" % (number, offset))
+                            offset = segment[1]
+                            if segment is self._segments[-1]:
+                                self._sealed = True
+                            break
+                        offset += RECORD_HEADER + topic_len + msg_len
+                        total += msg_len
+                        records.append((topic, msg, flags & 0x03, bool(flags & 0x04)))
+            self._pending_read = (number, offset)
+        return records
+
+    def commit(self):
+        """Mark the records returned by the last read() as sent."""
+        with self._lock:
+            if self._pending_read is None:
+                return
+            self._cursor = self._pending_read
+            self._pending_read = None
+            self._save_cursor()
+            self._compact()
+
+    def stats(self):
+        """
+        Returns:
+            dict: segments, bytes on disk, appended, evicted_segments,
+            rejected and corrupt counts, and whether records are pending
+        """
+        with self._lock:
+            return {
+                'segments': len(self._segments),
+                'bytes': self._size(),
+                'appended': self.appended,
+                'evicted_segments': self.evicted_segments,
+                'rejected': self.rejected,
+                'corrupt': self.corrupt,
+                'pending': self.pending(),
+            }
@@ -0,0 +1,195 @@
+'''
+File: mqtt_message.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 10:12:40
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import _thread
+import utime
+
+# Stripped from both ends of display text, as str.strip() does
+_WHITESPACE = b" \t\n\r\x0b\x0c"
+
+
+class MqttMessage(object):
+    """
+    Reusable record of one received MQTT message.
+
+    Holds the raw topic and payload bytes as received; the text forms are
+    decoded on first access only. Records come from a MessagePool and go
+    back to it when the last holder calls release(). The event bus retains
+    them for deferred (async, UI, trailing) deliveries, so subscribers only
+    need retain()/release() if they keep the record after their callback
+    returns.
+    """
+    __slots__ = ('topic_bytes', 'payload', 'length', 'timestamp', 'seq',
+                 '_topic', '_message', '_refs', '_pool')
+
+    def __init__(self, pool=None):
+        self._pool = pool
+        self._reset()
+
+    def _reset(self):
+        self.topic_bytes = None
+        self.payload = None
+        self.length = 0
+        self.timestamp = 0
+        self.seq = 0
+        self._topic = None
+        self._message = None
+        self._refs = 0
+
+    @property
+    def topic(self):
+        """Topic as str, decoded once on first access."""
+        if self._topic is None and self.topic_bytes is not None:
+            self._topic = self.topic_bytes.decode()
+        return self._topic
+
+    @property
+    def message(self):
+        """Payload as str, decoded once on first access."""
+        if self._message is None and self.payload is not None:
+            payload = self.payload
+            if not isinstance(payload, bytes):
+                payload = bytes(payload)
+            self._message = payload.decode()
+        return self._message
+
+    def text(self, limit=None):
+        """
+        Payload as display text, without decoding the whole payload.
+
+        Only the first limit bytes are used (never cutting a UTF-8
+        character), copied once, stripped of surrounding whitespace and
+        with each line break ("\\r\\n", "\\r" or "\\n") turned into a
+        space in the same pass, then decoded. payload stays untouched for
+        binary consumers.
+
+        Args:
+            limit (int): Maximum payload bytes to render, None for all
+
+        Returns:
+            str: The display text
+        """
+        payload = self.payload
+        if payload is None:
+            return ""
+        view = memoryview(payload)
+        end = len(view)
+        if limit is not None and end > limit:
+            end = limit
+            while end and view[end] & 0xC0 == 0x80:
+                end -= 1
+        start = 0
+        while start < end and view[start] in _WHITESPACE:
+            start += 1
+        while end > start and view[end - 1] in _WHITESPACE:
+            end -= 1
+
+        text = bytearray(view[start:end])
+        size = len(text)
+        if b"\r" in text or b"\n" in text:
+            size = 0
+            after_cr = False
+            for byte in text:
+                if byte == 0x0A and after_cr:
+                    after_cr = False
+                    continue
+                after_cr = byte == 0x0D
+                if after_cr or byte == 0x0A:
+                    byte = 0x20
+                text[size] = byte
+                size += 1
+        return str(memoryview(text)[:size], "utf-8")
+
+    def retain(self):
+        """Take an extra reference, e.g. before handing the record to another thread."""
+        pool = self._pool
+        if pool is None:
+            self._refs += 1
+            return
+        with pool._lock:
+            self._refs += 1
+
+    def release(self):
+        """Drop a reference; the record returns to its pool at zero."""
+        pool = self._pool
+        if pool is None:
+            self._refs -= 1
+            return
+        pool._release(self)
+
+    def __repr__(self):
+        return "MqttMessage(seq={}, topic={}, length={})".format(self.seq, self.topic, self.length)
+
+
+class MessagePool(object):
+    """
+    Fixed set of MqttMessage records reused for incoming messages.
+
+    acquire() hands out a free record holding one reference. When the
+    pool is exhausted (subscribers still hold every record) a plain,
+    unpooled record is allocated instead and counted in misses.
+    """
+    def __init__(self, size=8):
+        self.size = size
+        self.misses = 0
+        self._seq = 0
+        self._lock = _thread.allocate_lock()
+        self._free = [MqttMessage(self) for _ in range(size)]
+
+    def acquire(self, topic, payload):
+        """
+        Fill a record with a received message.
+
+        Args:
+            topic (bytes): Topic as received
+            payload (bytes, bytearray or memoryview): Payload as received
+
+        Returns:
+            MqttMessage: The record, holding one reference for the caller
+        """
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            if self._free:
+                record = self._free.pop()
+            else:
+                self.misses += 1
+                record = None
+        if record is None:
+            record = MqttMessage()
+
+        record.topic_bytes = topic
+        record.payload = payload
+        record.length = len(payload)
+        record.timestamp = utime.time()
+        record.seq = seq
+        record._refs = 1
+        return record
+
+    def _release(self, record):
+        with self._lock:
+            record._refs -= 1
+            if record._refs:
+                # Still held, or an unbalanced release of a free record
+                return
+            record._reset()
+            self._free.append(record)
+
+    def stats(self):
+        """
+        Returns:
+            dict: size, free and in_use record counts and misses
+        """
+        free = len(self._free)
+        return {
+            'size': self.size,
+            'free': free,
+            'in_use': self.size - free,
+            'misses': self.misses,
+        }
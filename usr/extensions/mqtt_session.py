@@ -0,0 +1,99 @@
+'''
+File: mqtt_session.py
+Created Date: Sunday October 18th 2026
+Author: Samman Shrestha
+Last Modified: Su/10/2026 15:20:36
+Modified By: Samman Shrestha
+Copyright (c) 2026 YARSA TECH
+'''
+
+import uos
+import ujson
+import ubinascii
+import _thread
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value
+    return bytes(value).decode()
+
+
+class MqttSession():
+    """
+    Flash record of a persistent (clean_session=False) MQTT session.
+
+    Holds what the broker expects the client to remember across
+    connections: the subscribed topic filters, the QoS 1 messages still
+    waiting for their PUBACK and the next packet id. The record is a
+    small JSON file replaced atomically (written to a temporary file,
+    then renamed), so a power loss leaves either the old or the new one.
+    """
+    def __init__(self, path="/usr/mqtt_session"):
+        self.path = path
+        self.logger = None
+        self.saves = 0
+        self._lock = _thread.allocate_lock()
+
+    def load(self, client_id):
+        """
+        Read the record saved for client_id.
+
+        Returns:
+            dict or None: topics ({filter: qos}), pid (last packet id) and
+            inflight ((pid, topic, msg, retain) tuples, msg as bytes); None
+            if there is no record, it is damaged or for another client id
+        """
+        try:
+            with open(self.path, "r") as f:
+                record = ujson.loads(f.read())
+            if record.get("client_id") != client_id:
+                return None
+            inflight = []
+            for pid, topic, msg, retain in record.get("inflight", []):
+                inflight.append((pid, topic, ubinascii.a2b_base64(msg), bool(retain)))
+            return {
+                'topics': record.get("topics", {}),
+                'pid': record.get("pid", 0),
+                'inflight': inflight,
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if self.logger:
+                self.logger.warning("No usable MQTT session record: %s" % str(e))
+            return None
+
+    def save(self, client_id, topics, pid, inflight):
+        """
+        Replace the record.
+
+        Args:
+            client_id (str): Client the session belongs to
+            topics (dict): Topic filter to QoS
+            pid (int): Last packet id used
+            inflight (list): (pid, topic, msg, retain) of unacknowledged QoS 1 messages
+        """
+        messages = []
+        for message_pid, topic, msg, retain in inflight:
+            if isinstance(msg, str):
+                msg = msg.encode()
+            messages.append([message_pid, _text(topic),
+                             ubinascii.b2a_base64(msg).decode().strip(), 1 if retain else 0])
+        data = ujson.dumps({
+            "client_id": client_id,
+            "topics": topics,
+            "pid": pid,
+            "inflight": messages,
+        })
+        with self._lock:
+            with open(self.path + ".tmp", "w") as f:
+                f.write(data)
+            uos.rename(self.path + ".tmp", self.path)
+            self.saves += 1
+
+    def clear(self):
+        """Forget the session, e.g. when switching back to clean sessions."""
+        with self._lock:
+            try:
+                uos.remove(self.path)
+            except OSError:
+                pass
@@ -4,8 +4,16 @@ import net
 import _thread
 import dataCall
 import uos
+import ustruct
+import urandom
+import osTimer
 from umqtt import MQTTClient
 
+try:
+    from ucollections import OrderedDict
+except ImportError:
+    from collections import OrderedDict
+
 # Application version
 APP_VERSION = "1.0.0"
 
@@ -16,6 +24,313 @@ def get_version():
 # Reclaim the thread resource through the status after calling MQTTClient.disconnect().
 TaskEnable = True
 
+
+def _append_length(packet, size):
+    """Append an MQTT remaining length, 7 bits per byte."""
+    while True:
+        byte = size & 0x7F
+        size >>= 7
+        if size:
+            packet.append(byte | 0x80)
+        else:
+            packet.append(byte)
+            break
+
+
+def encode_subscribe(topics, pid):
+    """
+    Encode one SUBSCRIBE packet for several topic filters.
+
+    Args:
+        topics (list): (topic filter, qos) pairs
+        pid (int): Packet id
+
+    Returns:
+        bytearray: The complete packet
+    """
+    body = bytearray(ustruct.pack("!H", pid))
+    for topic, qos in topics:
+        if isinstance(topic, str):
+            topic = topic.encode()
+        body += ustruct.pack("!H", len(topic))
+        body += topic
+        body.append(qos)
+    packet = bytearray(b"\x82")
+    _append_length(packet, len(body))
+    packet += body
+    return packet
+
+
+def encode_publish(topic, msg, retain=False, qos=0, pid=0):
+    """
+    Encode a PUBLISH packet.
+
+    Args:
+        topic (str or bytes): Topic name
+        msg (str or bytes): Payload
+        retain (bool): Retain flag
+        qos (int): 0 or 1
+        pid (int): Packet id, QoS 1 only
+
+    Returns:
+        bytearray: The complete packet; set 0x08 in the first byte for DUP
+    """
+    if isinstance(topic, str):
+        topic = topic.encode()
+    if isinstance(msg, str):
+        msg = msg.encode()
+    size = 2 + len(topic) + len(msg)
+    if qos:
+        size += 2
+    packet = bytearray(1)
+    packet[0] = 0x30 | (qos << 1) | (1 if retain else 0)
+    _append_length(packet, size)
+    packet += ustruct.pack("!H", len(topic))
+    packet += topic
+    if qos:
+        packet += ustruct.pack("!H", pid)
+    packet += msg
+    return packet
+
+
+class PublishHandle():
+    """
+    Result of MyMqttClient.publish_nowait().
+
+    Resolved once the message was written to the socket, for QoS 1 once
+    its PUBACK arrived (SENT), or could not be (FAILED), or right away
+    when the outbound queue is full (DROPPED). With a journal, messages
+    that cannot be sent now are stored for later instead (JOURNALED).
+
+    The optional callback is called with the handle when it is resolved,
+    on the sender or listener thread; it must not block.
+    """
+    QUEUED = 0
+    SENT = 1
+    FAILED = 2
+    DROPPED = 3
+    JOURNALED = 4   # Stored in the journal or session, sent after the next reconnect
+
+    def __init__(self, topic, msg, qos, retain, callback=None):
+        self.topic = topic
+        self.msg = msg
+        self.qos = qos
+        self.retain = retain
+        self.callback = callback
+        self.status = self.QUEUED
+        self.error = None
+        self.queued_us = utime.ticks_us()
+        self.latency_us = 0
+        # QoS 1 in flight: packet id, encoded packet, PUBACK deadline and
+        # the times it was resent for missing it
+        self.pid = 0
+        self.packet = None
+        self.deadline = 0
+        self.retries = 0
+        # Held until the handle is resolved
+        self.__done = _thread.allocate_lock()
+        self.__done.acquire()
+
+    def _resolve(self, status, error=None):
+        if self.status != self.QUEUED:
+            return
+        self.latency_us = utime.ticks_diff(utime.ticks_us(), self.queued_us)
+        self.status = status
+        self.error = error
+        self.packet = None
+        self.__done.release()
+        if self.callback:
+            try:
+                self.callback(self)
+            except Exception as e:
+                print("Publish callback error: %s" % str(e))
+
+    def done(self):
+        return self.status != self.QUEUED
+
+    def wait(self):
+        """
+        Block until the message was handled.
+
+        Returns:
+            bool: True if the message was sent (QoS 1: acknowledged) or journaled
+        """
+        if self.status == self.QUEUED:
+            self.__done.acquire()
+            self.__done.release()
+        return self.status == self.SENT or self.status == self.JOURNALED
+
+
+class _LockedSocket():
+    """
+    The MQTTClient socket with its writes serialized by a lock.
+
+    umqtt writes from whichever thread calls it: PUBACKs of received QoS
+    1 messages from the listener's wait_msg(), PINGREQ, DISCONNECT. The
+    sender thread writes too, so every write has to hold the same lock or
+    packets interleave on the wire.
+    """
+    def __init__(self, sock, lock):
+        self.raw = sock
+        self.lock = lock
+
+    def write(self, *args):
+        with self.lock:
+            return self.raw.write(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class TopicRouter():
+    """
+    Routes received messages to handlers by MQTT topic filter.
+
+    Filters are split into levels and compiled into a trie, so matching a
+    topic walks its levels once instead of testing every filter; "+"
+    matches one level and "#" the rest of the topic, including the parent
+    level ("a/#" matches "a"). Topics starting with "$" match wildcards
+    only below the first level. The handlers of recently seen topics are
+    kept in an LRU cache of cache_size entries.
+
+    topics maps every filter to its QoS and is used for resubscription.
+    """
+    def __init__(self, cache_size=32):
+        self.topics = {}
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = _thread.allocate_lock()
+        # Trie node: [children by level, handlers]
+        self._root = [{}, []]
+        self._cache = OrderedDict()
+
+    def _levels(self, topic_filter):
+        if isinstance(topic_filter, str):
+            topic_filter = topic_filter.encode()
+        levels = topic_filter.split(b"/")
+        for i, level in enumerate(levels):
+            if (b"#" in level and (level != b"#" or i != len(levels) - 1)) or (b"+" in level and level != b"+"):
+                raise ValueError("Invalid topic filter: %s" % topic_filter.decode())
+        return levels
+
+    def add(self, topic_filter, handler=None, qos=0):
+        """
+        Add a filter, and a handler called with (topic, msg) for the
+        messages matching it. A filter added twice keeps the higher QoS.
+        """
+        levels = self._levels(topic_filter)
+        with self._lock:
+            node = self._root
+            for level in levels:
+                child = node[0].get(level)
+                if child is None:
+                    child = node[0][level] = [{}, []]
+                node = child
+            if handler is not None and handler not in node[1]:
+                node[1].append(handler)
+            if qos > self.topics.get(topic_filter, -1):
+                self.topics[topic_filter] = qos
+            self._cache.clear()
+
+    def remove(self, topic_filter, handler=None):
+        """
+        Remove a handler from a filter, or the filter with all of its
+        handlers if handler is None. The filter itself is removed, and no
+        longer resubscribed, once it has no handlers left.
+
+        Returns:
+            bool: True if the filter was removed
+        """
+        levels = self._levels(topic_filter)
+        with self._lock:
+            path = [self._root]
+            for level in levels:
+                node = path[-1][0].get(level)
+                if node is None:
+                    return False
+                path.append(node)
+            node = path[-1]
+            if handler is None:
+                del node[1][:]
+            elif handler in node[1]:
+                node[1].remove(handler)
+            self._cache.clear()
+            if node[1]:
+                return False
+            self.topics.pop(topic_filter, None)
+            # Prune the branches nothing is routed through any more
+            for i in range(len(levels), 0, -1):
+                node = path[i]
+                if node[0] or node[1]:
+                    break
+                del path[i - 1][0][levels[i - 1]]
+            return True
+
+    def match(self, topic):
+        """
+        Returns:
+            tuple: Handlers for a received topic (bytes or str), each once
+        """
+        if isinstance(topic, str):
+            topic = topic.encode()
+        with self._lock:
+            cache = self._cache
+            handlers = cache.pop(topic, None)
+            if handlers is not None:
+                self.hits += 1
+                cache[topic] = handlers
+                return handlers
+            self.misses += 1
+
+            levels = topic.split(b"/")
+            count = len(levels)
+            found = []
+            stack = [(self._root, 0)]
+            while stack:
+                node, i = stack.pop()
+                children = node[0]
+                rest = children.get(b"#")
+                if rest is not None and (i or not levels[0].startswith(b"$")):
+                    found.extend(rest[1])
+                if i == count:
+                    found.extend(node[1])
+                    continue
+                child = children.get(levels[i])
+                if child is not None:
+                    stack.append((child, i + 1))
+                child = children.get(b"+")
+                if child is not None and (i or not levels[0].startswith(b"$")):
+                    stack.append((child, i + 1))
+
+            handlers = []
+            for handler in found:
+                if handler not in handlers:
+                    handlers.append(handler)
+            handlers = tuple(handlers)
+            if self.cache_size:
+                if len(cache) >= self.cache_size:
+                    # Least recently used first
+                    for oldest in cache:
+                        break
+                    del cache[oldest]
+                cache[topic] = handlers
+            return handlers
+
+    def stats(self):
+        """
+        Returns:
+            dict: filters, cached topics, cache hits and misses
+        """
+        with self._lock:
+            return {
+                'filters': len(self.topics),
+                'cached': len(self._cache),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
 # Encapsulate MQTT so it can support more custom logic.
 class MyMqttClient():
     '''
@@ -34,7 +349,9 @@ class MyMqttClient():
     # Note: The parameter reconn enables or disables the internal reconnection mechanism. Default value: True (enable).
     # If you need to test or use the external reconnection mechanism, please refer to this example code below. Before testing, set reconn to False, otherwise, the internal reconnection mechanism will be used by default.
     def __init__(self, clientid, server, port, user=None, password=None, keepalive=0, ssl=False, ssl_params={},
-                 reconn=True):
+                 reconn=True, outbound_queue=32, batch_bytes=1024, journal=None, inflight_window=8,
+                 ack_timeout_ms=10000, route_cache=32, reconnect_base_ms=1000, reconnect_max_ms=60000,
+                 clean_session=True, session=None, session_save_ms=5000, max_retransmits=3):
         self.logger = None
         self.__clientid = clientid
         self.__pw = password
@@ -44,16 +361,97 @@ class MyMqttClient():
         self.__keepalive = keepalive
         self.__ssl = ssl
         self.__ssl_params = ssl_params
-        self.topics = {}
+        # Received messages are dispatched by topic filter; the router's
+        # filters are what gets resubscribed after a reconnect
+        self.router = TopicRouter(route_cache)
+        self.topics = self.router.topics
+        self.__sub_cb = None
         # Network status flag.
         self.__nw_flag = True
+        # Reconnection backoff, cut short by nw_cb()
+        self.reconnect_base_ms = reconnect_base_ms
+        self.reconnect_max_ms = reconnect_max_ms
+        self.__wakeup_timer = osTimer()
+        self.__wakeup_lock = _thread.allocate_lock()
+        self.__wakeup_lock.acquire()
+        self.__woken = False
+        self.__reconn_stats = {
+            'reconnects': 0,
+            'attempts': 0,
+            'failures': 0,
+            'rejected': 0,
+            'last_ms': 0,
+            'max_ms': 0,
+            'total_ms': 0,
+        }
         # Create a mutex.
         self.mp_lock = _thread.allocate_lock()
+        # Held by every socket write, see _LockedSocket
+        self.__write_lock = _thread.allocate_lock()
         # Create a class to initialize the MQTT object.
         self.client = MQTTClient(self.__clientid, self.__server, self.__port, self.__uasename, self.__pw,
                                  keepalive=self.__keepalive, ssl=self.__ssl, ssl_params=self.__ssl_params,
                                  reconn=reconn)
+        self.client.set_callback(self.__dispatch)
         self.__status_cb = None
+        # Outbound queue drained by a single sender thread
+        self.outbound_queue = outbound_queue
+        self.batch_bytes = batch_bytes
+        self.__outbound = []
+        self.__outbound_lock = _thread.allocate_lock()
+        # Held while the sender has nothing to do, released to wake it
+        self.__outbound_ready = _thread.allocate_lock()
+        self.__outbound_ready.acquire()
+        # Wakes the sender at the next PUBACK deadline or session save
+        self.__ack_timer = osTimer()
+        self.__sender_running = False
+        self.__sender_alive = False
+        # Store-and-forward journal (MqttJournal) for messages sent while offline
+        self.journal = journal
+        self.__online = False
+        self.__draining = False
+        # QoS 1 messages waiting for their PUBACK, by packet id
+        self.inflight_window = inflight_window
+        self.ack_timeout_ms = ack_timeout_ms
+        self.max_retransmits = max_retransmits
+        self.__inflight = {}
+        self.__pid = 0
+        self.__resend = False
+        # SUBSCRIBE exchanges, one at a time; the listener thread hands the
+        # SUBACK over through __suback ([pid, packet]) and __suback_ready
+        self.__subscribe_lock = _thread.allocate_lock()
+        self.__suback = None
+        self.__suback_ready = _thread.allocate_lock()
+        self.__suback_ready.acquire()
+        self.__suback_timer = osTimer()
+        # Set by loop_forever() before the listener thread starts, so no
+        # other thread reads the socket meanwhile; __listener is its id
+        self.__listening = False
+        self.__listener = None
+        # Persistent session (MqttSession) kept on flash when clean_session is False
+        self.clean_session = clean_session
+        self.session = session
+        self.session_save_ms = session_save_ms
+        self.session_present = False
+        self.__persist = session is not None and not clean_session
+        self.__session_dirty = False
+        self.__session_saved = utime.ticks_ms()
+        self.__out_stats = {
+            'sent': 0,
+            'failed': 0,
+            'dropped': 0,
+            'journaled': 0,
+            'drained': 0,
+            'batches': 0,
+            'max_depth': 0,
+            'max_inflight': 0,
+            'retransmits': 0,
+            'total_latency_us': 0,
+            'max_latency_us': 0,
+        }
+
+        if self.__persist:
+            self.__restore_session()
 
     def setLogger(self, level):
         """
@@ -67,12 +465,25 @@ class MyMqttClient():
     def connect(self):
         '''
         Connect to the MQTT server.
+
+        Known topic filters (after a reconnect, or restored from the
+        session record) are subscribed again, unless the broker resumed
+        the persistent session: with clean_session False, umqtt returns
+        the CONNACK session-present flag.
         '''
         try:  
-            ret = self.client.connect()
-            if ret == 0:
-                if self.__status_cb:
-                    self.__status_cb(self.CONNECTED)
+            # CONNECT takes several writes, keep the sender off the new socket
+            with self.__write_lock:
+                ret = self.client.connect(clean_session=self.clean_session)
+                self.client.sock = _LockedSocket(self.client.sock, self.__write_lock)
+            self.session_present = not self.clean_session and ret == 1
+            if self.session_present:
+                if self.logger:
+                    self.logger.info("Session resumed by the broker, %d topic(s) still subscribed." % len(self.topics))
+            else:
+                self.__resubscribe()
+            if ret == 0 or self.session_present:
+                self.__report(self.CONNECTED)
 
             # Register the callback function of network status. When the network status changes, the function will be called.
             flag = dataCall.setCallback(self.nw_cb)
@@ -81,15 +492,85 @@ class MyMqttClient():
                 raise Exception("Network callback registration failed")
             
         except Exception as e:
-            if self.__status_cb:
-                    self.__status_cb(self.FAILED)
+            self.__report(self.FAILED)
             raise
 
+    def __report(self, status):
+        '''
+        Report a status change to the status callback.
+
+        Once CONNECTED has been reported, unacknowledged QoS 1 messages
+        are sent again and messages journaled while offline are drained by
+        the sender thread.
+        '''
+        self.__online = status == self.CONNECTED
+        if self.__status_cb:
+            self.__status_cb(status)
+        if self.__online and self.__inflight:
+            self.__resend = True
+            self.__wake_sender()
+        if self.__online and self.journal is not None and self.journal.pending():
+            self.drain_journal()
+
     def set_callback(self, sub_cb):
         '''
         Set the callback function of receiving messages.
+
+        Called with (topic, msg) for messages no route() handler matches.
+        '''
+        self.__sub_cb = sub_cb
+
+    def __dispatch(self, topic, msg):
+        handlers = self.router.match(topic)
+        if not handlers:
+            if not self.__sub_cb:
+                return
+            handlers = (self.__sub_cb,)
+        for handler in handlers:
+            # A failing handler must neither skip the others nor end the listener
+            try:
+                handler(topic, msg)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("Message handler error for %s: %s" % (topic, str(e)))
+                else:
+                    print("Message handler error: %s" % str(e))
+
+    def route(self, topic_filter, handler, qos=0):
+        '''
+        Subscribe to a topic filter and call handler with (topic, msg) for
+        the messages matching it.
+
+        The filter is only subscribed on the broker when it is new or its
+        QoS is raised; any number of handlers can share it.
+
+        Args:
+            topic_filter (str): Filter, "+" and "#" wildcards allowed.
+            handler (function): Called on the listener thread.
+            qos (int): Quality of Service level (default: 0)
+
+        Raises:
+            ValueError: If the filter is invalid or subscription fails.
         '''
-        self.client.set_callback(sub_cb)
+        new = qos > self.topics.get(topic_filter, -1)
+        self.router.add(topic_filter, handler, qos)
+        if new:
+            try:
+                self.subscribe(topic_filter, qos)
+            except ValueError:
+                self.router.remove(topic_filter, handler)
+                raise
+
+    def unroute(self, topic_filter, handler=None):
+        '''
+        Remove a handler, or all handlers if None, from a topic filter.
+
+        Without handlers left the filter is not resubscribed after the
+        next reconnect; umqtt has no UNSUBSCRIBE, so until then its
+        messages go to the set_callback() callback.
+        '''
+        if self.router.remove(topic_filter, handler):
+            self.__save_session(True)
 
     def set_status_calllabck(self, status_cb):
         '''
@@ -114,21 +595,28 @@ class MyMqttClient():
         Raises:
             ValueError: If topic type is invalid or subscription fails.
         '''
-        if not hasattr(self, 'topics'):
-            self.topics = {}
-
         try:
             if isinstance(topic, str):
-                self.client.subscribe(topic, qos)
-                self.topics[topic] = qos  # Save QoS
+                topics = [topic]
             elif isinstance(topic, list):
                 for t in topic:
                     if not isinstance(t, str):
                         raise ValueError("Invalid topic in list: %s" % str(t))
-                    self.client.subscribe(t, qos)
-                    self.topics[t] = qos
+                topics = topic
             else:
                 raise ValueError("Topic must be a string or a list of strings.")
+            if not topics:
+                return
+            codes = self.__subscribe([(t, qos) for t in topics])
+            refused = []
+            for t, code in zip(topics, codes):
+                if code & 0x80:
+                    refused.append(t)
+                else:
+                    self.router.add(t, qos=qos)  # Save QoS
+            self.__save_session(True)
+            if refused:
+                raise ValueError("Subscription refused for: %s" % ", ".join(refused))
 
         except Exception as e:
             if self.logger:
@@ -140,6 +628,12 @@ class MyMqttClient():
         '''
         Publish a message to a topic.
 
+        Goes through the outbound queue like publish_nowait() and waits
+        until it was sent (QoS 1: acknowledged). Called on the listener
+        thread, e.g. from a route() handler, or before loop_forever(), it
+        reads the PUBACK itself, for at most ack_timeout_ms, and does not
+        wait for room in a full queue.
+
         Args:
             topic (str): Topic to publish to.
             msg (str): Message payload.
@@ -148,11 +642,476 @@ class MyMqttClient():
         Returns:
             bool: True if published successfully, False otherwise.
         '''
+        # No other thread would read the PUBACK or free the in-flight window
+        inline = self.__reads_inline()
+        handle = self.__enqueue(PublishHandle(topic, msg, qos, False), not inline)
+        if inline and qos and not handle.done():
+            try:
+                self.__read_inline(handle.done, "PUBACK")
+            except OSError as e:
+                if self.logger:
+                    self.logger.error("Failed to publish message to topic '%s': %s" % (topic, str(e)))
+                return False
+        if not handle.wait():
+            if self.logger:
+                self.logger.error("Failed to publish message to topic '%s': %s" % (topic, str(handle.error)))
+            return False
+        return True
+
+    def publish_nowait(self, topic, msg, qos=0, retain=False, callback=None):
+        '''
+        Queue a message for the sender thread and return at once.
+
+        Queued messages are coalesced into a single socket write of up to
+        batch_bytes. Up to inflight_window QoS 1 messages are sent without
+        waiting for their PUBACK; one not acknowledged within
+        ack_timeout_ms, or before a reconnect, is sent again with DUP set.
+        After max_retransmits timeouts it fails.
+
+        Args:
+            topic (str): Topic to publish to.
+            msg (str or bytes): Message payload.
+            qos (int): Quality of Service level (default: 0).
+            retain (bool): Retain flag.
+            callback (function): Called with the PublishHandle once resolved.
+
+        Returns:
+            PublishHandle: Tracks the message; DROPPED if the queue is full.
+        '''
+        return self.__enqueue(PublishHandle(topic, msg, qos, retain, callback), False)
+
+    def __enqueue(self, handle, block):
+        journal = self.journal
+        if journal is not None and (not self.__online or self.__draining or journal.pending()):
+            # Offline, or older messages are still journaled: keep the order
+            self.__journal([handle])
+            if self.__online:
+                # The sender may have finished draining meanwhile
+                self.drain_journal()
+            return handle
+
+        start = dropped = False
+        while True:
+            with self.__outbound_lock:
+                if len(self.__outbound) < self.outbound_queue:
+                    self.__outbound.append(handle)
+                    depth = len(self.__outbound)
+                    if depth > self.__out_stats['max_depth']:
+                        self.__out_stats['max_depth'] = depth
+                    if self.__outbound_ready.locked():
+                        self.__outbound_ready.release()
+                    self.__sender_running = True
+                    start = not self.__sender_alive
+                    self.__sender_alive = True
+                    break
+                if not block:
+                    self.__out_stats['dropped'] += 1
+                    dropped = True
+                    break
+            # Blocking publish(): wait for the sender to make room
+            utime.sleep_ms(5)
+
+        if start:
+            self.__start_thread(self.__sender)
+        elif dropped:
+            # Resolved outside the lock, the callback may publish again
+            handle._resolve(PublishHandle.DROPPED)
+        return handle
+
+    def outbound_stats(self):
+        '''
+        Get outbound queue counters.
+
+        Returns:
+            dict: depth, max_depth, sent (QoS 1: acknowledged), failed,
+            dropped, journaled, drained (sent from the journal), batches
+            (socket writes), inflight, max_inflight, retransmits,
+            avg_latency_us and max_latency_us (queue to socket, QoS 1 to PUBACK)
+        '''
+        with self.__outbound_lock:
+            stats = dict(self.__out_stats)
+            stats['depth'] = len(self.__outbound)
+            stats['inflight'] = len(self.__inflight)
+        done = stats['sent'] + stats['failed']
+        stats['avg_latency_us'] = stats.pop('total_latency_us') // done if done else 0
+        return stats
+
+    def __next_batch(self):
+        """
+        Take the next messages to send: a run that fits in batch_bytes,
+        with no more QoS 1 messages than the in-flight window has room
+        for. An empty batch means there is other work due now: draining
+        the journal, resending, or saving the session.
+
+        Otherwise the sender sleeps until a message is queued, a PUBACK
+        arrives or, timed by __ack_timer, the next PUBACK deadline or
+        session save comes.
+        """
+        while True:
+            self.__outbound_ready.acquire()
+            self.__ack_timer.stop()
+            with self.__outbound_lock:
+                outbound = self.__outbound
+                room = self.inflight_window - len(self.__inflight)
+                if not outbound and not self.__draining and not self.__sender_running:
+                    self.__sender_alive = False
+                    return None
+                if not outbound or (outbound[0].qos and room <= 0):
+                    wait = self.__idle_ms(room)
+                    if wait == 0:
+                        if self.__outbound_ready.locked():
+                            self.__outbound_ready.release()
+                        return []
+                    if wait is not None:
+                        self.__ack_timer.start(wait, 0, self.__ack_wakeup)
+                    continue
+                batch = [outbound.pop(0)]
+                size = len(batch[0].msg)
+                if batch[0].qos:
+                    room -= 1
+                while outbound:
+                    if outbound[0].qos and room <= 0:
+                        break
+                    size += len(outbound[0].msg)
+                    if size > self.batch_bytes:
+                        break
+                    if outbound[0].qos:
+                        room -= 1
+                    batch.append(outbound.pop(0))
+                if (outbound or room < self.inflight_window or not self.__sender_running) and self.__outbound_ready.locked():
+                    self.__outbound_ready.release()
+                return batch
+
+    def __idle_ms(self, room):
+        """
+        Milliseconds until the sender has work of its own: 0 for now, None
+        if only a queued message, a PUBACK or a reconnect can give it
+        some. __outbound_lock must be held.
+        """
+        if (self.__draining and room > 0) or (self.__resend and self.__online):
+            return 0
+        now = utime.ticks_ms()
+        due = None
+        if self.__online:
+            # Offline, the messages are resent after the reconnect anyway
+            for handle in self.__inflight.values():
+                left = utime.ticks_diff(handle.deadline, now)
+                if due is None or left < due:
+                    due = left
+        if self.__persist and self.__session_dirty:
+            left = self.session_save_ms - utime.ticks_diff(now, self.__session_saved)
+            if due is None or left < due:
+                due = left
+        if due is None:
+            return None
+        return max(due, 0)
+
+    def __ack_wakeup(self, args=None):
+        with self.__outbound_lock:
+            if self.__outbound_ready.locked():
+                self.__outbound_ready.release()
+
+    def __finish(self, batch, status, error=None):
+        # Resolved outside the lock, callbacks may publish again
+        for handle in batch:
+            handle._resolve(status, error)
+        with self.__outbound_lock:
+            stats = self.__out_stats
+            for handle in batch:
+                if status == PublishHandle.SENT:
+                    stats['sent'] += 1
+                else:
+                    stats['failed'] += 1
+                stats['total_latency_us'] += handle.latency_us
+                if handle.latency_us > stats['max_latency_us']:
+                    stats['max_latency_us'] = handle.latency_us
+
+    def __encode(self, handles):
+        """
+        Encode messages into one buffer. QoS 1 messages get a free packet
+        id and wait in the in-flight table for their PUBACK.
+        """
+        qos1 = [handle for handle in handles if handle.qos]
+        if qos1:
+            deadline = utime.ticks_add(utime.ticks_ms(), self.ack_timeout_ms)
+            with self.__outbound_lock:
+                for handle in qos1:
+                    pid = self.__new_pid()
+                    handle.pid = pid
+                    handle.deadline = deadline
+                    self.__inflight[pid] = handle
+                if len(self.__inflight) > self.__out_stats['max_inflight']:
+                    self.__out_stats['max_inflight'] = len(self.__inflight)
+        packets = bytearray()
+        for handle in handles:
+            if handle.qos:
+                handle.packet = encode_publish(handle.topic, handle.msg, handle.retain, 1, handle.pid)
+                packets += handle.packet
+            else:
+                packets += encode_publish(handle.topic, handle.msg, handle.retain)
+        return packets
+
+    def __new_pid(self):
+        """Next packet id not in flight; __outbound_lock must be held."""
+        pid = self.__pid
+        while True:
+            pid = pid % 65535 + 1
+            if pid not in self.__inflight:
+                break
+        self.__pid = pid
+        self.__session_dirty = self.__persist
+        return pid
+
+    def __untrack(self, handles):
+        """Take messages that were not sent out of the in-flight table."""
+        with self.__outbound_lock:
+            for handle in handles:
+                if handle.qos and self.__inflight.get(handle.pid) is handle:
+                    del self.__inflight[handle.pid]
+            self.__session_dirty = self.__persist
+
+    def __write(self, data):
+        """Write packets to the socket, holding the write lock like umqtt's own writes."""
+        with self.__write_lock:
+            sock = self.client.sock
+            if isinstance(sock, _LockedSocket):
+                sock = sock.raw
+            sock.write(data)
+
+    def __sender(self):
+        """Sender thread: writes the queued and journaled messages to the socket."""
+        while True:
+            batch = self.__next_batch()
+            if batch is None:
+                self.__abandon_inflight()
+                break
+            self.__retransmit()
+            self.__save_session()
+            if not batch:
+                if self.__draining and len(self.__inflight) < self.inflight_window:
+                    self.__drain_step()
+                continue
+            try:
+                self.__write(self.__encode(batch))
+                self.__out_stats['batches'] += 1
+                # QoS 1 messages are finished by their PUBACK
+                self.__finish([handle for handle in batch if not handle.qos], PublishHandle.SENT)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("Failed to send %d message(s): %s" % (len(batch), str(e)))
+                self.__untrack(batch)
+                if self.journal is not None:
+                    self.__online = False
+                    self.__journal(batch)
+                else:
+                    self.__finish(batch, PublishHandle.FAILED, e)
+
+    def __retransmit(self):
+        """
+        Send unacknowledged QoS 1 messages again with DUP set: all of them
+        after a reconnect, otherwise those past their ack_timeout_ms. One
+        that already timed out max_retransmits times fails instead.
+        """
+        if not self.__inflight or not self.__online:
+            return
+        now = utime.ticks_ms()
+        with self.__outbound_lock:
+            resend = self.__resend
+            self.__resend = False
+            late = []
+            expired = []
+            for handle in list(self.__inflight.values()):
+                if utime.ticks_diff(now, handle.deadline) >= 0:
+                    if handle.retries >= self.max_retransmits:
+                        del self.__inflight[handle.pid]
+                        expired.append(handle)
+                        continue
+                    handle.retries += 1
+                    late.append(handle)
+                elif resend:
+                    late.append(handle)
+            if expired:
+                self.__session_dirty = self.__persist
+        if expired:
+            self.__finish(expired, PublishHandle.FAILED,
+                          OSError("No PUBACK after %d retransmissions" % self.max_retransmits))
+        if not late:
+            return
+        packets = bytearray()
+        count = 0
+        deadline = utime.ticks_add(now, self.ack_timeout_ms)
+        for handle in late:
+            packet = handle.packet
+            if packet is None:
+                # Acknowledged meanwhile
+                continue
+            packet[0] |= 0x08
+            handle.deadline = deadline
+            packets += packet
+            count += 1
         try:
-            return self.client.publish(topic, msg, qos)
+            self.__write(packets)
+            self.__out_stats['retransmits'] += count
         except Exception as e:
-            log.error("Failed to publish message to topic '%s': %s" % (topic, str(e)))
-            return False
+            # Left in flight, sent again after the next reconnect
+            if self.logger:
+                self.logger.error("Failed to retransmit %d message(s): %s" % (count, str(e)))
+            self.__online = False
+
+    def __puback(self):
+        """Match a PUBACK to its in-flight message, called by the listener."""
+        # wait_msg() has read the packet type, the rest is still unread
+        data = self.client.sock.read(3)
+        pid = ustruct.unpack("!H", data[1:3])[0]
+        with self.__outbound_lock:
+            handle = self.__inflight.pop(pid, None)
+            self.__session_dirty = self.__persist
+            # A slot in the window is free, or the session can be saved
+            if self.__outbound_ready.locked():
+                self.__outbound_ready.release()
+        if handle is None:
+            # Second PUBACK of a retransmitted message
+            return
+        self.__finish([handle], PublishHandle.SENT)
+
+    def __abandon_inflight(self):
+        """
+        Journal or fail the QoS 1 messages still unacknowledged when the
+        sender stops. A persistent session keeps them on flash instead,
+        to be resumed after the next connect; their handles are resolved
+        as JOURNALED all the same, so waiting publish() calls return.
+        """
+        if self.__persist:
+            with self.__outbound_lock:
+                handles = list(self.__inflight.values())
+                for handle in handles:
+                    # Resolving drops the packet, resume with a copy of the handle
+                    kept = PublishHandle(handle.topic, handle.msg, 1, handle.retain)
+                    kept.pid = handle.pid
+                    kept.packet = handle.packet
+                    kept.deadline = handle.deadline
+                    kept.retries = handle.retries
+                    self.__inflight[handle.pid] = kept
+            self.__save_session(True)
+            for handle in handles:
+                handle._resolve(PublishHandle.JOURNALED)
+            return
+        with self.__outbound_lock:
+            handles = list(self.__inflight.values())
+            self.__inflight.clear()
+        if not handles:
+            return
+        if self.journal is not None:
+            self.__journal(handles)
+        else:
+            self.__finish(handles, PublishHandle.FAILED, OSError("No PUBACK before disconnect"))
+
+    def __restore_session(self):
+        """Load the topic filters and in-flight QoS 1 messages of the last run."""
+        record = self.session.load(self.__clientid)
+        if record is None:
+            return
+        for topic, qos in record['topics'].items():
+            self.router.add(topic, qos=qos)
+        self.__pid = record['pid']
+        deadline = utime.ticks_ms()
+        for pid, topic, msg, retain in record['inflight']:
+            handle = PublishHandle(topic, msg, 1, retain)
+            handle.pid = pid
+            handle.packet = encode_publish(topic, msg, retain, 1, pid)
+            handle.packet[0] |= 0x08
+            handle.deadline = deadline
+            self.__inflight[pid] = handle
+        if self.logger:
+            self.logger.info("Session restored: %d topic(s), %d message(s) in flight." %
+                             (len(self.topics), len(self.__inflight)))
+
+    def __save_session(self, force=False):
+        """
+        Write the session record if it changed, at most every
+        session_save_ms to spare the flash unless forced (topic changes,
+        disconnect()). On power loss a message sent since the last write
+        may be lost, one acknowledged since then is sent again.
+        """
+        if not self.__persist:
+            return
+        with self.__outbound_lock:
+            if not force and (not self.__session_dirty or utime.ticks_diff(
+                    utime.ticks_ms(), self.__session_saved) < self.session_save_ms):
+                return
+            self.__session_dirty = False
+            self.__session_saved = utime.ticks_ms()
+            topics = dict(self.topics)
+            pid = self.__pid
+            inflight = [(handle.pid, handle.topic, handle.msg, handle.retain)
+                        for handle in self.__inflight.values()]
+        try:
+            self.session.save(self.__clientid, topics, pid, inflight)
+        except Exception as e:
+            if self.logger:
+                self.logger.error("Failed to save MQTT session: %s" % str(e))
+
+    def __journal(self, handles):
+        """Store messages that cannot be sent now."""
+        for handle in handles:
+            if self.journal.append(handle.topic, handle.msg, handle.qos, handle.retain):
+                self.__out_stats['journaled'] += 1
+                handle._resolve(PublishHandle.JOURNALED)
+            else:
+                self.__out_stats['dropped'] += 1
+                handle._resolve(PublishHandle.DROPPED)
+
+    def drain_journal(self):
+        '''
+        Send the journaled messages, oldest first, from the sender thread.
+
+        Called automatically when CONNECTED is reported.
+        '''
+        if self.journal is None:
+            return
+        self.__draining = True
+        self.__wake_sender()
+
+    def __wake_sender(self):
+        '''Wake the sender thread, starting it if needed.'''
+        with self.__outbound_lock:
+            if self.__outbound_ready.locked():
+                self.__outbound_ready.release()
+            self.__sender_running = True
+            start = not self.__sender_alive
+            self.__sender_alive = True
+        if start:
+            self.__start_thread(self.__sender)
+
+    def __drain_step(self):
+        """Send one batch of journaled messages and advance the journal cursor."""
+        records = self.journal.read(self.batch_bytes)
+        if not records:
+            # Moves the cursor past a damaged tail read() skipped
+            self.journal.commit()
+            self.__draining = self.journal.pending()
+            return
+        # QoS 1 records are tracked in flight like queued messages
+        handles = [PublishHandle(topic, msg, qos, retain) for topic, msg, qos, retain in records]
+        try:
+            self.__write(self.__encode(handles))
+            self.journal.commit()
+            self.__out_stats['drained'] += len(records)
+            self.__out_stats['batches'] += 1
+        except Exception as e:
+            # Sent again after the next reconnect
+            if self.logger:
+                self.logger.error("Journal drain interrupted: %s" % str(e))
+            self.__untrack(handles)
+            self.__draining = False
+            self.__online = False
+
+    def __stop_sender(self):
+        """Let the sender thread exit once the queued messages are handled."""
+        with self.__outbound_lock:
+            self.__sender_running = False
+            if self.__outbound_ready.locked():
+                self.__outbound_ready.release()
 
     def disconnect(self):
         '''
@@ -161,20 +1120,26 @@ class MyMqttClient():
         global TaskEnable
         # Close the monitoring thread of wait_msg.
         TaskEnable = False
+        self.__stop_sender()
+        self.__save_session(True)
         # Disconnect from the MQTT server and release the resources.
         self.client.disconnect()
-        if self.__status_cb:
-            self.__status_cb(self.DISCONNECTED)
+        self.__report(self.DISCONNECTED)
 
     def reconnect(self):
         '''
         MQTT reconnection mechanism.
 
         This function ensures safe reconnection to the MQTT server. It will:
-        - Wait for network and data call to be ready.
+        - Wait for network and data call to be ready, woken by nw_cb().
         - Reconnect the MQTT client.
         - Resubscribe to all previously subscribed topics.
 
+        Failed attempts are retried after a random delay between 0 and
+        reconnect_base_ms doubled per failure, capped at reconnect_max_ms
+        (full jitter), so devices that dropped together do not retry in
+        lockstep. When the data call comes back the wait ends at once.
+
         Returns:
             bool: True if reconnection and subscription succeed, False otherwise.
         '''
@@ -184,85 +1149,54 @@ class MyMqttClient():
             return False
 
         self.mp_lock.acquire()
+        started = utime.ticks_ms()
+        failures = 0
         try:
-            if self.__status_cb:
-                self.__status_cb(self.RECONNECTING)
+            self.__report(self.RECONNECTING)
 
             if self.logger:
                 self.logger.info("Closing previous MQTT connection.")
             self.client.close()
 
             while True:
-                net_sta = net.getState()
-                if net_sta != -1 and net_sta[1][0] == 1:
-                    call_state = dataCall.getInfo(1, 0)
-                    if call_state != -1 and call_state[2][0] == 1:
-                        try:
-                            if self.logger:
-                                self.logger.info("Network ready. Attempting MQTT reconnection.")
-                            self.connect()
-
-                        except Exception as e:
-                            if self.logger:
-                                self.logger.error("MQTT connection failed: %s" % str(e))
-                            self.client.close()
-                            utime.sleep(5)
-                            continue
-
-                        # Resubscribe to topics
-                        all_subscribed = True
-                        try:
-                            if hasattr(self, 'topics') and isinstance(self.topics, dict):
-                                for topic, qos in self.topics.items():
-                                    try:
-                                        self.client.subscribe(topic, qos)
-                                        if self.logger:
-                                            self.logger.info("Resubscribed to topic: %s with QoS %d" % (topic, qos))
-                                    except Exception as sub_e:
-                                        all_subscribed = False
-                                        if self.logger:
-                                            self.logger.error("Failed to resubscribe to topic '%s': %s" % (topic, str(sub_e)))
-                            else:
-                                if self.logger:
-                                    self.logger.warning("No valid topic(s) to resubscribe.")
-                                all_subscribed = False
-                            
-                            if all_subscribed:
-                                if self.logger:
-                                    self.logger.info("Reconnection and all subscriptions successful.")
-                                if self.__status_cb:
-                                    self.__status_cb(self.CONNECTED)
-                                return True
-                            else:
-                                if self.logger:
-                                    self.logger.warning("Subscription incomplete. Retrying...")
-                                self.client.close()
-                                if self.__status_cb:
-                                    self.__status_cb(self.FAILED)
-                                utime.sleep(5)
-                                continue
-                        except Exception as sub_all_e:
-                            if self.logger:
-                                self.logger.error("Subscription error: %s" % str(sub_all_e))
-                            self.client.close()
-                            if self.__status_cb:
-                                self.__status_cb(self.FAILED)
-                            utime.sleep(5)
-                            continue
-                    else:
-                        if self.logger:
-                            self.logger.warning("Data call inactive. Waiting...")
-                        utime.sleep(10)
-                else:
+                # Before checking, so nw_cb() firing after the check still
+                # ends the next wait
+                self.__arm_wait()
+                if not self.__network_ready():
                     if self.logger:
-                        self.logger.warning("Network not registered. Waiting...")
-                    utime.sleep(5)
+                        self.logger.warning("Network or data call not ready. Waiting...")
+                    # nw_cb() ends the wait when the data call comes back
+                    self.__wait(self.reconnect_max_ms)
+                    continue
+
+                self.__reconn_stats['attempts'] += 1
+                if self.__try_connect():
+                    elapsed = utime.ticks_diff(utime.ticks_ms(), started)
+                    stats = self.__reconn_stats
+                    stats['reconnects'] += 1
+                    stats['last_ms'] = elapsed
+                    stats['total_ms'] += elapsed
+                    if elapsed > stats['max_ms']:
+                        stats['max_ms'] = elapsed
+                    if self.logger:
+                        self.logger.info("Reconnected in %d ms after %d failed attempt(s)." % (elapsed, failures))
+                    self.__report(self.CONNECTED)
+                    return True
+
+                failures += 1
+                self.__reconn_stats['failures'] += 1
+                delay = urandom.randint(0, min(self.reconnect_max_ms,
+                                               self.reconnect_base_ms << min(failures - 1, 16)))
+                if self.logger:
+                    self.logger.info("Retrying MQTT connection in %d ms." % delay)
+                if self.__wait(delay):
+                    # The data call just came back, retry now with a fresh backoff
+                    failures = 0
 
         except Exception as general_e:
             if self.logger:
                 self.logger.error("Unexpected error in reconnect(): %s" % str(general_e))
-            if self.__status_cb:
-                self.__status_cb(self.FAILED)
+            self.__report(self.FAILED)
         finally:
             if self.mp_lock.locked():
                 self.mp_lock.release()
@@ -271,6 +1205,200 @@ class MyMqttClient():
                 
         return False
 
+    def __network_ready(self):
+        net_sta = net.getState()
+        if net_sta == -1 or net_sta[1][0] != 1:
+            return False
+        call_state = dataCall.getInfo(1, 0)
+        return call_state != -1 and call_state[2][0] == 1
+
+    def __try_connect(self):
+        '''
+        One reconnection attempt; connect() also resubscribes the topics.
+
+        Returns:
+            bool: True if connected
+        '''
+        try:
+            if self.logger:
+                self.logger.info("Network ready. Attempting MQTT reconnection.")
+            self.connect()
+        except Exception as e:
+            if self.logger:
+                self.logger.error("MQTT connection failed: %s" % str(e))
+            self.client.close()
+            return False
+        return True
+
+    def __resubscribe(self):
+        '''
+        Resubscribe every topic filter with a single SUBSCRIBE packet and
+        wait for its SUBACK, one round trip however many filters there are.
+
+        Filters the broker refuses (e.g. not authorized) are logged and
+        counted; reconnecting would not change that, they are tried
+        again after the next reconnect. No SUBACK within ack_timeout_ms
+        raises OSError, so connect() fails and reconnect() counts the
+        attempt as failed instead of waiting with mp_lock held.
+        '''
+        topics = list(self.topics.items())
+        if not topics:
+            return
+        codes = self.__subscribe(topics)
+
+        rejected = []
+        for (topic, qos), code in zip(topics, codes):
+            if code & 0x80:
+                rejected.append(topic)
+            elif self.logger:
+                self.logger.info("Resubscribed to topic: %s with QoS %d" % (topic, code))
+        if rejected:
+            self.__reconn_stats['rejected'] += len(rejected)
+            if self.logger:
+                self.logger.warning("Subscription refused for: %s" % ", ".join(rejected))
+        elif self.logger:
+            self.logger.info("All subscriptions successful.")
+
+    def __subscribe(self, topics):
+        '''
+        Send one SUBSCRIBE packet and wait for its SUBACK.
+
+        umqtt's subscribe() drops the PUBACKs it reads while waiting, which
+        desyncs the stream, and writes the packet in pieces. Here it is a
+        single write, and the SUBACK is read by the listener thread if it
+        runs, by this thread otherwise, PUBACKs included.
+
+        Args:
+            topics (list): (topic filter, qos) pairs
+
+        Returns:
+            list: SUBACK return code of every filter, 0x80 if refused
+
+        Raises:
+            OSError: If no SUBACK arrived within ack_timeout_ms
+        '''
+        with self.__subscribe_lock:
+            with self.__outbound_lock:
+                pid = self.__new_pid()
+                if not self.__suback_ready.locked():
+                    # Clear a wake-up left from before
+                    self.__suback_ready.acquire()
+                pending = self.__suback = [pid, None]
+            try:
+                self.__write(encode_subscribe(topics, pid))
+                if self.__reads_inline():
+                    self.__read_inline(lambda: pending[1] is not None, "SUBACK")
+                else:
+                    self.__suback_timer.start(self.ack_timeout_ms, 0, self.__suback_wakeup)
+                    self.__suback_ready.acquire()
+                    self.__suback_timer.stop()
+            finally:
+                with self.__outbound_lock:
+                    self.__suback = None
+            data = pending[1]
+            if data is None:
+                raise OSError("No SUBACK within %d ms" % self.ack_timeout_ms)
+        codes = []
+        for i in range(len(topics)):
+            codes.append(data[2 + i] if 2 + i < len(data) else 0x80)
+        return codes
+
+    def __reads_inline(self):
+        """True if no listener thread reads the socket for this thread."""
+        return not self.__listening or self.__listener == _thread.get_ident()
+
+    def __read_inline(self, done, what):
+        """
+        Read packets on this thread until done() holds, at most
+        ack_timeout_ms, when no listener thread reads them for it: from
+        connect(), before loop_forever(), or on the listener thread itself.
+        """
+        sock = self.client.sock
+        deadline = utime.ticks_add(utime.ticks_ms(), self.ack_timeout_ms)
+        try:
+            while not done():
+                left = utime.ticks_diff(deadline, utime.ticks_ms())
+                if left <= 0:
+                    raise OSError("No %s within %d ms" % (what, self.ack_timeout_ms))
+                sock.settimeout(left / 1000)
+                try:
+                    # Messages arriving meanwhile are dispatched by wait_msg(),
+                    # other packets are handed back by type
+                    op = self.client.wait_msg()
+                except OSError:
+                    if utime.ticks_diff(deadline, utime.ticks_ms()) <= 0:
+                        raise OSError("No %s within %d ms" % (what, self.ack_timeout_ms))
+                    raise
+                if op == 0x40:
+                    self.__puback()
+                elif op == 0x90:
+                    self.__suback_received(self.__read_packet())
+        finally:
+            sock.settimeout(None)
+
+    def __read_packet(self):
+        """Read the remaining length and body of a packet wait_msg() handed back."""
+        size = 0
+        shift = 0
+        while True:
+            byte = self.client.sock.read(1)[0]
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        return self.client.sock.read(size)
+
+    def __suback_received(self, data):
+        """Hand a SUBACK to the waiting __subscribe()."""
+        pid = ustruct.unpack("!H", data[:2])[0]
+        with self.__outbound_lock:
+            pending = self.__suback
+            if pending is not None and pending[0] == pid:
+                pending[1] = data
+                if self.__suback_ready.locked():
+                    self.__suback_ready.release()
+
+    def __suback_wakeup(self, args=None):
+        with self.__outbound_lock:
+            if self.__suback_ready.locked():
+                self.__suback_ready.release()
+
+    def __arm_wait(self):
+        '''Clear a wake-up left from before; nw_cb() from now on ends the next __wait().'''
+        if not self.__wakeup_lock.locked():
+            self.__wakeup_lock.acquire()
+        self.__woken = False
+
+    def __wait(self, delay_ms):
+        '''
+        Sleep up to delay_ms; nw_cb() since the last __arm_wait() ends the
+        wait early when the data call comes back.
+
+        Returns:
+            bool: True if woken by nw_cb()
+        '''
+        self.__wakeup_timer.start(max(delay_ms, 1), 0, self.__wakeup)
+        self.__wakeup_lock.acquire()
+        self.__wakeup_timer.stop()
+        return self.__woken
+
+    def __wakeup(self, args=None):
+        if self.__wakeup_lock.locked():
+            self.__wakeup_lock.release()
+
+    def reconnect_stats(self):
+        '''
+        Get reconnection counters.
+
+        Returns:
+            dict: reconnects, attempts, failures, rejected (topic filters
+            refused on resubscription), and the time from losing the
+            connection to CONNECTED: last_ms, max_ms and avg_ms
+        '''
+        stats = dict(self.__reconn_stats)
+        total = stats.pop('total_ms')
+        stats['avg_ms'] = total // stats['reconnects'] if stats['reconnects'] else 0
+        return stats
 
     def nw_cb(self, args):
         '''
@@ -282,6 +1410,9 @@ class MyMqttClient():
             if self.logger:
                 self.logger.info("*** network connected! ***")
             self.__nw_flag = True
+            # Retry a pending reconnection right away
+            self.__woken = True
+            self.__wakeup()
         else:
             # Network disconnected.
             if self.logger:
@@ -299,11 +1430,25 @@ class MyMqttClient():
         Returns:
             -1: if an unrecoverable error occurs and the loop exits early.
         """
+        # subscribe() on other threads leaves reading the SUBACK to this one
+        self.__listener = _thread.get_ident()
+        try:
+            return self.__listen_loop()
+        finally:
+            self.__listening = False
+            self.__listener = None
+
+    def __listen_loop(self):
         while True:
             try:
                 if not TaskEnable:
                     break
-                self.client.wait_msg()
+                # Packets other than PUBLISH are handed back by type
+                op = self.client.wait_msg()
+                if op == 0x40:
+                    self.__puback()
+                elif op == 0x90:
+                    self.__suback_received(self.__read_packet())
             except OSError as e:
                 # Determine whether the network is disconnected.
                 if self.logger:
@@ -321,7 +1466,10 @@ class MyMqttClient():
     def loop_forever(self):
         global TaskEnable
         TaskEnable = True
+        self.__listening = True
+        self.__start_thread(self.__listen)
 
+    def __start_thread(self, func):
         task_stacksize =_thread.stack_size()
         name,platform = uos.uname()[1].split("=",1)
         if platform == "EC600E" or platform == "EC800E":
@@ -331,6 +1479,6 @@ class MyMqttClient():
         else:
             _thread.stack_size(16 * 1024)
         # Before creating a thread, modify the thread stack space according to the platform.
-        _thread.start_new_thread(self.__listen, ())
+        _thread.start_new_thread(func, ())
         # After the thread is created successfully, the platform thread stack default size is restored.
         _thread.stack_size(task_stacksize)
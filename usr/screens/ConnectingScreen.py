@@ -117,8 +117,8 @@ class ConnectingScreen(Screen):
         self.ConnectingScreen_ConnectingText.set_style_shadow_width(0, self.lv.PART.MAIN|self.lv.STATE.DEFAULT)
         self.screen.update_layout()
 
-        Eventstore.subscribe("time.update", self.__update_time_cb, owner=self)
-        Eventstore.subscribe("network.status", self.__status_network_signal_cb, owner=self)
+        Eventstore.subscribe("time.update", self.__update_time_cb, owner=self, ui=True)
+        Eventstore.subscribe("network.status", self.__status_network_signal_cb, owner=self, ui=True)
 
     def destroy(self):
         self.active = False
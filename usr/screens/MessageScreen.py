@@ -13,10 +13,21 @@ from usr.screens.screen import Screen
 import usr.services.time_service as time_service
 import usr.services.mqtt_service  as mqtt_service
 from usr.services.button_service import ButtonService
+from usr.extensions.mqtt_message import MqttMessage
 from usr.config import Config
 
 asset_cfg = Config.ASSETS
 scroll_cfg = Config.SCROLL
+display_cfg = Config.DISPLAY
+
+# Payload bytes shown per message, the rest is never decoded
+MESSAGE_BYTES = display_cfg.get("message_bytes", 512)
+
+BUTTON_EVENT = Eventstore.register("button.event")
+
+# Scroll input is served ahead of data and clock traffic; the scroll
+# steps are posted to the UI thread with the same priority
+Eventstore.set_priority(BUTTON_EVENT, Eventstore.PRIORITY_INPUT)
 
 class MessageScreen(Screen):
     def __init__(self):
@@ -285,7 +296,8 @@ class MessageScreen(Screen):
 
         # Create MessageScreen_TopicText
         self.topic_text = self.lv.label(self.screen)
-        self.topic_text.set_text("Status: "+mqtt_service.mqtt_get_status())
+        # Filled in by the sticky mqtt.status replay when subscribing below
+        self.topic_text.set_text("Status: --")
         self.topic_text.set_long_mode(self.lv.label.LONG.WRAP)
         self.topic_text.set_width(self.lv.pct(100))
         self.topic_text.set_pos(5, 95)
@@ -356,9 +368,9 @@ class MessageScreen(Screen):
             0, self.lv.PART.MAIN | self.lv.STATE.DEFAULT)
         self.screen.update_layout()
 
-        Eventstore.subscribe("time.update", self.__update_time_cb, owner=self)
-        Eventstore.subscribe("mqtt.status", self.__mqtt_status_cb, owner=self)
-        Eventstore.subscribe("mqtt.message", self.__refresh_message_display_from_mqtt, owner=self)
+        Eventstore.subscribe("time.update", self.__update_time_cb, owner=self, ui=True)
+        Eventstore.subscribe("mqtt.status", self.__mqtt_status_cb, owner=self, ui=True)
+        Eventstore.subscribe("mqtt.message", self.__refresh_message_display_from_mqtt, owner=self, ui=True)
         self.button_subscription_id = Eventstore.subscribe("button.event", self.__button_event_cb, owner=self)
 
     def destroy(self):
@@ -383,10 +395,11 @@ class MessageScreen(Screen):
                 while self.scroll_up_active or self.scroll_down_active:
                     # Calculate scroll step based on held time
                     step = min(base_scroll + (held_time // step_interval) * scroll_increment, max_scroll)
+                    # LVGL objects are only touched from the UI thread
                     if self.scroll_up_active:
-                        self.__limited_scroll(-step)
+                        Eventstore.call_on_ui(self.__limited_scroll, -step, priority=Eventstore.PRIORITY_INPUT)
                     elif self.scroll_down_active:
-                        self.__limited_scroll(step)
+                        Eventstore.call_on_ui(self.__limited_scroll, step, priority=Eventstore.PRIORITY_INPUT)
                     utime.sleep_ms(scroll_interval)
                     held_time+=scroll_interval
             finally:
@@ -421,7 +434,7 @@ class MessageScreen(Screen):
         self.MessageScreen_Time.set_text(time_str + "\n")
 
     def __mqtt_status_cb(self, event, msg):
-        self.topic_text.set_text("Status: "+mqtt_service.mqtt_get_status())
+        self.topic_text.set_text("Status: " + msg)
         if msg == "CONNECTED":
             pass
         elif msg == "CONNECTING":
@@ -435,19 +448,19 @@ class MessageScreen(Screen):
 
     def __cb_button_scrollup_press(self):
         """Callback for scrollup button press"""
-        Eventstore.publish("button.event", "SCROLL_UP")
+        Eventstore.publish(BUTTON_EVENT, "SCROLL_UP")
 
     def __cb_button_scrolldown_press(self):
         """Callback for scrolldown button press"""
-        Eventstore.publish("button.event", "SCROLL_DOWN")
+        Eventstore.publish(BUTTON_EVENT, "SCROLL_DOWN")
 
     def __cb_button_scrollup_release(self):
         """Callback for scrollup button release"""
-        Eventstore.publish("button.event", "SCROLL_UP_STOP")
+        Eventstore.publish(BUTTON_EVENT, "SCROLL_UP_STOP")
 
     def __cb_button_scrolldown_release(self):
         """Callback for scrolldown button release"""
-        Eventstore.publish("button.event", "SCROLL_DOWN_STOP")
+        Eventstore.publish(BUTTON_EVENT, "SCROLL_DOWN_STOP")
 
     def __scroll_to_bottom(self):
         """Scroll the message container to the bottom"""
@@ -484,17 +497,15 @@ class MessageScreen(Screen):
         """
         try:
             # Validate message structure
-            if not isinstance(msg, dict) or 'message' not in msg:
+            if not isinstance(msg, MqttMessage):
                 # print("Invalid MQTT message format:", msg)
                 return
             
-            # Extract and format data
-            raw_msg = msg['message']
-            topic = msg.get('topic', 'Unknown')
-            timestamp = msg.get('timestamp', 0)
-
-            cleaned_msg = raw_msg.strip().replace('\r\n', ' ').replace('\r', ' ').replace('\n', ' ')
-            formatted_msg = "Msg: {}\nTime: {}".format(cleaned_msg, int(timestamp))
+            # Decode and clean only what is shown
+            cleaned_msg = msg.text(MESSAGE_BYTES)
+            if msg.length > MESSAGE_BYTES:
+                cleaned_msg += "..."
+            formatted_msg = "Msg: {}\nTime: {}".format(cleaned_msg, int(msg.timestamp))
 
             # Append to existing display text
             existing_text = self.message_text.get_text()
@@ -9,7 +9,9 @@ Copyright (c) 2025 YARSA TECH
 
 import _thread
 from usr.extensions.my_mqtts import MyMqttClient
-import utime
+from usr.extensions.mqtt_message import MessagePool
+from usr.extensions.mqtt_journal import MqttJournal
+from usr.extensions.mqtt_session import MqttSession
 import usr.Eventstore as Eventstore
 from usr.config import Config
 import log
@@ -31,6 +33,22 @@ CONFIG_SSL = cfg["ssl_cert"]
 
 SUBSCRIBE_TOPIC = cfg["subscribe_topic"]
 
+# Received messages are published as pooled MqttMessage records
+message_pool = MessagePool(cfg.get("message_pool", 8))
+
+# Status requests waiting for a specific status
+status_waiters = []
+status_waiters_lock = _thread.allocate_lock()
+
+MQTT_STATUS = Eventstore.register("mqtt.status")
+MQTT_MESSAGE = Eventstore.register("mqtt.message")
+MQTT_STATUS_REQUEST = Eventstore.register("mqtt.status.request")
+
+# Status is state, new subscribers get the current value on subscribe
+Eventstore.set_sticky(MQTT_STATUS, coalesce=True)
+Eventstore.set_priority(MQTT_STATUS, Eventstore.PRIORITY_STATE)
+Eventstore.set_priority(MQTT_MESSAGE, Eventstore.PRIORITY_DATA)
+
 
 
 def mqtt_err_cb(error):
@@ -46,17 +64,13 @@ def mqtt_err_cb(error):
 
 def mqtt_recv_msg_cb(topic, msg):
     """Callback function for received MQTT messages"""
-    topic = topic.decode()
-    msg = msg.decode()
-    
-    # Create message object with timestamp
-    message_data = {
-        'topic': topic,
-        'message': msg,
-        'timestamp': utime.time(),
-    }
-
-    Eventstore.publish("mqtt.message", message_data)
+    # Topic and payload stay bytes until a subscriber asks for the text
+    record = message_pool.acquire(topic, msg)
+    try:
+        Eventstore.publish(MQTT_MESSAGE, record)
+    finally:
+        # Deferred deliveries hold their own reference
+        record.release()
 
 def mqtt_status_cb(status):
     """
@@ -65,22 +79,61 @@ def mqtt_status_cb(status):
     global mqtt_status
     if status == MyMqttClient.CONNECTED:
         mqtt_status = "CONNECTED"
-        Eventstore.publish("mqtt.status", "CONNECTED")
+        Eventstore.publish(MQTT_STATUS, "CONNECTED")
     elif status == MyMqttClient.RECONNECTING:
         mqtt_status = "RECONNECTING"
-        Eventstore.publish("mqtt.status", "RECONNECTING")
+        Eventstore.publish(MQTT_STATUS, "RECONNECTING")
     elif status == MyMqttClient.DISCONNECTED:
         mqtt_status = "DISCONNECTED"
-        Eventstore.publish("mqtt.status", "DISCONNECTED")
+        Eventstore.publish(MQTT_STATUS, "DISCONNECTED")
     elif status == MyMqttClient.FAILED:
         mqtt_status = "FAILED"
-        Eventstore.publish("mqtt.status", "FAILED")
+        Eventstore.publish(MQTT_STATUS, "FAILED")
+    wake_status_waiters()
+
+def status_request_cb(event, request):
+    """
+    Answer "mqtt.status.request" requests.
+
+    A request without payload is answered with the current status right
+    away; a request for a given status (e.g. "CONNECTED") is answered once
+    the client reaches it, or times out on the requester's side.
+    """
+    with status_waiters_lock:
+        if request.payload is None or request.payload == mqtt_status:
+            request.reply(mqtt_status)
+        else:
+            status_waiters.append(request)
+
+def wake_status_waiters():
+    """Reply to the status requests that wait for the current status."""
+    global status_waiters
+    with status_waiters_lock:
+        waiting = []
+        for request in status_waiters:
+            if request.payload == mqtt_status:
+                request.reply(mqtt_status)
+            elif not request.done():
+                # Drop requests that already timed out
+                waiting.append(request)
+        status_waiters = waiting
+
+def wait_for_status(status, timeout_ms=30000):
+    """
+    Block until the MQTT client reaches a status, without polling.
+
+    Returns:
+        bool: True if the status was reached within timeout_ms
+    """
+    return Eventstore.request(MQTT_STATUS_REQUEST, status, timeout_ms).wait()
+
+Eventstore.subscribe(MQTT_STATUS_REQUEST, status_request_cb)
 
 
 def thread_mqtt():
     global mqtt_client, mqtt_status
     mqtt_status = "CONNECTING"
-    Eventstore.publish("mqtt.status", "CONNECTING")
+    Eventstore.publish(MQTT_STATUS, "CONNECTING")
     # get the ssl_params data
     certdata = ""
     with open(CONFIG_SSL, "rb") as f:
@@ -90,6 +143,20 @@ def thread_mqtt():
         "cert": certdata
     }
 
+    # Messages published while offline are kept on flash until reconnected
+    journal = None
+    if cfg.get("journal_dir"):
+        journal = MqttJournal(cfg["journal_dir"],
+                              segment_bytes=cfg.get("journal_segment_bytes", 4096),
+                              max_bytes=cfg.get("journal_max_bytes", 65536),
+                              evict=cfg.get("journal_evict", "oldest"))
+
+    # Persistent session: subscriptions and unacknowledged QoS 1 messages
+    # survive reboots, the broker queues messages while we are away
+    session = None
+    if cfg.get("session_file"):
+        session = MqttSession(cfg["session_file"])
+
     # Create MQTT client instance
     mqtt_client = MyMqttClient(
         clientid=CLIENT_ID,
@@ -99,7 +166,19 @@ def thread_mqtt():
         password=PASSWORD,
         ssl=True,
         ssl_params=ssl_params,
-        reconn=False  # Disable automatic reconnection
+        reconn=False,  # Disable automatic reconnection
+        outbound_queue=cfg.get("outbound_queue", 32),
+        batch_bytes=cfg.get("batch_bytes", 1024),
+        journal=journal,
+        inflight_window=cfg.get("inflight_window", 8),
+        ack_timeout_ms=cfg.get("ack_timeout_ms", 10000),
+        route_cache=cfg.get("route_cache", 32),
+        reconnect_base_ms=cfg.get("reconnect_base_ms", 1000),
+        reconnect_max_ms=cfg.get("reconnect_max_ms", 60000),
+        clean_session=cfg.get("clean_session", True),
+        session=session,
+        session_save_ms=cfg.get("session_save_ms", 5000),
+        max_retransmits=cfg.get("max_retransmits", 3)
     )
 
     # mqtt_client.setLogger(log.DEBUG)
@@ -117,7 +196,7 @@ def thread_mqtt():
 
         # Subscribe to topics
         try:
-            mqtt_client.subscribe(topic=SUBSCRIBE_TOPIC, qos=1)
+            mqtt_client.route(SUBSCRIBE_TOPIC, mqtt_recv_msg_cb, qos=1)
             print("Subscribed to: " + SUBSCRIBE_TOPIC)
         except Exception as e:
             print("Failed to subscribe to " + SUBSCRIBE_TOPIC + ": " + str(e))
@@ -186,6 +265,32 @@ def mqtt_reconnect():
             print("MQTT client is not initialized. Starting fresh connection...")
             mqtt_connect()
 
+def mqtt_publish(topic, msg, qos=0, retain=False, callback=None):
+    """
+    Publish without blocking the caller.
+
+    callback, if given, is called with the PublishHandle once the message
+    was sent (QoS 1: acknowledged), journaled, dropped or failed.
+
+    Returns:
+        PublishHandle or None: None if the client was not created yet
+    """
+    if mqtt_client is None:
+        return None
+    return mqtt_client.publish_nowait(topic, msg, qos, retain, callback)
+
+def mqtt_route(topic_filter, handler, qos=0):
+    """
+    Subscribe handler to an MQTT topic filter ("+" and "#" allowed).
+
+    handler is called with (topic, msg) as received, on the listener
+    thread, for matching messages only; messages no route matches are
+    published as "mqtt.message".
+    """
+    if mqtt_client is None:
+        raise ValueError("MQTT client is not initialized")
+    mqtt_client.route(topic_filter, handler, qos)
+
 def mqtt_get_status():
     global mqtt_status
     return mqtt_status
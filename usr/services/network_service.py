@@ -12,6 +12,12 @@ import usr.Eventstore as Eventstore
 
 _net = MyNetManager()
 
+NETWORK_STATUS = Eventstore.register("network.status")
+
+# Status is state, new subscribers get the current value on subscribe
+Eventstore.set_sticky(NETWORK_STATUS, coalesce=True)
+Eventstore.set_priority(NETWORK_STATUS, Eventstore.PRIORITY_STATE)
+
 
 def net_event_callback(args):
     """
@@ -22,9 +28,9 @@ def net_event_callback(args):
     profile_id, net_state = args[0], args[1]
 
     if net_state == 1:
-        Eventstore.publish("network.status", "CONNECTED")
+        Eventstore.publish(NETWORK_STATUS, "CONNECTED")
     else:
-        Eventstore.publish("network.status", "DISCONNECTED")
+        Eventstore.publish(NETWORK_STATUS, "DISCONNECTED")
 
 
 def init():
@@ -32,7 +38,7 @@ def init():
     if conn_result == 0:
         if _net.set_callback(net_event_callback):
             print("Callback registered successfully")
-        Eventstore.publish("network.status", "CONNECTED")
+        Eventstore.publish(NETWORK_STATUS, "CONNECTED")
     return conn_result
 
 
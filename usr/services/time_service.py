@@ -12,6 +12,12 @@ import usr.Eventstore as Eventstore
 
 _current_time = "00:00:00"  # Default time
 
+TIME_UPDATE = Eventstore.register("time.update")
+
+# Only the latest tick matters to a subscriber that fell behind
+Eventstore.set_sticky(TIME_UPDATE, coalesce=True)
+Eventstore.set_priority(TIME_UPDATE, Eventstore.PRIORITY_HOUSEKEEPING)
+
 def set_time(time_str):
     """
     Set the global shared time.
@@ -44,7 +50,7 @@ def run_time_updater():
         while True:
             
             set_time(get_current_time_str())
-            Eventstore.publish_async("time.update", get_time())
+            Eventstore.publish_async(TIME_UPDATE, get_time())
             utime.sleep(1)
 
     _thread.start_new_thread(loop, ())
\ No newline at end of file
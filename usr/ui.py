@@ -20,10 +20,105 @@ import lvgl
 from machine import Pin
 import usr.Eventstore as Eventstore
 import utime
+import _thread
 from usr.config import Config
 
 cfg = Config.DISPLAY
 
+
+class UiDispatcher():
+    """
+    Queue of callbacks to run on the LVGL thread.
+
+    Event subscribers marked ui=True and screen helper threads post here
+    from any thread; drain() runs everything queued since the last frame
+    so LVGL objects are only touched from one thread and one redraw
+    covers the whole batch.
+
+    Calls carry the priority class of their event (Eventstore.PRIORITY_*)
+    and run most urgent class first, in post order within a class. When
+    the queue is full a call evicts the newest one of a less urgent
+    class, so scrolling is not lost behind a backlog of message updates.
+    """
+    def __init__(self, max_pending=64):
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._items = [[] for _ in Eventstore.PRIORITY_NAMES]  # Per priority: [key, func, args]
+        self._count = 0
+        self._keyed = {}  # key -> queued item, for merging updates
+        self._lock = _thread.allocate_lock()
+        # Called as on_drop(func, args) for queued calls that are evicted
+        self.on_drop = None
+
+    def post(self, key, func, args, priority=Eventstore.PRIORITY_DATA):
+        """
+        Queue func(*args) for the next frame.
+
+        Args:
+            key: If not None, an entry already queued with the same key is
+                updated with the new args instead of queueing another call
+            func: Callable to run on the LVGL thread
+            args: Tuple of arguments
+            priority: Eventstore.PRIORITY_* class of the call
+
+        Returns:
+            bool: False if the queue is full and the call was dropped
+        """
+        evicted = None
+        with self._lock:
+            if key is not None:
+                item = self._keyed.get(key)
+                if item is not None:
+                    item[2] = args
+                    return True
+
+            if self._count >= self.max_pending:
+                for lower in range(len(self._items) - 1, priority, -1):
+                    if self._items[lower]:
+                        evicted = self._items[lower].pop()
+                        if evicted[0] is not None:
+                            del self._keyed[evicted[0]]
+                        self._count -= 1
+                        break
+                self.dropped += 1
+                if evicted is None:
+                    return False
+
+            item = [key, func, args]
+            self._items[priority].append(item)
+            self._count += 1
+            if key is not None:
+                self._keyed[key] = item
+
+        if evicted is not None and self.on_drop:
+            self.on_drop(evicted[1], evicted[2])
+        return True
+
+    def pending(self):
+        """Number of calls waiting for the next frame."""
+        return self._count
+
+    def drain(self):
+        """Run all queued calls. Must be called from the LVGL thread."""
+        with self._lock:
+            if not self._count:
+                return 0
+            classes = self._items
+            self._items = [[] for _ in classes]
+            self._count = 0
+            self._keyed = {}
+
+        count = 0
+        for items in classes:
+            for key, func, args in items:
+                try:
+                    func(*args)
+                except Exception as e:
+                    print("UI callback error: {}".format(e))
+            count += len(items)
+        return count
+
+
 class Ui():
     def __init__(self):
         # LCD Configuration
@@ -40,6 +135,11 @@ class Ui():
 
         self.screens = []
 
+        # Calls from other threads are marshalled to the LVGL thread
+        self.dispatcher = UiDispatcher(cfg.get("ui_queue_size", 64))
+        self.dispatcher.on_drop = Eventstore.drop_ui_call
+        self.frame_timer = None
+
         # Initialize the display and screens
         self.__lcd_init()
 
@@ -63,9 +163,17 @@ class Ui():
         # Start lvgl
         self.lv.tick_inc(5)
         self.lv.task_handler()
+
+        # LVGL timers run inside the LVGL task handler, drain the UI queue there
+        self.frame_timer = self.lv.timer_create(self.__frame_cb, cfg.get("frame_ms", 20), None)
+        Eventstore.set_ui_dispatcher(self.dispatcher.post)
         
         print("LCD init complete")
 
+    def __frame_cb(self, timer):
+        """Run the callbacks queued for this frame on the LVGL thread"""
+        self.dispatcher.drain()
+
     def __load_screen(self, event, screen_name):
         """
         Load a specific screen
@@ -105,8 +213,8 @@ class Ui():
         Startup of GUI
         """
         self.__create()
-        Eventstore.subscribe("load_screen", self.__load_screen)
-        Eventstore.subscribe("destroy_screen", self.__destroy_screen)
+        Eventstore.subscribe("load_screen", self.__load_screen, ui=True)
+        Eventstore.subscribe("destroy_screen", self.__destroy_screen, ui=True)
 
         Eventstore.publish("load_screen", "WelcomeScreen")
         turnOn_Backlight()